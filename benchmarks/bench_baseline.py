@@ -0,0 +1,61 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+
+  benchmarks: baseline
+  ~~~~~~~~~~~~~~~~~~~~
+
+  Writes a baseline of millions of fingerprints, then times opening it and
+  looking up known and unknown fingerprints through `protolint.baseline`.
+
+  Usage: PYTHONPATH=. python -O benchmarks/bench_baseline.py [--fingerprints N] [--lookups N]
+
+"""
+
+import os
+import sys
+import time
+import shutil
+import hashlib
+import argparse
+import tempfile
+
+from protolint import baseline
+
+
+def main():
+
+  """ Write the baseline, then report open and lookup times. """
+
+  parser = argparse.ArgumentParser(description='Benchmark baseline lookups.')
+  parser.add_argument('--fingerprints', type=int, default=2000000, help='number of fingerprints in the baseline')
+  parser.add_argument('--lookups', type=int, default=100000, help='number of lookups to time')
+  args = parser.parse_args()
+
+  root = tempfile.mkdtemp(prefix='protolint-bench-')
+  try:
+    path = os.path.join(root, 'baseline.bin')
+    start = time.time()
+    baseline.write(path, (hashlib.sha256(str(index)).hexdigest() for index in xrange(args.fingerprints)))
+    print("write     %8.3fs  %d fingerprints, %.1f MB" % (
+      time.time() - start, args.fingerprints, os.path.getsize(path) / 1048576.0))
+
+    start = time.time()
+    known = baseline.Baseline(path)
+    print("open      %8.3fms" % ((time.time() - start) * 1000))
+
+    for label, offset in (('hits', 0), ('misses', args.fingerprints)):
+      fingerprints = [hashlib.sha256(str(offset + index)).hexdigest() for index in xrange(args.lookups)]
+      start = time.time()
+      found = sum(1 for fingerprint in fingerprints if fingerprint in known)
+      elapsed = time.time() - start
+      print("%-9s %8.3fus per lookup  (%d found)" % (label, elapsed / args.lookups * 1e6, found))
+    known.close()
+  finally:
+    shutil.rmtree(root)
+  return 0
+
+
+if __name__ == '__main__':
+  sys.exit(main())
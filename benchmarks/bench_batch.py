@@ -0,0 +1,86 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+
+  benchmarks: batch
+  ~~~~~~~~~~~~~~~~~
+
+  Times linting many small generated workspaces one `protolint` process at
+  a time, against `protolint batch` linting all of them in one process, at
+  increasing worker counts.
+
+  Usage: PYTHONPATH=. python benchmarks/bench_batch.py [--workspaces N] [--files N] [--style-only]
+
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import tempfile
+import subprocess
+
+from corpus import build_workspace
+
+
+def run(command):
+
+  """ Time one command, discarding its output. """
+
+  start = time.time()
+  with open(os.devnull, 'w') as devnull:
+    subprocess.call(command, stdout=devnull, stderr=devnull)
+  return time.time() - start
+
+
+def main():
+
+  """ Build the workspaces and report wall time for each way of linting them. """
+
+  parser = argparse.ArgumentParser(description='Benchmark batch mode.')
+  parser.add_argument('--workspaces', type=int, default=100, help='number of workspaces')
+  parser.add_argument('--files', type=int, default=20, help='number of protos per workspace')
+  parser.add_argument('--messages', type=int, default=5, help='number of messages per proto')
+  parser.add_argument('--style-only', action='store_true', help='lint with the in-process style checker')
+  parser.add_argument('--max-workers', type=int, default=8, help='highest worker count to time')
+  args = parser.parse_args()
+
+  root = tempfile.mkdtemp(prefix='protolint-bench-')
+  try:
+    config = os.path.join(root, 'config.json')
+    with open(config, 'w') as fhandle:
+      json.dump({'include_paths': []}, fhandle)
+
+    manifest = []
+    for index in range(args.workspaces):
+      workspace = os.path.join(root, 'workspace%04d' % index)
+      build_workspace(workspace, args.files, args.messages, violations=0.05, seed=index)
+      manifest.append([config, workspace])
+    with open(os.path.join(root, 'manifest.json'), 'w') as fhandle:
+      json.dump(manifest, fhandle)
+
+    flags = ['--style-only'] if args.style_only else []
+    base = [sys.executable, '-O', '-m', 'protolint']
+
+    start = time.time()
+    for config_path, workspace in manifest:
+      run(base + flags + [config_path, workspace])
+    baseline = time.time() - start
+    print("%-20s %8.3fs" % ('processes', baseline))
+
+    workers = 1
+    while workers <= args.max_workers:
+      elapsed = run(base + ['batch', '--manifest', os.path.join(root, 'manifest.json'),
+                            '--workers', str(workers)] + flags)
+      print("%-20s %8.3fs  speedup %.2fx" % ('batch workers=%d' % workers, elapsed, baseline / elapsed))
+      workers *= 2
+  finally:
+    shutil.rmtree(root)
+  return 0
+
+
+if __name__ == '__main__':
+  sys.exit(main())
@@ -0,0 +1,78 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+
+  benchmarks: descriptors
+  ~~~~~~~~~~~~~~~~~~~~~~~
+
+  Times `--descriptor-checks` runs over the generated corpus from `bench_jobs`:
+  without a cache, into a cold descriptor cache, from a warm one, and after
+  touching a single proto. Runs are `--style-only`, so the times are those of
+  the style checker plus the descriptor layer, without `protoc-gen-lint`.
+
+  Usage: PYTHONPATH=. python benchmarks/bench_descriptors.py [--packages N]
+
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import tempfile
+import subprocess
+
+from bench_jobs import build_corpus
+
+
+def run(config, workspace, flags):
+
+  """ Time one full run of the linter with the given flags. """
+
+  start = time.time()
+  with open(os.devnull, 'w') as devnull:
+    subprocess.call([sys.executable, '-O', '-m', 'protolint', '--style-only', '--descriptor-checks'] + flags +
+                    [config, workspace], stdout=devnull, stderr=devnull)
+  return time.time() - start
+
+
+def main():
+
+  """ Build the corpus and report wall time for each cache state. """
+
+  parser = argparse.ArgumentParser(description='Benchmark the descriptor cache.')
+  parser.add_argument('--packages', type=int, default=200, help='number of independent packages')
+  parser.add_argument('--files', type=int, default=10, help='number of files per package')
+  parser.add_argument('--messages', type=int, default=20, help='number of messages per file')
+  args = parser.parse_args()
+
+  root = tempfile.mkdtemp(prefix='protolint-bench-')
+  try:
+    config = os.path.join(root, 'config.json')
+    with open(config, 'w') as fhandle:
+      json.dump({'include_paths': []}, fhandle)
+
+    corpus = os.path.join(root, 'corpus')
+    build_corpus(corpus, args.packages, args.files, args.messages)
+    cache = ['--cache', os.path.join(root, 'cache')]
+
+    print("%-12s %8.3fs" % ('uncached', run(config, corpus, [])))
+    print("%-12s %8.3fs" % ('cold', run(config, corpus, cache)))
+    print("%-12s %8.3fs" % ('warm', run(config, corpus, cache)))
+
+    # touch one proto at the bottom of its package, so it and its importers are compiled again
+    for directory, _, filenames in os.walk(corpus):
+      if filenames:
+        with open(os.path.join(directory, sorted(filenames)[0]), 'a') as fhandle:
+          fhandle.write('\n// touched\n')
+        break
+    print("%-12s %8.3fs" % ('one changed', run(config, corpus, cache)))
+  finally:
+    shutil.rmtree(root)
+  return 0
+
+
+if __name__ == '__main__':
+  sys.exit(main())
@@ -0,0 +1,143 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+
+  benchmarks: exclude
+  ~~~~~~~~~~~~~~~~~~~
+
+  Times matching every directory and file of a generated tree against
+  hundreds of exclude paths, mixing plain paths, globs and regexes, with
+  the compiled `protolint.exclude.Matcher` and with the loop over each
+  exclude path previously used by `Linter.__exclude_match`, which is given
+  globs translated by `fnmatch`, since it could not read them. Then times
+  `Linter.discover` over the tree with and without the exclude paths.
+
+  Usage: PYTHONPATH=. python benchmarks/bench_exclude.py [--dirs N] [--files N] [--patterns N]
+
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import random
+import shutil
+import fnmatch
+import argparse
+import tempfile
+
+from protolint import config
+from protolint import linter
+from protolint import output
+from protolint import exclude
+
+
+def build_tree(root, dirs, files):
+
+  """ Build `dirs` directories of `files` protos each, returning the relative
+      paths of every directory and file in the tree. """
+
+  directories, protofiles = [], []
+  for index in range(dirs):
+    directory = 'src/pkg%03d/mod%04d' % (index // 20, index)
+    os.makedirs(os.path.join(root, directory))
+    directories.append(directory)
+    for file_index in range(files):
+      path = '%s/File%03d%s.proto' % (directory, file_index, '_test' if file_index % 10 == 9 else '')
+      open(os.path.join(root, path), 'w').close()
+      protofiles.append(path)
+  return directories, protofiles
+
+
+def patterns(count, dirs, seed=0):
+
+  """ Generate exclude paths, a third each of plain paths, globs and regexes,
+      aimed at directories spread over the tree. """
+
+  rng = random.Random(seed)
+  generated = []
+  for index in range(count):
+    target = rng.randrange(dirs)
+    package, module = 'src/pkg%03d' % (target // 20), 'mod%04d' % target
+    generated.append((
+      '%s/%s' % (package, module),
+      '%s/%s/*%d_test.proto' % (package, module, index % 10),
+      r'^%s/%s/File0[0-4]\d\.proto' % (package, module))[index % 3])
+  return generated
+
+
+def legacy(configured, workspace):
+
+  """ Match the way `Linter.__exclude_match` used to: every exclude path in
+      turn, as a prefix, then as a cached regex. """
+
+  regexes = dict((pattern, re.compile(fnmatch.translate(pattern) if exclude.kind(pattern) == 'glob' else pattern))
+                 for pattern in configured)
+
+  def match(path):
+    for pattern in configured:
+      if path.startswith(pattern) or path.replace(workspace, "").startswith(pattern):
+        return True
+      if regexes[pattern].match(path):
+        return True
+    return False
+  return match
+
+
+def timed(label, func, paths):
+
+  """ Match every path a few times and report the best rate. """
+
+  best, matched = None, 0
+  for _ in range(3):
+    start = time.time()
+    matched = sum(1 for path in paths if func(path))
+    elapsed = time.time() - start
+    best = elapsed if best is None else min(best, elapsed)
+  print("%-24s %8.3fs  %9.0f paths/s  %d excluded" % (label, best, len(paths) / best, matched))
+  return best
+
+
+def main():
+
+  """ Build the tree and report each way of matching it. """
+
+  parser = argparse.ArgumentParser(description='Benchmark exclude paths.')
+  parser.add_argument('--dirs', type=int, default=1000, help='number of directories')
+  parser.add_argument('--files', type=int, default=100, help='number of protos per directory')
+  parser.add_argument('--patterns', type=int, default=300, help='number of exclude paths')
+  args = parser.parse_args()
+
+  output.configure('critical')
+  root = tempfile.mkdtemp(prefix='protolint-bench-')
+  try:
+    workspace = os.path.join(root, 'workspace')
+    directories, protofiles = build_tree(workspace, args.dirs, args.files)
+    configured = patterns(args.patterns, args.dirs)
+    paths = [directory + '/' for directory in directories] + protofiles
+    print("tree: %d dirs x %d files, %d exclude paths" % (args.dirs, args.files, len(configured)))
+
+    start = time.time()
+    matcher = exclude.Matcher(configured, workspace)
+    print("%-24s %8.3fs" % ('compile', time.time() - start))
+    baseline = timed('per exclude path', legacy(configured, workspace), paths)
+    compiled = timed('compiled', lambda path: matcher.match(path), paths)
+    print("speedup: %.1fx" % (baseline / compiled))
+
+    for label, excluded in (('discover', []), ('discover (excluding)', configured)):
+      config_path = os.path.join(root, 'config.json')
+      with open(config_path, 'w') as fhandle:
+        json.dump({'include_paths': [], 'exclude_paths': excluded}, fhandle)
+      lint = linter.Linter(config.LinterConfig(config_path, workspace), None)
+      start = time.time()
+      found = lint.discover()
+      print("%-24s %8.3fs  %d protos" % (label, time.time() - start, len(found)))
+  finally:
+    shutil.rmtree(root)
+  return 0
+
+
+if __name__ == '__main__':
+  sys.exit(main())
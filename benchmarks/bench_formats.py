@@ -0,0 +1,87 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+
+  benchmarks: formats
+  ~~~~~~~~~~~~~~~~~~~
+
+  Times `--style-only` runs over a generated workspace with hundreds of
+  thousands of issues in each output format, to `stdout` and gzip-compressed
+  to a file, reporting the bytes written and the time a consumer takes to
+  read every issue back. Formats whose library is not installed are skipped.
+
+  Usage: PYTHONPATH=. python benchmarks/bench_formats.py [--files N] [--violations RATIO]
+
+"""
+
+import os
+import sys
+import gzip
+import json
+import time
+import shutil
+import argparse
+import tempfile
+import subprocess
+
+from corpus import build_workspace
+
+from protolint import sink
+
+
+def decode(format, data):
+
+  """ Read every issue back from the output of a format, returning how many there were. """
+
+  if format == 'msgpack':
+    return sum(1 for _ in sink.msgpack.Unpacker(data, raw=False))
+  separator = '\0' if format == 'codeclimate' else '\n'
+  return sum(1 for document in data.split(separator) if document and json.loads(document))
+
+
+def main():
+
+  """ Build the workspace and report each format. """
+
+  parser = argparse.ArgumentParser(description='Benchmark output formats.')
+  parser.add_argument('--files', type=int, default=2000, help='number of protos')
+  parser.add_argument('--messages', type=int, default=20, help='number of messages per proto')
+  parser.add_argument('--violations', type=float, default=1.0, help='ratio of names breaking style rules')
+  args = parser.parse_args()
+
+  root = tempfile.mkdtemp(prefix='protolint-bench-')
+  try:
+    config = os.path.join(root, 'config.json')
+    with open(config, 'w') as fhandle:
+      json.dump({'include_paths': []}, fhandle)
+    workspace = os.path.join(root, 'workspace')
+    build_workspace(workspace, args.files, args.messages, violations=args.violations)
+
+    for format in sink.FORMATS:
+      if format == 'msgpack' and sink.msgpack is None:
+        print("%-20s skipped, msgpack is not installed" % format)
+        continue
+
+      for compressed in (False, True):
+        path = os.path.join(root, 'issues' + sink.FORMATS[format][1] + ('.gz' if compressed else ''))
+        command = [sys.executable, '-O', '-m', 'protolint', '--style-only', '--log-level', 'error',
+                   '--format', format, '--output', path, config, workspace]
+        start = time.time()
+        subprocess.check_call(command)
+        elapsed = time.time() - start
+
+        size = os.path.getsize(path)
+        start = time.time()
+        with (gzip.open if compressed else open)(path, 'rb') as fhandle:
+          issues = decode(format, fhandle.read())
+        parsed = time.time() - start
+        print("%-20s %8.3fs  %d issues  %10d bytes (%5.1f per issue)  read back in %.3fs" % (
+          format + (' + gzip' if compressed else ''), elapsed, issues, size, float(size) / max(issues, 1), parsed))
+  finally:
+    shutil.rmtree(root)
+  return 0
+
+
+if __name__ == '__main__':
+  sys.exit(main())
@@ -0,0 +1,113 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+
+  benchmarks: issues
+  ~~~~~~~~~~~~~~~~~~
+
+  Times building issues from lines of `protoc` output and from cached
+  records, exporting, fingerprinting and serializing them, in issues per
+  second, and measures the memory each retained issue costs, in bytes.
+  Lines are spread over the protos of a generated workspace, mixing style
+  violations with compile errors.
+
+  Usage: PYTHONPATH=. python benchmarks/bench_issues.py [--issues N] [--files N]
+
+"""
+
+import gc
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import resource
+import tempfile
+
+from corpus import build_workspace, proto_name
+
+from protolint import config
+from protolint import linter
+from protolint import output
+from protolint.style import RULES
+
+
+def lines(count, files):
+
+  """ Generate lines of output, nine style violations to each compile error. """
+
+  rules = sorted(RULES.items())
+  for index in range(count):
+    protofile = proto_name(index % files)
+    if index % 10 == 9:
+      yield '%s:%s:3: "pkg0000.Missing%05d" is not defined.' % (protofile, index % 400 + 1, index)
+    else:
+      name, (_, message) = rules[index % len(rules)]
+      yield "%s:%s:9: 'bad_Name%05d' - %s" % (protofile, index % 400 + 1, index, message)
+
+
+def rate(count, func):
+
+  """ Time a function over `count` items, in items per second. """
+
+  gc.collect()
+  start = time.time()
+  func()
+  return count / (time.time() - start)
+
+
+def resident():
+
+  """ Current resident set size, in bytes. """
+
+  with open('/proc/self/statm') as fhandle:
+    return int(fhandle.read().split()[1]) * resource.getpagesize()
+
+
+def main():
+
+  """ Build the workspace and report each measure. """
+
+  parser = argparse.ArgumentParser(description='Benchmark issue objects.')
+  parser.add_argument('--issues', type=int, default=200000, help='number of issues')
+  parser.add_argument('--files', type=int, default=200, help='number of protos issues are spread over')
+  args = parser.parse_args()
+
+  output.configure('critical')
+  root = tempfile.mkdtemp(prefix='protolint-bench-')
+  try:
+    config_path = os.path.join(root, 'config.json')
+    with open(config_path, 'w') as fhandle:
+      json.dump({'include_paths': []}, fhandle)
+    workspace = os.path.join(root, 'workspace')
+    build_workspace(workspace, args.files, 1)
+
+    lint = linter.Linter(config.LinterConfig(config_path, workspace), None)
+    lint.discover()
+    raw = list(lines(args.issues, args.files))
+    count = len(raw)
+
+    before = resident()
+    retained = [lint.classify(line) for line in lines(args.issues, args.files)]  # lines are released as read
+    after = resident()
+    print("%-22s %10.0f bytes" % ('memory per issue', float(after - before) / count))
+    del retained
+
+    issues = []
+    print("%-22s %10.0f issues/s" % ('classify', rate(count, lambda: issues.extend(lint.classify(line) for line in raw))))
+    records = [json.loads(json.dumps(issue.record())) for issue in issues]
+    print("%-22s %10.0f issues/s" % ('restore', rate(count, lambda: [linter.BaseIssue.restore(lint, record)
+                                                                    for record in records])))
+    print("%-22s %10.0f issues/s" % ('fingerprint', rate(count, lambda: [issue.unique_hash for issue in issues])))
+    print("%-22s %10.0f issues/s" % ('export', rate(count, lambda: [issue.export(lint.make_path_for_protofile) for issue in issues])))
+    print("%-22s %10.0f issues/s" % ('export + serialize', rate(count, lambda: [issue(lint.make_path_for_protofile) for issue in issues])))
+    print("%-22s %10.0f issues/s" % ('end to end', rate(count, lambda: [lint.classify(line)(lint.make_path_for_protofile) for line in raw])))
+  finally:
+    shutil.rmtree(root)
+  return 0
+
+
+if __name__ == '__main__':
+  sys.exit(main())
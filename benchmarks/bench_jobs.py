@@ -0,0 +1,95 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+
+  benchmarks: jobs
+  ~~~~~~~~~~~~~~~~
+
+  Times a full `protolint` run at increasing `--jobs` counts, over the
+  `protolint_tests/protos` fixtures and over a generated corpus of
+  independent packages, each a small chain of files importing each other.
+
+  Usage: PYTHONPATH=. python benchmarks/bench_jobs.py [--packages N] [--max-jobs N]
+
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import tempfile
+import subprocess
+import multiprocessing
+
+
+def build_corpus(root, packages, files, messages):
+
+  """ Build `packages` directories of `files` protos each, where every file
+      imports the previous one in its package. """
+
+  for package in range(packages):
+    directory = os.path.join(root, 'pkg%04d' % package)
+    os.makedirs(directory)
+    for index in range(files):
+      lines = ['syntax = "proto3";', '', 'package pkg%04d;' % package, '']
+      if index:
+        lines.append('import "pkg%04d/File%02d.proto";' % (package, index - 1))
+      for message in range(messages):
+        lines.append('message Message%02d%03d {' % (index, message))
+        lines.extend('  string field_%02d = %d;' % (field, field + 1) for field in range(8))
+        lines.append('}')
+      with open(os.path.join(directory, 'File%02d.proto' % index), 'w') as fhandle:
+        fhandle.write('\n'.join(lines) + '\n')
+
+
+def run(config, workspace, jobs):
+
+  """ Time one full run of the linter at the given job count. """
+
+  start = time.time()
+  with open(os.devnull, 'w') as devnull:
+    subprocess.call([sys.executable, '-O', '-m', 'protolint', '--jobs', str(jobs), config, workspace],
+                    stdout=devnull, stderr=devnull)
+  return time.time() - start
+
+
+def main():
+
+  """ Build the corpus and report wall time for each job count. """
+
+  parser = argparse.ArgumentParser(description='Benchmark sharded protoc execution.')
+  parser.add_argument('--packages', type=int, default=400, help='number of independent packages')
+  parser.add_argument('--files', type=int, default=10, help='number of files per package')
+  parser.add_argument('--messages', type=int, default=20, help='number of messages per file')
+  parser.add_argument('--max-jobs', type=int, default=multiprocessing.cpu_count(), help='highest job count to time')
+  args = parser.parse_args()
+
+  root = tempfile.mkdtemp(prefix='protolint-bench-')
+  try:
+    config = os.path.join(root, 'config.json')
+    with open(config, 'w') as fhandle:
+      json.dump({'include_paths': []}, fhandle)
+
+    corpus = os.path.join(root, 'corpus')
+    build_corpus(corpus, args.packages, args.files, args.messages)
+
+    jobs = [1]
+    while jobs[-1] * 2 <= args.max_jobs:
+      jobs.append(jobs[-1] * 2)
+
+    for label, workspace in (('fixtures', 'protolint_tests/protos'), ('corpus', corpus)):
+      baseline = None
+      for count in jobs:
+        elapsed = run(config, workspace, count)
+        baseline = baseline or elapsed
+        print("%-10s jobs=%-3d %8.3fs  speedup %.2fx" % (label, count, elapsed, baseline / elapsed))
+  finally:
+    shutil.rmtree(root)
+  return 0
+
+
+if __name__ == '__main__':
+  sys.exit(main())
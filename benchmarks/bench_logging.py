@@ -0,0 +1,80 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+
+  benchmarks: logging
+  ~~~~~~~~~~~~~~~~~~~
+
+  Times `--style-only` runs over a generated workspace with tens of
+  thousands of issues, at several log levels and with the queued log
+  handler, with `stderr` going to `/dev/null`. Runs are not optimized
+  (no `-O`), since that removes logging altogether.
+
+  Usage: PYTHONPATH=. python benchmarks/bench_logging.py [--files N] [--violations RATIO]
+
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import tempfile
+import subprocess
+
+from corpus import build_workspace
+
+
+MODES = (
+  ('debug', []),
+  ('info', ['--log-level', 'info']),
+  ('error', ['--log-level', 'error']),
+  ('critical', ['--log-level', 'critical']),
+  ('debug, queued', ['--log-queue']),
+  ('critical, queued', ['--log-level', 'critical', '--log-queue']))
+
+
+def run(config, workspace, flags):
+
+  """ Time one run of the linter, returning its wall time and issue count. """
+
+  start = time.time()
+  with open(os.devnull, 'w') as devnull:
+    issues = subprocess.check_output([sys.executable, '-m', 'protolint', '--style-only'] + flags + [config, workspace],
+                                     stderr=devnull).count('\0')
+  return time.time() - start, issues
+
+
+def main():
+
+  """ Build the workspace and report wall time at each log level. """
+
+  parser = argparse.ArgumentParser(description='Benchmark logging overhead.')
+  parser.add_argument('--files', type=int, default=5000, help='number of protos')
+  parser.add_argument('--messages', type=int, default=10, help='number of messages per proto')
+  parser.add_argument('--violations', type=float, default=0.14, help='ratio of names breaking style rules')
+  parser.add_argument('--repeat', type=int, default=3, help='runs per mode, keeping the quickest')
+  args = parser.parse_args()
+
+  root = tempfile.mkdtemp(prefix='protolint-bench-')
+  try:
+    config = os.path.join(root, 'config.json')
+    with open(config, 'w') as fhandle:
+      json.dump({'include_paths': []}, fhandle)
+    workspace = os.path.join(root, 'workspace')
+    build_workspace(workspace, args.files, args.messages, violations=args.violations)
+
+    baseline = None
+    for mode, flags in MODES:
+      elapsed, issues = min(run(config, workspace, flags) for _ in range(args.repeat))
+      baseline = baseline or elapsed
+      print("%-18s %8.3fs  %d issues  speedup %.2fx" % (mode, elapsed, issues, baseline / elapsed))
+  finally:
+    shutil.rmtree(root)
+  return 0
+
+
+if __name__ == '__main__':
+  sys.exit(main())
@@ -0,0 +1,85 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+
+  benchmarks: memory
+  ~~~~~~~~~~~~~~~~~~
+
+  Measures peak RSS of `--style-only` runs over a generated workspace where
+  every name breaks a style rule, about a million issues by default, with
+  issues released once written and with `--retain-issues`. Each run is
+  measured from a fresh process of its own, with `stdout` counted and
+  discarded.
+
+  Usage: PYTHONPATH=. python benchmarks/bench_memory.py [--files N] [--messages N]
+
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import resource
+import tempfile
+import subprocess
+
+from corpus import build_workspace
+
+
+MODES = (
+  ('streaming', []),
+  ('retained', ['--retain-issues']))
+
+
+def measure(command):
+
+  """ Run one command as the only child of this process, returning its wall
+      time, peak RSS in KiB, and the number of issues it wrote. """
+
+  start = time.time()
+  with open(os.devnull, 'w') as devnull:
+    child = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=devnull)
+    issues = 0
+    for chunk in iter(lambda: child.stdout.read(1 << 16), ''):
+      issues += chunk.count('\0')
+    child.wait()
+  return time.time() - start, resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss, issues
+
+
+def main():
+
+  """ Build the workspace and report peak RSS for each mode. """
+
+  parser = argparse.ArgumentParser(description='Benchmark memory held by reported issues.')
+  parser.add_argument('--files', type=int, default=2841, help='number of protos')
+  parser.add_argument('--messages', type=int, default=50, help='number of messages per proto')
+  parser.add_argument('--measure', nargs=argparse.REMAINDER, help=argparse.SUPPRESS)
+  args = parser.parse_args()
+
+  if args.measure:
+    print(json.dumps(measure(args.measure)))
+    return 0
+
+  root = tempfile.mkdtemp(prefix='protolint-bench-')
+  try:
+    config = os.path.join(root, 'config.json')
+    with open(config, 'w') as fhandle:
+      json.dump({'include_paths': []}, fhandle)
+    workspace = os.path.join(root, 'workspace')
+    build_workspace(workspace, args.files, args.messages, violations=1.0)
+
+    for mode, flags in MODES:
+      command = [sys.executable, '-O', '-m', 'protolint', '--style-only', '--log-level', 'error'] + flags
+      elapsed, peak, issues = json.loads(subprocess.check_output(
+        [sys.executable, __file__, '--measure'] + command + [config, workspace]))
+      print("%-10s %8.3fs  %d issues  peak RSS %.1f MiB" % (mode, elapsed, issues, peak / 1024.0))
+  finally:
+    shutil.rmtree(root)
+  return 0
+
+
+if __name__ == '__main__':
+  sys.exit(main())
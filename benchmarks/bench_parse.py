@@ -0,0 +1,124 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+
+  benchmarks: parse
+  ~~~~~~~~~~~~~~~~~
+
+  Measures parse throughput, in lines per second, of `Linter.classify` over
+  recorded `protoc` and `protoc-gen-lint` output: over all recorded lines, and over the plugin's
+  lint lines alone, which dominate real output. With `--against REV`, the
+  parser from that git revision is measured on the same lines, for comparison,
+  skipping lines that either parser does not support.
+
+  Usage: PYTHONPATH=. python -O benchmarks/bench_parse.py [--lines N] [--against REV]
+
+"""
+
+import os
+import sys
+import time
+import shutil
+import argparse
+import tempfile
+import subprocess
+
+
+RECORDED = os.path.join(os.path.dirname(__file__), '..', 'protolint_tests', 'outputs', 'protoc.txt')
+UNLOADED = []
+
+
+def load_linter(revision):
+
+  """ Import `protolint.linter`, optionally as of a git revision. """
+
+  if revision:
+    root = tempfile.mkdtemp(prefix='protolint-bench-')
+    archive = subprocess.Popen(['git', 'archive', revision, 'protolint'], stdout=subprocess.PIPE)
+    subprocess.check_call(['tar', '-x', '-C', root], stdin=archive.stdout)
+    archive.wait()
+    sys.path.insert(0, root)
+    for name in list(sys.modules):
+      if name == 'protolint' or name.startswith('protolint.'):
+        UNLOADED.append(sys.modules.pop(name))  # keep alive, or their globals are cleared
+  from protolint import linter
+  return linter
+
+
+def parser_for(linter):
+
+  """ Build a parser over lines from a linter with no configuration: its
+      `classify` over each line, or its `__parse` method, for revisions from
+      before `protoc` output was classified line by line as it streams in. """
+
+  class Arguments(object):
+    pass
+
+  lint = linter.Linter(None, Arguments())
+  if hasattr(lint, '_Linter__parse'):
+    return getattr(lint, '_Linter__parse')
+  return lambda lines: (lint.classify(line) for line in lines)
+
+
+def supported(parse, lines):
+
+  """ Collect the distinct lines that a parser can handle. """
+
+  handled = set()
+  for line in set(lines):
+    try:
+      list(parse([line]))
+      handled.add(line)
+    except (ValueError, NotImplementedError):
+      pass
+  return handled
+
+
+def measure(parse, lines):
+
+  """ Parse the given lines a few times, reporting the best lines per second. """
+
+  best = None
+  for _ in range(3):
+    start = time.time()
+    for _ in parse(lines):
+      pass
+    elapsed = time.time() - start
+    best = elapsed if best is None else min(best, elapsed)
+  return len(lines) / best
+
+
+def main():
+
+  """ Replicate the recorded output and measure parse throughput. """
+
+  parser = argparse.ArgumentParser(description='Benchmark output parsing.')
+  parser.add_argument('--lines', type=int, default=200000, help='number of lines to parse')
+  parser.add_argument('--against', default=None, help='git revision to compare against')
+  args = parser.parse_args()
+
+  with open(RECORDED, 'r') as fhandle:
+    recorded = [line.rstrip('\n') for line in fhandle if line.strip()]
+
+  parsers = [('current', parser_for(load_linter(None)))]
+  if args.against:
+    parsers.append((args.against[:10], parser_for(load_linter(args.against))))
+
+  handled = set(recorded)
+  for _, parse in parsers:
+    handled &= supported(parse, recorded)
+
+  for label, sample in (('all', [line for line in recorded if line in handled]),
+                        ('lint', [line for line in recorded if line in handled and "' - " in line])):
+    lines = (sample * (args.lines // len(sample) + 1))[:args.lines]
+    rates = [measure(parse, lines) for _, parse in parsers]
+    for (name, _), rate in zip(parsers, rates):
+      print("%-5s %-10s %10.0f lines/s  (%d lines)" % (label, name, rate, len(lines)))
+    if len(rates) > 1:
+      print("%-5s speedup    %.1fx" % (label, rates[0] / rates[1]))
+  return 0
+
+
+if __name__ == '__main__':
+  sys.exit(main())
@@ -0,0 +1,89 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+
+  benchmarks: paths
+  ~~~~~~~~~~~~~~~~~
+
+  Compares `Linter.make_path_for_protofile` against the linear suffix scan it
+  replaced, resolving issue paths for a large synthetic workspace.
+
+  Usage: PYTHONPATH=. python benchmarks/bench_paths.py [--files N] [--issues N]
+
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import shutil
+import argparse
+import tempfile
+
+from protolint import config
+from protolint import linter
+
+
+def legacy_path(protofiles, workspace, protofile):
+
+  """ Resolve a path the way `make_path_for_protofile` used to. """
+
+  resolved_path = None
+  for path in protofiles:
+    if path.endswith(protofile):
+      resolved_path = path
+  resolved_path = resolved_path.replace(workspace, "")
+  if resolved_path.startswith("/"):
+    return "/".join(resolved_path.split("/")[1:])
+  return resolved_path
+
+
+def main():
+
+  """ Build the workspace, resolve every issue path both ways, report wall times. """
+
+  parser = argparse.ArgumentParser(description='Benchmark issue path resolution.')
+  parser.add_argument('--files', type=int, default=10000, help='number of protos in the workspace')
+  parser.add_argument('--issues', type=int, default=50000, help='number of issue paths to resolve')
+  args = parser.parse_args()
+
+  root = tempfile.mkdtemp(prefix='protolint-bench-')
+  try:
+    workspace = os.path.join(root, 'workspace')
+    names = ['pkg%03d/File%05d.proto' % (index // 100, index) for index in range(args.files)]
+    for name in names:
+      path = os.path.join(workspace, name)
+      if not os.path.isdir(os.path.dirname(path)):
+        os.makedirs(os.path.dirname(path))
+      open(path, 'w').close()
+
+    config_path = os.path.join(root, 'config.json')
+    with open(config_path, 'w') as fhandle:
+      json.dump({'include_paths': []}, fhandle)
+
+    lint = linter.Linter(config.LinterConfig(config_path, workspace), None)
+    lint.discover()
+    issues = [random.choice(names) for _ in range(args.issues)]
+
+    start = time.time()
+    indexed = [lint.make_path_for_protofile(name) for name in issues]
+    indexed_time = time.time() - start
+    print("index      %8.3fs  %d issues over %d files" % (indexed_time, len(issues), args.files))
+
+    sample = issues[:max(1, args.issues // 100)]
+    start = time.time()
+    legacy = [legacy_path(lint.protofiles, workspace, name) for name in sample]
+    legacy_time = (time.time() - start) * len(issues) / len(sample)
+    print("legacy     %8.3fs  (extrapolated from %d issues)" % (legacy_time, len(sample)))
+
+    assert legacy == indexed[:len(sample)], "index must resolve the same paths"
+    print("speedup    %.0fx" % (legacy_time / indexed_time))
+  finally:
+    shutil.rmtree(root)
+  return 0
+
+
+if __name__ == '__main__':
+  sys.exit(main())
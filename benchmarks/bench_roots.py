@@ -0,0 +1,99 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+
+  benchmarks: roots
+  ~~~~~~~~~~~~~~~~~
+
+  Times discovering and compiling a generated workspace configured with an
+  include path for each of its packages, nested in the workspace root that
+  is always included, the way `Linter.discover` used to, scanning every
+  include path and passing each one to `protoc`, and the way it does now.
+  `protoc` only writes a descriptor set, so no plugin is needed.
+
+  Usage: PYTHONPATH=. python benchmarks/bench_roots.py [--files N] [--protoc PATH]
+
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import tempfile
+import subprocess
+
+from corpus import build_workspace, FILES_PER_PACKAGE
+
+from protolint import config
+from protolint import linter
+from protolint import output
+from protolint import walker
+
+
+def legacy(settings, workspace):
+
+  """ Discover the way `Linter.discover` used to: every include path walked
+      on its own, and every one of them a proto path. """
+
+  proto_paths = [os.path.abspath(os.path.join(workspace, path)) for path in settings.include_paths]
+  protofiles = [path for proto_path in proto_paths for path in walker.walk(proto_path)]
+  return protofiles, proto_paths
+
+
+def compile_all(protoc, protofiles, proto_paths):
+
+  """ Run `protoc` over every protofile, returning its wall time and the
+      number of lines of errors it printed. """
+
+  command = [protoc, '-o', os.devnull] + ['--proto_path=%s' % path for path in proto_paths] + protofiles
+  start = time.time()
+  process = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.STDOUT)
+  printed = process.communicate()[0]
+  return time.time() - start, len(printed.splitlines())
+
+
+def main():
+
+  """ Build the workspace and report each way of discovering it. """
+
+  parser = argparse.ArgumentParser(description='Benchmark overlapping include paths.')
+  parser.add_argument('--files', type=int, default=4000, help='number of protos')
+  parser.add_argument('--messages', type=int, default=5, help='number of messages per proto')
+  parser.add_argument('--protoc', default='protoc', help='protoc binary to compile with')
+  args = parser.parse_args()
+
+  output.configure('critical')
+  root = tempfile.mkdtemp(prefix='protolint-bench-')
+  try:
+    workspace = os.path.join(root, 'workspace')
+    build_workspace(workspace, args.files, args.messages)
+    packages = ['pkg%04d' % index for index in range((args.files + FILES_PER_PACKAGE - 1) // FILES_PER_PACKAGE)]
+    config_path = os.path.join(root, 'config.json')
+    with open(config_path, 'w') as fhandle:
+      json.dump({'include_paths': packages}, fhandle)
+    settings = config.LinterConfig(config_path, workspace)
+
+    start = time.time()
+    protofiles, proto_paths = legacy(settings, workspace)
+    print("%-12s discover %8.3fs  %5d protos  %3d proto paths" % (
+      'legacy', time.time() - start, len(protofiles), len(proto_paths)))
+    print("%-12s protoc   %8.3fs  %5d lines of errors" % (
+      ('legacy',) + compile_all(args.protoc, protofiles, proto_paths)))
+
+    lint = linter.Linter(settings, None)
+    start = time.time()
+    protofiles = lint.discover()
+    print("%-12s discover %8.3fs  %5d protos  %3d proto paths" % (
+      'minimal', time.time() - start, len(protofiles), len(lint.proto_paths)))
+    print("%-12s protoc   %8.3fs  %5d lines of errors" % (
+      ('minimal',) + compile_all(args.protoc, protofiles, lint.proto_paths)))
+  finally:
+    shutil.rmtree(root)
+  return 0
+
+
+if __name__ == '__main__':
+  sys.exit(main())
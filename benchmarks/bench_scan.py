@@ -0,0 +1,97 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+
+  benchmarks: scan
+  ~~~~~~~~~~~~~~~~
+
+  Compares the in-process `protolint.walker` against the `find` subprocess
+  previously used by `Linter.__scan`, on a large synthetic tree that mimics
+  a monorepo with heavy, excluded `node_modules` and `bazel-out` trees.
+
+  Usage: PYTHONPATH=. python benchmarks/bench_scan.py [--dirs N] [--files N]
+
+"""
+
+import os
+import sys
+import time
+import shutil
+import argparse
+import tempfile
+import subprocess
+
+from protolint import walker
+
+
+EXCLUDED = ('node_modules', 'bazel-out')
+
+
+def build_tree(root, dirs, files):
+
+  """ Build a synthetic tree: `dirs` source directories of `files` protos each,
+      plus an equally sized tree of non-proto files under each excluded name. """
+
+  for index in range(dirs):
+    for parent, suffix in [('src', '.proto')] + [(name, '.js') for name in EXCLUDED]:
+      directory = os.path.join(root, parent, 'pkg%04d' % (index // 32), 'mod%04d' % index)
+      os.makedirs(directory)
+      for file_index in range(files):
+        open(os.path.join(directory, 'File%03d%s' % (file_index, suffix)), 'w').close()
+
+
+def scan_find(root):
+
+  """ Scan the way `Linter.__scan` used to: one `find` per root, buffered. """
+
+  return [line.strip() for line in subprocess.check_output(
+    ['find', root, '-name', '*.proto']).split('\n') if line.strip()]
+
+
+def scan_walker(root, prune):
+
+  """ Scan with the in-process walker, optionally pruning excluded trees. """
+
+  exclude = (lambda path: os.path.basename(path) in EXCLUDED) if prune else None
+  return list(walker.walk(root, exclude=exclude))
+
+
+def timed(label, func, *args):
+
+  """ Run `func` a few times and report the best wall time. """
+
+  best, result = None, None
+  for _ in range(3):
+    start = time.time()
+    result = func(*args)
+    elapsed = time.time() - start
+    best = elapsed if best is None else min(best, elapsed)
+  print("%-24s %8.3fs  %d protos" % (label, best, len(result)))
+  return best
+
+
+def main():
+
+  """ Build the tree, run each scanner, report wall times. """
+
+  parser = argparse.ArgumentParser(description='Benchmark proto discovery.')
+  parser.add_argument('--dirs', type=int, default=2000, help='number of source directories')
+  parser.add_argument('--files', type=int, default=10, help='number of files per directory')
+  args = parser.parse_args()
+
+  root = tempfile.mkdtemp(prefix='protolint-bench-')
+  try:
+    build_tree(root, args.dirs, args.files)
+    print("tree: %d dirs x %d files x %d trees, at %s" % (args.dirs, args.files, len(EXCLUDED) + 1, root))
+    baseline = timed('find', scan_find, root)
+    timed('walker', scan_walker, root, False)
+    pruned = timed('walker (pruned)', scan_walker, root, True)
+    print("speedup (pruned vs find): %.1fx" % (baseline / pruned))
+  finally:
+    shutil.rmtree(root)
+  return 0
+
+
+if __name__ == '__main__':
+  sys.exit(main())
@@ -0,0 +1,100 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+
+  benchmarks: server
+  ~~~~~~~~~~~~~~~~~~
+
+  Times `--style-only` lints of the generated corpus from `bench_jobs` as full
+  runs of `protolint`, against lints through `protolint serve`: the first,
+  cold one, repeats of an unchanged workspace, and a repeat after touching a
+  single proto. Requests are timed in-process, and as `protolint client` runs,
+  which also pay for starting Python.
+
+  Usage: PYTHONPATH=. python benchmarks/bench_server.py [--packages N] [--repeat N]
+
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import tempfile
+import subprocess
+
+from bench_jobs import build_corpus
+from protolint import server
+
+
+def timed(command):
+
+  """ Time one run of a command, discarding its output. """
+
+  start = time.time()
+  with open(os.devnull, 'w') as devnull:
+    subprocess.call(command, stdout=devnull, stderr=devnull)
+  return time.time() - start
+
+
+def main():
+
+  """ Build the corpus, start a server, and report wall time for each kind of lint. """
+
+  parser = argparse.ArgumentParser(description='Benchmark linting through a long-lived server.')
+  parser.add_argument('--packages', type=int, default=100, help='number of independent packages')
+  parser.add_argument('--files', type=int, default=10, help='number of files per package')
+  parser.add_argument('--messages', type=int, default=20, help='number of messages per file')
+  parser.add_argument('--repeat', type=int, default=5, help='number of repeated lints to time')
+  args = parser.parse_args()
+
+  root = tempfile.mkdtemp(prefix='protolint-bench-')
+  socket_path = os.path.join(root, 'protolint.sock')
+  daemon = None
+  try:
+    config = os.path.join(root, 'config.json')
+    with open(config, 'w') as fhandle:
+      json.dump({'include_paths': []}, fhandle)
+    corpus = os.path.join(root, 'corpus')
+    build_corpus(corpus, args.packages, args.files, args.messages)
+    arguments = ['--style-only', config, corpus]
+    request = {'command': 'lint', 'cwd': root, 'arguments': arguments}
+
+    print("%-16s %8.3fs" % ('cli', timed([sys.executable, '-O', '-m', 'protolint'] + arguments)))
+
+    with open(os.devnull, 'w') as devnull:
+      daemon = subprocess.Popen([sys.executable, '-O', '-m', 'protolint', 'serve', '--socket', socket_path],
+                                stdout=devnull, stderr=devnull)
+    while not os.path.exists(socket_path):
+      time.sleep(0.01)
+
+    def lint(label):
+      start = time.time()
+      status, _ = server.request(socket_path, request)
+      print("%-16s %8.3fs  (server %.3fs, %s issues)" % (label, time.time() - start, status['elapsed'], status['issues']))
+
+    lint('cold')
+    for _ in range(args.repeat):
+      lint('unchanged')
+    for _ in range(args.repeat):
+      print("%-16s %8.3fs" % ('unchanged client', timed(
+        [sys.executable, '-O', '-m', 'protolint', 'client', '--socket', socket_path] + arguments)))
+
+    for directory, _, filenames in os.walk(corpus):
+      if filenames:
+        with open(os.path.join(directory, sorted(filenames)[0]), 'a') as fhandle:
+          fhandle.write('\n// touched\n')
+        break
+    lint('one changed')
+  finally:
+    if daemon:
+      server.request(socket_path, {'command': 'shutdown'})
+      daemon.wait()
+    shutil.rmtree(root)
+  return 0
+
+
+if __name__ == '__main__':
+  sys.exit(main())
@@ -0,0 +1,120 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+
+  benchmarks: sink
+  ~~~~~~~~~~~~~~~~
+
+  Writes a stream of CodeClimate issue documents the way `output.issue` used
+  to (`print`, per issue) and through `protolint.sink`, into `/dev/null` and
+  into a slow reader, reporting wall and CPU time for each. Encoding is timed
+  separately, with `json` and with `ujson` when it is installed, since it
+  costs far more than writing.
+
+  Usage: PYTHONPATH=. python -O benchmarks/bench_sink.py [--issues N]
+
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import subprocess
+
+from protolint import sink
+
+
+SLOW_READER = "import sys, time\nwhile sys.stdin.read(16384):\n  time.sleep(0.0005)\n"
+
+
+def exported(index):
+
+  """ Build an exported issue, shaped like `Issue.export`. """
+
+  return {
+    "type": "issue",
+    "check_name": "Style/Message Case",
+    "description": "Use CamelCase (with an initial capital) for message names.",
+    "categories": ["Style"],
+    "severity": "minor",
+    "fingerprint": "%064x" % index,
+    "location": {
+      "path": "protos/pkg%04d/File%02d.proto" % (index // 100, index % 100),
+      "positions": {
+        "begin": {"line": index % 500 + 1, "column": 9},
+        "end": {"line": index % 500 + 1, "column": 9}}}}
+
+
+def write_print(stream, documents):
+
+  """ Write documents the way `output.issue` used to. """
+
+  for document in documents:
+    print >> stream, document
+  stream.flush()
+
+
+def write_sink(stream, documents):
+
+  """ Write documents through a buffered sink. """
+
+  writer = sink.IssueSink(stream)
+  for document in documents:
+    writer.write(document)
+  writer.flush()
+
+
+def encode(dumps, issues):
+
+  """ Encode every issue, returning the documents and the CPU seconds taken. """
+
+  start = time.clock()
+  documents = [dumps(issue) + "\0" for issue in issues]
+  return documents, time.clock() - start
+
+
+def timed(target, writer, documents):
+
+  """ Run a writer against a target, returning wall and CPU seconds. """
+
+  if target == 'devnull':
+    reader, stream = None, open(os.devnull, 'w')
+  else:
+    reader = subprocess.Popen([sys.executable, '-c', SLOW_READER], stdin=subprocess.PIPE)
+    stream = reader.stdin
+
+  start, cpu = time.time(), os.times()
+  writer(stream, documents)
+  stream.close()
+  if reader:
+    reader.wait()
+  finish = os.times()
+  return time.time() - start, (finish[0] - cpu[0]) + (finish[1] - cpu[1])
+
+
+def main():
+
+  """ Time each writer against each target. """
+
+  parser = argparse.ArgumentParser(description='Benchmark the issue output sink.')
+  parser.add_argument('--issues', type=int, default=100000, help='number of issues to write')
+  args = parser.parse_args()
+
+  issues = [exported(index) for index in range(args.issues)]
+  documents, cpu = encode(json.dumps, issues)
+  print("%-12s %-6s cpu %7.3fs" % ('encode', 'json', cpu))
+  if sink.ujson:
+    _, cpu = encode(sink.dumps, issues)
+    print("%-12s %-6s cpu %7.3fs" % ('encode', 'ujson', cpu))
+
+  for target in ('devnull', 'slow-reader'):
+    for label, writer in (('print', write_print), ('sink', write_sink)):
+      wall, cpu = timed(target, writer, documents)
+      print("%-12s %-6s cpu %7.3fs  wall %7.3fs" % (target, label, cpu, wall))
+  return 0
+
+
+if __name__ == '__main__':
+  sys.exit(main())
@@ -0,0 +1,78 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+
+  benchmarks: style
+  ~~~~~~~~~~~~~~~~~
+
+  Times full `protolint` runs through `protoc` and `protoc-gen-lint`, against
+  `--style-only` runs of the in-process style checker, in-process and across
+  a process pool, over the `protolint_tests/protos` fixtures and over the
+  generated corpus from `bench_jobs`.
+
+  Usage: PYTHONPATH=. python benchmarks/bench_style.py [--packages N] [--jobs N]
+
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import tempfile
+import subprocess
+import multiprocessing
+
+from bench_jobs import build_corpus
+
+
+def run(config, workspace, flags):
+
+  """ Time one full run of the linter with the given flags. """
+
+  start = time.time()
+  with open(os.devnull, 'w') as devnull:
+    subprocess.call([sys.executable, '-O', '-m', 'protolint'] + flags + [config, workspace],
+                    stdout=devnull, stderr=devnull)
+  return time.time() - start
+
+
+def main():
+
+  """ Build the corpus and report wall time for each mode. """
+
+  parser = argparse.ArgumentParser(description='Benchmark the in-process style checker.')
+  parser.add_argument('--packages', type=int, default=200, help='number of independent packages')
+  parser.add_argument('--files', type=int, default=10, help='number of files per package')
+  parser.add_argument('--messages', type=int, default=20, help='number of messages per file')
+  parser.add_argument('--jobs', type=int, default=multiprocessing.cpu_count(), help='processes for the pooled run')
+  args = parser.parse_args()
+
+  root = tempfile.mkdtemp(prefix='protolint-bench-')
+  try:
+    config = os.path.join(root, 'config.json')
+    with open(config, 'w') as fhandle:
+      json.dump({'include_paths': []}, fhandle)
+
+    corpus = os.path.join(root, 'corpus')
+    build_corpus(corpus, args.packages, args.files, args.messages)
+
+    modes = (('protoc', []),
+             ('style', ['--style-only']),
+             ('style -j%d' % args.jobs, ['--style-only', '--jobs', str(args.jobs)]))
+
+    for label, workspace in (('fixtures', 'protolint_tests/protos'), ('corpus', corpus)):
+      baseline = None
+      for mode, flags in modes:
+        elapsed = run(config, workspace, flags)
+        baseline = baseline or elapsed
+        print("%-10s %-12s %8.3fs  speedup %.2fx" % (label, mode, elapsed, baseline / elapsed))
+  finally:
+    shutil.rmtree(root)
+  return 0
+
+
+if __name__ == '__main__':
+  sys.exit(main())
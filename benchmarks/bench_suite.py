@@ -0,0 +1,231 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+
+  benchmarks: suite
+  ~~~~~~~~~~~~~~~~~
+
+  Times every stage of the `Linter` at several workspace sizes, over
+  workspaces from `corpus`: scanning, one `protoc` run over every proto,
+  classifying its output, the in-process style checker, and exporting
+  issues. Each size
+  is measured in a fresh process, recording wall time, peak RSS and issues
+  per second for each stage, and results are written as JSON. Given a
+  stored baseline, written by `--save` on an earlier run, every stage is
+  compared against it and regressions beyond `--tolerance` are reported,
+  and fail the run.
+
+  Stages that need `protoc-gen-lint` are skipped if it is not on `PATH`.
+
+  Usage: PYTHONPATH=. python benchmarks/bench_suite.py [--sizes N,N,...] [--messages N]
+                                                        [--baseline FILE] [--save FILE]
+
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import platform
+import resource
+import tempfile
+import subprocess
+from distutils.spawn import find_executable
+
+from corpus import build_workspace
+
+
+STAGES = ('scan', 'execute', 'parse', 'style', 'export')
+NOISE = 0.05  # seconds, below which stages are too quick to compare
+
+
+def peak_rss():
+
+  """ Peak resident set size of this process and of its finished children, in kilobytes. """
+
+  return (resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+          resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss)
+
+
+def measure(config_path, workspace):
+
+  """ Run each stage of a linter over a workspace, in this process.
+
+      :returns: Dictionary of stage names to their timings, counts and peak RSS. """
+
+  from protolint import cli
+  from protolint import config
+  from protolint import linter
+  from protolint import protoc
+
+  arguments = cli.parser.parse_args([config_path, workspace])
+  lint = linter.Linter(config.LinterConfig(config_path, workspace), arguments)
+  stages = {}
+
+  def stage(name, func, count):
+    start = time.time()
+    result = func()
+    elapsed = time.time() - start
+    rss, children = peak_rss()
+    stages[name] = {'seconds': round(elapsed, 6), 'items': count(result),
+                    'peak_rss_kb': rss, 'children_peak_rss_kb': children}
+    return result
+
+  protofiles = stage('scan', lint.discover, len)
+
+  def classify(lines):
+    for line in lines:
+      try:
+        yield lint.classify(line)
+      except (NotImplementedError, ValueError):
+        pass  # skipped when linting too, unless it names a proto
+
+  issues = []
+  if find_executable('protoc-gen-lint'):
+    command = getattr(lint, '_Linter__command')(['protoc'], protofiles)
+    try:
+      lines = stage('execute', lambda: list(getattr(lint, '_Linter__run')(command)), len)
+    except (OSError, protoc.Failure) as e:
+      stages['execute'] = {'error': str(e)}  # like a command line too long for the workspace
+    else:
+      issues = stage('parse', lambda: list(classify(lines)), len)
+  issues += stage('style', lambda: list(getattr(lint, '_Linter__lint_style')(protofiles)), len)
+  stage('export', lambda: [issue(lint.make_path_for_protofile) for issue in issues], len)
+
+  for name in ('parse', 'style', 'export'):
+    if name in stages:
+      stages[name]['issues_per_second'] = round(stages[name]['items'] / max(stages[name]['seconds'], 1e-9))
+  return stages
+
+
+def run_size(root, files, args):
+
+  """ Build a workspace of a size, then measure it in a fresh process, once
+      per repeat, keeping the quickest time of each stage. """
+
+  workspace = os.path.join(root, 'workspace-%d' % files)
+  planted = build_workspace(workspace, files, args.messages, args.depth, args.fanout,
+                            args.violations, args.errors, args.seed)
+
+  config_path = os.path.join(root, 'config.json')
+  with open(config_path, 'w') as fhandle:
+    json.dump({'include_paths': []}, fhandle)
+
+  best = {}
+  for _ in range(args.repeat):
+    measured = json.loads(subprocess.check_output(
+      [sys.executable, '-O', __file__, '--measure', config_path, workspace]))
+    for name, result in measured.items():
+      if name not in best or result['seconds'] < best[name]['seconds']:
+        best[name] = result
+
+  for name, result in best.items():
+    if 'error' in result:
+      sys.stderr.write("files=%-7d %-8s failed: %s\n" % (files, name, result['error']))
+      del best[name]
+
+  total = sum(result['seconds'] for result in best.values())
+  issues = best['export']['items']
+  return {
+    'files': files,
+    'planted': planted,
+    'stages': best,
+    'seconds': round(total, 6),
+    'issues': issues,
+    'issues_per_second': round(issues / max(total, 1e-9)),
+    'peak_rss_kb': max(result['peak_rss_kb'] for result in best.values()),
+    'children_peak_rss_kb': max(result['children_peak_rss_kb'] for result in best.values())}
+
+
+def compare(results, baseline, tolerance):
+
+  """ Compare results against a baseline, reporting each stage both measured on `stderr`.
+
+      :returns: Number of regressions, stages slower or larger than `tolerance` allows. """
+
+  regressions = 0
+  previous = dict((size['files'], size) for size in baseline['sizes'])
+  for size in results['sizes']:
+    before = previous.get(size['files'])
+    if before is None:
+      continue
+    for name in STAGES:
+      if name not in size['stages'] or name not in before['stages']:
+        continue
+      now, then = size['stages'][name]['seconds'], before['stages'][name]['seconds']
+      ratio = now / max(then, 1e-9)
+      regressed = ratio > 1 + tolerance and max(now, then) > NOISE
+      regressions += regressed
+      sys.stderr.write("files=%-7d %-8s %8.3fs -> %8.3fs  %5.2fx%s\n" % (
+        size['files'], name, then, now, ratio, '  REGRESSION' if regressed else ''))
+    ratio = size['peak_rss_kb'] / float(max(before['peak_rss_kb'], 1))
+    regressed = ratio > 1 + tolerance
+    regressions += regressed
+    sys.stderr.write("files=%-7d %-8s %8dK -> %8dK  %5.2fx%s\n" % (
+      size['files'], 'rss', before['peak_rss_kb'], size['peak_rss_kb'], ratio, '  REGRESSION' if regressed else ''))
+  return regressions
+
+
+def main():
+
+  """ Measure each size, report results as JSON, and compare them against a baseline. """
+
+  parser = argparse.ArgumentParser(description='Benchmark every stage of the linter at several sizes.')
+  parser.add_argument('--sizes', default='100,1000,5000', help='comma-separated numbers of protos')
+  parser.add_argument('--messages', type=int, default=10, help='number of messages per proto')
+  parser.add_argument('--depth', type=int, default=3, help='longest chain of imports')
+  parser.add_argument('--fanout', type=int, default=2, help='imports per proto')
+  parser.add_argument('--violations', type=float, default=0.02, help='ratio of names breaking style rules')
+  parser.add_argument('--errors', type=float, default=0.0, help='ratio of protos failing to compile')
+  parser.add_argument('--seed', type=int, default=0, help='seed for the generator')
+  parser.add_argument('--repeat', type=int, default=1, help='measurements per size, keeping the quickest')
+  parser.add_argument('--output', default=None, help='file to write results to, instead of stdout')
+  parser.add_argument('--baseline', default=None, help='results of an earlier run to compare against')
+  parser.add_argument('--save', default=None, help='file to store results in, as a baseline for later runs')
+  parser.add_argument('--tolerance', type=float, default=0.2, help='slowdown ratio tolerated before failing')
+  parser.add_argument('--measure', nargs=2, metavar=('CONFIG', 'WORKSPACE'), help=argparse.SUPPRESS)
+  args = parser.parse_args()
+
+  if args.measure:
+    print(json.dumps(measure(*args.measure)))
+    return 0
+
+  root = tempfile.mkdtemp(prefix='protolint-bench-')
+  try:
+    results = {
+      'python': platform.python_version(),
+      'platform': platform.platform(),
+      'plugin': bool(find_executable('protoc-gen-lint')),
+      'messages': args.messages,
+      'depth': args.depth,
+      'fanout': args.fanout,
+      'violations': args.violations,
+      'errors': args.errors,
+      'sizes': [run_size(root, int(files), args) for files in args.sizes.split(',')]}
+  finally:
+    shutil.rmtree(root)
+
+  document = json.dumps(results, indent=2, sort_keys=True)
+  if args.output:
+    with open(args.output, 'w') as fhandle:
+      fhandle.write(document + '\n')
+  else:
+    print(document)
+  if args.save:
+    with open(args.save, 'w') as fhandle:
+      fhandle.write(document + '\n')
+
+  if args.baseline:
+    with open(args.baseline, 'r') as fhandle:
+      regressions = compare(results, json.load(fhandle), args.tolerance)
+    if regressions:
+      sys.stderr.write("%d regressions against %s\n" % (regressions, args.baseline))
+      return 1
+  return 0
+
+
+if __name__ == '__main__':
+  sys.exit(main())
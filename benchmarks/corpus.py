@@ -0,0 +1,134 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+
+  benchmarks: corpus
+  ~~~~~~~~~~~~~~~~~~
+
+  Generates synthetic workspaces to lint: any number of protos, of any
+  number of messages each, importing each other in layers of configurable
+  depth and fan-out, with a chosen density of style violations and of
+  compile errors planted in them. Generation is seeded, so the same
+  arguments always build the same workspace.
+
+  Usage: python benchmarks/corpus.py ROOT [--files N] [--messages N] [--depth N] [--fanout N]
+                                          [--violations RATIO] [--errors RATIO] [--seed N]
+
+"""
+
+import os
+import sys
+import json
+import random
+import argparse
+
+
+FILES_PER_PACKAGE = 100
+FIELDS_PER_MESSAGE = 6
+
+
+def proto_name(index):
+
+  """ Name of the proto at an index, as imported from the workspace root. """
+
+  return 'pkg%04d/File%05d.proto' % (index // FILES_PER_PACKAGE, index)
+
+
+def build_workspace(root, files, messages, depth=3, fanout=2, violations=0.0, errors=0.0, seed=0):
+
+  """ Build a synthetic workspace. Protos are spread over `depth + 1` layers,
+      and each proto outside the first layer imports up to `fanout` protos of
+      the layer below it, using a message of each, so no import is unused.
+
+      :param root: Directory to build the workspace in, created if missing.
+      :param files: Number of protos.
+      :param messages: Number of messages per proto, each with a few fields, alongside one enum.
+      :param depth: Longest chain of imports.
+      :param fanout: Imports per proto, outside the first layer.
+      :param violations: Ratio of names, of messages, fields, enums and enum values, breaking style rules.
+      :param errors: Ratio of protos with a field of an undefined type, which fails compilation.
+      :param seed: Seed for choosing imports, violations and errors.
+      :returns: Dictionary of counts of protos, imports, planted violations and planted errors. """
+
+  generator = random.Random(seed)
+  layers = [[] for _ in range(depth + 1)]
+  stats = {'files': files, 'imports': 0, 'violations': 0, 'errors': 0}
+
+  def named(good, bad):
+    if generator.random() < violations:
+      stats['violations'] += 1
+      return bad
+    return good
+
+  for index in range(files):
+    layer = index % (depth + 1)
+    package = 'pkg%04d' % (index // FILES_PER_PACKAGE)
+    below = layers[layer - 1] if layer else []
+    imported = generator.sample(below, min(fanout, len(below)))
+    layers[layer].append(index)
+    stats['imports'] += len(imported)
+
+    lines = ['syntax = "proto3";', '', 'package %s;' % package, '']
+    lines.extend('import "%s";' % proto_name(dependency) for dependency in sorted(imported))
+    if imported:
+      lines.append('')
+
+    enum = named('File%05dKind' % index, 'file%05dKind' % index)
+    lines.append('enum %s {' % enum)
+    lines.append('  %s = 0;' % named('FILE%05d_UNKNOWN' % index, 'file%05d_unknown' % index))
+    lines.append('  %s = 1;' % named('FILE%05d_KNOWN' % index, 'File%05dKnown' % index))
+    lines.append('}')
+
+    for message in range(messages):
+      lines.append('')
+      good = 'File%05dMessage%03d' % (index, message)
+      # importers use the first message, so it keeps its name
+      lines.append('message %s {' % (named(good, good[0].lower() + good[1:]) if message else good))
+      number = 1
+      for field in range(FIELDS_PER_MESSAGE):
+        lines.append('  string %s = %d;' % (named('field_%02d' % field, 'field%02dValue' % field), number))
+        number += 1
+      lines.append('  %s kind = %d;' % (enum, number))
+      number += 1
+      for dependency in imported[message::messages]:
+        lines.append('  pkg%04d.File%05dMessage000 dependency_%05d = %d;' % (
+          dependency // FILES_PER_PACKAGE, dependency, dependency, number))
+        number += 1
+      if message == 0 and generator.random() < errors:
+        stats['errors'] += 1
+        lines.append('  Undefined%05d broken = %d;' % (index, number))
+      lines.append('}')
+
+    path = os.path.join(root, proto_name(index))
+    if not os.path.isdir(os.path.dirname(path)):
+      os.makedirs(os.path.dirname(path))
+    with open(path, 'w') as fhandle:
+      fhandle.write('\n'.join(lines) + '\n')
+
+  return stats
+
+
+def main():
+
+  """ Build a workspace and report what was planted in it. """
+
+  parser = argparse.ArgumentParser(description='Generate a synthetic proto workspace.')
+  parser.add_argument('root', help='directory to build the workspace in')
+  parser.add_argument('--files', type=int, default=1000, help='number of protos')
+  parser.add_argument('--messages', type=int, default=20, help='number of messages per proto')
+  parser.add_argument('--depth', type=int, default=3, help='longest chain of imports')
+  parser.add_argument('--fanout', type=int, default=2, help='imports per proto')
+  parser.add_argument('--violations', type=float, default=0.0, help='ratio of names breaking style rules')
+  parser.add_argument('--errors', type=float, default=0.0, help='ratio of protos failing to compile')
+  parser.add_argument('--seed', type=int, default=0, help='seed for the generator')
+  args = parser.parse_args()
+
+  stats = build_workspace(args.root, args.files, args.messages, args.depth, args.fanout,
+                          args.violations, args.errors, args.seed)
+  print(json.dumps(stats, sort_keys=True))
+  return 0
+
+
+if __name__ == '__main__':
+  sys.exit(main())
@@ -11,9 +11,14 @@ import sys
 import pprint
 
 from . import cli
+from . import baseline
+from . import batch
 from . import config
 from . import linter
 from . import output
+from . import profile
+from . import server
+from . import watch
 
 
 # declare globals
@@ -26,7 +31,20 @@ def run_tool():
 
   global linter_config
 
+  # `protolint serve` and `protolint client` run a long-lived server, and talk to it
+  if sys.argv[1:2] == ['serve']:
+    output.configure()
+    sys.exit(server.serve(cli.serve_parser.parse_args(sys.argv[2:]).socket))
+  if sys.argv[1:2] == ['client']:
+    output.configure()
+    sys.exit(server.client(sys.argv[2:]))
+
+  # `protolint batch` lints every workspace in a manifest, in this process
+  if sys.argv[1:2] == ['batch']:
+    sys.exit(batch.run(sys.argv[2:]))
+
   args = cli.parser.parse_args()
+  output.configure(args.log_level or output.DEFAULT_LEVEL, args.log_queue)
 
   if not args.config:  # pragma: no cover
     output.error("Must provide argument 'config'. See --help for more.")
@@ -35,17 +53,49 @@ def run_tool():
     output.error("Must provide argument 'workspace'. See --help for more.")
     sys.exit(1)
 
+  if args.write_baseline and not args.baseline:  # pragma: no cover
+    output.error("Must provide '--baseline' to write to with '--write-baseline'.")
+    sys.exit(1)
+
+  if args.profile:
+    profile.enable()
+
+  try:
+    output.open_issues(args.format, args.output)
+  except (ValueError, IOError) as e:
+    output.error('Unable to write issues: %s', e)
+    sys.exit(1)
+
   filepath, workspace = (args.config, args.workspace)
 
-  output.info('Preparing to scan workspace "%s"...' % workspace)
+  output.info('Preparing to scan workspace "%s"...', workspace)
   linter_config = config.LinterConfig(filepath, workspace)
 
+  if not args.log_level and linter_config.log_level:
+    try:
+      output.set_level(linter_config.log_level)
+    except ValueError as e:
+      output.error('Invalid "log_level" in config: %s', e)
+      sys.exit(1)
+
+  if args.baseline and not args.write_baseline:
+    try:
+      baseline.Baseline(args.baseline).close()
+    except (IOError, ValueError) as e:
+      output.error('Unable to load baseline "%s": %s', args.baseline, e)
+      sys.exit(1)
+
   protolint = linter.Linter(linter_config, args)
 
+  if args.watch:
+    sys.exit(watch.run(protolint, args))
+
   for issue in protolint():
-    issue.write()
+    issue.write(protolint.make_path_for_protofile)
+  output.flush()
 
-  output.info('All done.')
+  summary = protolint.summary
+  output.info('All done, with %s issues in %s protos.', summary.total, len(summary.files))
   sys.exit(0)
 
 if __name__ == "__main__": run_tool()
@@ -0,0 +1,112 @@
+# -*- coding: utf-8 -*-
+
+"""
+
+  protolint: baseline
+  ~~~~~~~~~~~~~~~~~~~
+
+"""
+
+import os
+import mmap
+import struct
+import tempfile
+
+
+MAGIC = "PLBASE01"
+DIGEST_SIZE = 32  # bytes in a sha256 fingerprint
+BUCKETS = 1 << 16  # buckets in the index, keyed by the first two bytes of a fingerprint
+
+# file layout: magic, then `BUCKETS + 1` offsets into the fingerprints, then the sorted fingerprints
+INDEX = struct.Struct('<%sI' % (BUCKETS + 1))
+HEADER_SIZE = len(MAGIC) + INDEX.size
+
+
+def write(path, fingerprints):
+
+  """ Write a baseline file holding a set of issue fingerprints.
+
+      :param path: Path to write the baseline to.
+      :param fingerprints: Iterable of hex fingerprints, from `unique_hash`.
+      :returns: Number of distinct fingerprints written. """
+
+  digests = sorted(set(fingerprint.decode('hex') for fingerprint in fingerprints))
+
+  offsets = [0] * (BUCKETS + 1)
+  for digest in digests:
+    offsets[(ord(digest[0]) << 8 | ord(digest[1])) + 1] += 1
+  for bucket in range(BUCKETS):
+    offsets[bucket + 1] += offsets[bucket]
+
+  # write to a temporary file first, so a run reading the baseline never sees a partial one
+  directory = os.path.dirname(os.path.abspath(path))
+  descriptor, temporary = tempfile.mkstemp(dir=directory)
+  with os.fdopen(descriptor, 'wb') as fhandle:
+    fhandle.write(MAGIC)
+    fhandle.write(INDEX.pack(*offsets))
+    fhandle.write(''.join(digests))
+  os.rename(temporary, path)
+  return len(digests)
+
+
+class Baseline(object):
+
+  """ Set of known issue fingerprints, memory-mapped from a baseline file so it
+      loads in constant time, however many fingerprints it holds. Fingerprints
+      are bucketed by their first two bytes, so a lookup reads one pair of
+      offsets and searches a bucket of a handful of fingerprints. """
+
+  __slots__ = ('path', 'mapped', 'count')
+
+  def __init__(self, path):
+
+    """ Open a baseline file written by `write`.
+
+        :param path: Path to the baseline file.
+        :raises IOError: If the file cannot be read.
+        :raises ValueError: If the file is not a baseline. """
+
+    self.path = path
+    with open(path, 'rb') as fhandle:
+      if os.fstat(fhandle.fileno()).st_size < HEADER_SIZE:
+        raise ValueError('not a baseline file: "%s"' % path)  # empty files cannot even be mapped
+      self.mapped = mmap.mmap(fhandle.fileno(), 0, access=mmap.ACCESS_READ)
+
+    if len(self.mapped) < HEADER_SIZE or self.mapped[:len(MAGIC)] != MAGIC:
+      raise ValueError('not a baseline file: "%s"' % path)
+    self.count = (len(self.mapped) - HEADER_SIZE) // DIGEST_SIZE
+
+  def __len__(self):
+
+    """ Number of fingerprints in the baseline. """
+
+    return self.count
+
+  def __contains__(self, fingerprint):
+
+    """ Check whether a fingerprint is in the baseline.
+
+        :param fingerprint: Hex fingerprint, from `unique_hash`.
+        :returns: `True` if the fingerprint is known. """
+
+    digest = fingerprint.decode('hex')
+    bucket = ord(digest[0]) << 8 | ord(digest[1])
+    low, high = struct.unpack_from('<II', self.mapped, len(MAGIC) + 4 * bucket)
+
+    while low < high:
+      middle = (low + high) // 2
+      start = HEADER_SIZE + middle * DIGEST_SIZE
+      candidate = self.mapped[start:start + DIGEST_SIZE]
+      if candidate < digest:
+        low = middle + 1
+      elif candidate > digest:
+        high = middle
+      else:
+        return True
+    return False
+
+  def close(self):
+
+    """ Unmap the baseline file. """
+
+    self.mapped.close()
@@ -0,0 +1,204 @@
+# -*- coding: utf-8 -*-
+
+"""
+
+  protolint: batch
+  ~~~~~~~~~~~~~~~~
+
+"""
+
+import os
+import json
+import time
+import argparse
+import threading
+from multiprocessing.pool import ThreadPool
+
+from . import cli
+from . import baseline
+from . import sink
+from . import config
+from . import linter
+from . import output
+from . import profile
+
+
+class Entry(object):
+
+  """ One workspace listed in a batch manifest. """
+
+  __slots__ = ('name', 'config', 'workspace')
+
+  def __init__(self, name, config, workspace):
+
+    """ Describe a workspace to lint.
+
+        :param name: Unique name, tagging each issue of the workspace.
+        :param config: Absolute path to its config file.
+        :param workspace: Absolute path to the workspace. """
+
+    self.name = name
+    self.config = config
+    self.workspace = workspace
+
+
+def load(path):
+
+  """ Read a batch manifest: a JSON list of `[config, workspace]` pairs, or of
+      objects with `config`, `workspace` and optionally `name` keys. Relative
+      paths are relative to the manifest, and workspaces are named after their
+      directory unless named, with a numeric suffix where names collide.
+
+      :param path: Path to the manifest.
+      :returns: List of `Entry` objects, in manifest order.
+      :raises ValueError: If the manifest is malformed. """
+
+  with open(path, 'r') as fhandle:
+    listed = json.load(fhandle)
+  if not isinstance(listed, list):
+    raise ValueError('manifest must be a list of workspaces')
+
+  base = os.path.dirname(os.path.abspath(path))
+  entries, names = [], set()
+  for index, item in enumerate(listed):
+    if isinstance(item, dict):
+      config_path, workspace, name = item.get('config'), item.get('workspace'), item.get('name')
+    elif isinstance(item, list) and len(item) == 2:
+      (config_path, workspace), name = item, None
+    else:
+      raise ValueError('workspace %s of the manifest is not a [config, workspace] pair' % index)
+    if not config_path or not workspace:
+      raise ValueError('workspace %s of the manifest is missing its config or workspace path' % index)
+
+    workspace = os.path.normpath(os.path.join(base, workspace))
+    name = candidate = name or os.path.basename(workspace)
+    suffix = 2
+    while candidate in names:
+      candidate = '%s-%s' % (name, suffix)
+      suffix += 1
+    names.add(candidate)
+    entries.append(Entry(candidate, os.path.join(base, config_path), workspace))
+  return entries
+
+
+def tagged(issue, name, resolve):
+
+  """ Serialize an issue for CodeClimate, tagged with the name of its workspace.
+
+      :param issue: `linter.Issue` or `linter.Error` object.
+      :param name: Name of the workspace.
+      :param resolve: Function resolving a protofile name to its path in the workspace.
+      :returns: Serialized document, or `None` for issues that are not reported. """
+
+  if issue.type == linter.Linter.Errors.fileNotFound:
+    return None
+  exported = issue.export(resolve)
+  exported["workspace"] = name
+  return issue.serialize(exported)
+
+
+def lint(entry, template, write):
+
+  """ Lint one workspace, writing each of its issues as it is found.
+
+      :param entry: `Entry` of the workspace.
+      :param template: Parsed `cli.parser` arguments shared by every workspace.
+      :param write: Function writing a serialized document.
+      :returns: Tuple of the exit status and the number of issues written. """
+
+  arguments = argparse.Namespace(**vars(template))
+  arguments.config, arguments.workspace = entry.config, entry.workspace
+
+  start, status, count = time.time(), 0, 0
+  try:
+    protolint = linter.Linter(config.LinterConfig(entry.config, entry.workspace), arguments)
+    for issue in protolint():
+      document = tagged(issue, entry.name, protolint.make_path_for_protofile)
+      if document:
+        write(document)
+        count += 1
+  except SystemExit as e:
+    # the linter exits early when there is nothing to lint, or something crashed
+    status = e.code or 0
+  except Exception as e:
+    output.error('Failed to lint workspace "%s": %r', entry.name, e)
+    status = 1
+
+  output.info('Linted workspace "%s" in %.3fs, with %s issues.', entry.name, time.time() - start, count)
+  return status, count
+
+
+def run(argv):
+
+  """ Lint every workspace in a manifest, in this process, several at once.
+      Issues are tagged with the name of their workspace, and written either
+      to `stdout`, all of them in one stream, or to one file per workspace.
+      Everything but the workspaces is shared: the interpreter, the compiled
+      output patterns, and with `--cache`, the result cache.
+
+      :param argv: Arguments for `cli.batch_parser`, followed by those of `cli.parser`.
+      :returns: Exit status, `1` if any workspace failed. """
+
+  arguments, forwarded = cli.batch_parser.parse_known_args(argv)
+  template = cli.parser.parse_args(forwarded + ['', ''])  # the manifest provides config and workspace
+  if template.cache:
+    template.cache = os.path.abspath(template.cache)  # shared, rather than relative to each workspace
+  output.configure(template.log_level or output.DEFAULT_LEVEL, template.log_queue)
+  if template.profile:
+    profile.enable()
+  if template.watch or template.write_baseline:
+    output.error('Batches cannot be run with --watch or --write-baseline.')
+    return 1
+  try:
+    output.open_issues(template.format, None if arguments.output_dir else arguments.output)
+  except (ValueError, IOError) as e:
+    output.error('Unable to write issues: %s', e)
+    return 1
+
+  if template.baseline:
+    try:
+      baseline.Baseline(template.baseline).close()
+    except (IOError, ValueError) as e:
+      output.error('Unable to load baseline "%s": %s', template.baseline, e)
+      return 1
+
+  try:
+    entries = load(arguments.manifest)
+  except (IOError, ValueError) as e:
+    output.error('Unable to load manifest "%s": %s', arguments.manifest, e)
+    return 1
+
+  lock = threading.Lock()
+  extension = sink.FORMATS[template.format][1]
+
+  def run_entry(entry):
+    if not arguments.output_dir:
+      def write(document):
+        with lock:
+          output.write(document)
+      return lint(entry, template, write)
+
+    with open(os.path.join(arguments.output_dir, entry.name + extension), 'wb') as fhandle:
+      writer = sink.IssueSink(fhandle)
+      try:
+        return lint(entry, template, writer.write)
+      finally:
+        writer.close()
+
+  if arguments.output_dir and not os.path.isdir(arguments.output_dir):
+    os.makedirs(arguments.output_dir)
+
+  linter.Linter.Classifier = linter.Linter.Classifier or linter.Linter.compile_patterns(linter.Linter.Patterns)
+  pool = ThreadPool(max(1, min(arguments.workers, len(entries))))
+  try:
+    results = pool.map(run_entry, entries)
+  finally:
+    pool.terminate()
+  output.close_issues()
+
+  failed = [entry.name for entry, (status, _) in zip(entries, results) if status]
+  output.info('Linted %s workspaces, with %s issues.', len(entries), sum(count for _, count in results))
+  if failed:
+    output.error('Failed to lint %s workspaces: %s', len(failed), ', '.join(failed))
+    return 1
+  return 0
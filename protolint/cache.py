@@ -0,0 +1,335 @@
+# -*- coding: utf-8 -*-
+
+"""
+
+  protolint: cache
+  ~~~~~~~~~~~~~~~~
+
+"""
+
+import os
+import json
+import fcntl
+import errno
+import hashlib
+import tempfile
+import subprocess
+import collections
+
+from . import output
+
+
+CACHE_VERSION = "v1"
+DEFAULT_LIMIT = 256 * 1024 * 1024  # bytes of cached results to keep on disk
+DEFAULT_ENTRIES = 64 * 1024  # entries of cached results to keep in memory
+
+
+def tool_version(name):
+
+  """ Identify a tool on the `PATH`, so cached results are invalidated when
+      the tool changes.
+
+      :param name: Name of the executable, like `protoc`.
+      :returns: Identifier for the installed tool, or `"missing"`. """
+
+  for directory in os.environ.get('PATH', '').split(os.pathsep):
+    candidate = os.path.join(directory, name)
+    if os.path.isfile(candidate) and os.access(candidate, os.X_OK):
+      with open(candidate, 'rb') as fhandle:
+        return hashlib.sha256(fhandle.read()).hexdigest()
+  return "missing"
+
+
+class ResultCache(object):
+
+  """ On-disk cache of parsed issues per protofile, keyed by the content of the
+      file and of everything it imports. Entries are evicted least-recently-used
+      first once the cache grows past its size limit. """
+
+  __slots__ = ('root', 'limit', 'index', 'salt', 'hashes')
+
+  suffix = '.json'  # extension of cache entries on disk
+
+  def __init__(self, root, settings, limit=DEFAULT_LIMIT):
+
+    """ Open (or create) a result cache.
+
+        :param root: Directory to keep cached results in, or `None` to keep none on disk.
+        :param settings: JSON-serializable linter settings that affect results.
+        :param limit: Maximum size of cached results, in bytes. """
+
+    self.root = root
+    self.limit = limit
+    self.hashes = {}
+    self.index = {}
+
+    if root is not None:
+      try:
+        with open(os.path.join(root, 'index.json'), 'r') as fhandle:
+          self.index = json.load(fhandle)
+      except (IOError, ValueError):
+        pass
+
+    try:
+      protoc = subprocess.check_output(['protoc', '--version']).strip()
+    except (OSError, subprocess.CalledProcessError):
+      protoc = "missing"
+
+    self.salt = hashlib.sha256('::'.join((
+      CACHE_VERSION,
+      protoc,
+      tool_version('protoc-gen-lint'),
+      json.dumps(settings, sort_keys=True)))).hexdigest()
+
+  def digest(self, path):
+
+    """ Hash a file's content, skipping the read when its modification time
+        and size match what was recorded on a previous run.
+
+        :param path: Absolute path to the file.
+        :returns: Hex digest of the file content, or `"missing"`. """
+
+    if path in self.hashes:
+      return self.hashes[path]
+
+    try:
+      stat = os.stat(path)
+    except OSError:
+      return "missing"
+
+    recorded = self.index.get(path)
+    if recorded and recorded[0] == stat.st_mtime and recorded[1] == stat.st_size:
+      content_hash = recorded[2]
+    else:
+      with open(path, 'rb') as fhandle:
+        content_hash = hashlib.sha256(fhandle.read()).hexdigest()
+      self.index[path] = [stat.st_mtime, stat.st_size, content_hash]
+
+    self.hashes[path] = content_hash
+    return content_hash
+
+  def key(self, protofile, graph):
+
+    """ Compute the cache key for a protofile.
+
+        :param protofile: Absolute path to the protofile.
+        :param graph: `imports.ImportGraph` for the workspace.
+        :returns: Hex digest identifying the results for `protofile`. """
+
+    closure = sorted(graph.closure(protofile))
+    parts = [self.salt, protofile]
+    parts.extend('%s=%s' % (path, self.digest(path)) for path in closure)
+
+    # imports outside the scanned set still affect results if they change or appear
+    for path in closure:
+      for name in graph.names.get(path, ()):
+        resolved = graph.resolve(name)
+        if resolved not in graph.imports:
+          parts.append('%s=%s' % (name, self.digest(resolved) if resolved else "missing"))
+
+    return hashlib.sha256('\n'.join(parts)).hexdigest()
+
+  def __entry(self, key):
+
+    """ Path on disk for a cache entry. """
+
+    return os.path.join(self.root, key[:2], key + self.suffix)
+
+  def get(self, key):
+
+    """ Load cached issue records for a key, marking the entry as recently used.
+
+        :param key: Cache key from `key`.
+        :returns: List of issue records, or `None` on a miss. """
+
+    path = self.__entry(key)
+    try:
+      with open(path, 'rb') as fhandle:
+        records = self.decode(fhandle.read())
+      os.utime(path, None)
+      return records
+    except (IOError, OSError, ValueError):
+      return None
+
+  def put(self, key, records):
+
+    """ Store issue records for a key.
+
+        :param key: Cache key from `key`.
+        :param records: List of JSON-serializable issue records. """
+
+    path = self.__entry(key)
+    try:
+      os.makedirs(os.path.dirname(path))
+    except OSError as e:
+      if e.errno != errno.EEXIST:
+        raise
+
+    # write to a temporary file first, so concurrent readers never see partial entries
+    descriptor, temporary = tempfile.mkstemp(dir=os.path.dirname(path))
+    with os.fdopen(descriptor, 'wb') as fhandle:
+      fhandle.write(self.encode(records))
+    os.rename(temporary, path)
+
+  @staticmethod
+  def encode(records):
+
+    """ Encode an entry for storage on disk. """
+
+    return json.dumps(records)
+
+  @staticmethod
+  def decode(data):
+
+    """ Decode an entry stored by `encode`. """
+
+    return json.loads(data)
+
+  def evict(self):
+
+    """ Remove least-recently-used entries until the cache fits its size limit.
+        Other linters may be writing and evicting entries in the same cache at
+        once, so entries vanishing underneath are skipped, as are entries
+        still being written. """
+
+    entries = []
+    total = 0
+    for shard in os.listdir(self.root):
+      directory = os.path.join(self.root, shard)
+      if len(shard) != 2 or not os.path.isdir(directory):
+        continue  # the file index and nested caches are not entries
+      for filename in self.__listdir(directory):
+        if not filename.endswith(self.suffix):
+          continue  # temporary files are renamed into place once written
+        path = os.path.join(directory, filename)
+        try:
+          stat = os.stat(path)
+        except OSError as e:
+          if e.errno != errno.ENOENT:
+            raise
+          continue
+        entries.append((stat.st_mtime, stat.st_size, path))
+        total += stat.st_size
+
+    for _, size, path in sorted(entries):
+      if total <= self.limit:
+        break
+      try:
+        os.remove(path)
+      except OSError as e:
+        if e.errno != errno.ENOENT:
+          raise
+      else:
+        output.say('Evicted cached results "%s".', path)
+      total -= size
+
+  @staticmethod
+  def __listdir(directory):
+
+    """ List a directory, or nothing if it was removed meanwhile. """
+
+    try:
+      return os.listdir(directory)
+    except OSError as e:
+      if e.errno != errno.ENOENT:
+        raise
+      return []
+
+  def save(self):
+
+    """ Persist the file index and enforce the size limit. The index on disk
+        is locked while it is merged with this run's, so linters sharing the
+        cache keep each other's entries. """
+
+    try:
+      os.makedirs(self.root)
+    except OSError as e:
+      if e.errno != errno.EEXIST:
+        raise
+
+    with open(os.path.join(self.root, 'index.lock'), 'w') as lock:
+      fcntl.flock(lock, fcntl.LOCK_EX)
+      try:
+        with open(os.path.join(self.root, 'index.json'), 'r') as fhandle:
+          index = json.load(fhandle)
+      except (IOError, ValueError):
+        index = {}
+      index.update(self.index)
+      self.index = index
+
+      descriptor, temporary = tempfile.mkstemp(dir=self.root)
+      with os.fdopen(descriptor, 'w') as fhandle:
+        json.dump(self.index, fhandle)
+      os.rename(temporary, os.path.join(self.root, 'index.json'))
+    self.evict()
+
+
+class MemoryCache(ResultCache):
+
+  """ In-memory cache of parsed issues per protofile, for linters that are kept
+      running between lints, like `protolint serve`. Keys work just as they do
+      on disk, and files are checked for changes again on every run. Past
+      `limit` entries, least-recently-used entries are dropped. """
+
+  __slots__ = ('entries',)
+
+  def __init__(self, settings, limit=DEFAULT_ENTRIES):
+
+    """ Create an empty result cache in memory.
+
+        :param settings: JSON-serializable linter settings that affect results.
+        :param limit: Maximum number of cached entries. """
+
+    super(MemoryCache, self).__init__(None, settings, limit)
+    self.entries = collections.OrderedDict()
+
+  def get(self, key):
+
+    """ Load cached issue records for a key, marking the entry as recently used. """
+
+    records = self.entries.pop(key, None)
+    if records is not None:
+      self.entries[key] = records
+    return records
+
+  def put(self, key, records):
+
+    """ Store issue records for a key. """
+
+    self.entries.pop(key, None)
+    self.entries[key] = records
+
+  def save(self):
+
+    """ Forget the file hashes of this run, so the next run checks each file
+        for changes again, and enforce the entry limit. """
+
+    self.hashes = {}
+    while len(self.entries) > self.limit:
+      self.entries.popitem(last=False)
+
+
+class DescriptorCache(ResultCache):
+
+  """ On-disk cache of compiled `FileDescriptorProto`s per protofile, keyed just
+      like results, so a protofile is only compiled again once it or anything
+      it imports changes. Entries are the encoded descriptors, as `protoc`
+      wrote them. """
+
+  __slots__ = ()
+
+  suffix = '.pb'
+
+  @staticmethod
+  def encode(descriptor):
+
+    """ Store encoded descriptors as they are. """
+
+    return descriptor
+
+  @staticmethod
+  def decode(data):
+
+    """ Load encoded descriptors as they are. """
+
+    return data
@@ -35,3 +35,222 @@ parser.add_argument('workspace',
 parser.add_argument('--version', '-v',
                     action='version',
                     version='%(prog)s ' + '.'.join(map(unicode, version)))
+
+# `--scan-threads` to walk include paths concurrently
+parser.add_argument('--scan-threads',
+                    type=int,
+                    default=1,
+                    help='number of threads to use when scanning include paths for protos')
+
+# `--jobs` to compile shards of the workspace in parallel
+parser.add_argument('--jobs', '-j',
+                    type=int,
+                    default=1,
+                    help='number of parallel protoc processes to split the workspace across')
+
+# `--cache` to replay results for unchanged protos
+parser.add_argument('--cache',
+                    type=unicode,
+                    default=None,
+                    help='directory to cache results in, so unchanged protos are not recompiled')
+
+# `--cache-size` to bound the result cache
+parser.add_argument('--cache-size',
+                    type=int,
+                    default=256,
+                    help='maximum size of the result cache, in megabytes')
+
+# `--changed-since` to lint only what a change affects
+parser.add_argument('--changed-since',
+                    type=unicode,
+                    default=None,
+                    metavar='REF',
+                    help='only lint protos changed since this git ref, and the protos importing them')
+
+# `--baseline` to suppress issues that are already known
+parser.add_argument('--baseline',
+                    type=unicode,
+                    default=None,
+                    metavar='FILE',
+                    help='baseline file of known issue fingerprints, which are not reported')
+
+# `--write-baseline` to record every current issue as known
+parser.add_argument('--write-baseline',
+                    action='store_true',
+                    default=False,
+                    help='write the fingerprint of every issue found to the --baseline file')
+
+# `--style-only` to check naming rules in-process, without `protoc`
+parser.add_argument('--style-only',
+                    action='store_true',
+                    default=False,
+                    help='only check naming style, syntax and unused imports, in-process and without protoc')
+
+# `--descriptor-checks` to check compiled descriptors across the whole workspace
+parser.add_argument('--descriptor-checks',
+                    action='store_true',
+                    default=False,
+                    help='also check compiled descriptors of every proto at once, like for symbols defined twice')
+
+# `--protoc-timeout` to kill `protoc` runs that hang
+parser.add_argument('--protoc-timeout',
+                    type=float,
+                    default=None,
+                    metavar='SECONDS',
+                    help='wall-clock time a protoc run may take before it is killed, and its protos are split to isolate '
+                         'those it fails on, or 0 to let it run (default: 600)')
+
+# `--protoc-memory` to cap the memory of `protoc` runs
+parser.add_argument('--protoc-memory',
+                    type=int,
+                    default=None,
+                    metavar='MB',
+                    help='address space protoc and each plugin it runs may use, each on its own, past which the run '
+                         'fails, and its protos are split to isolate those it fails on (default: no limit)')
+
+# `--cascades` to choose how errors caused by a failing import are reported
+parser.add_argument('--cascades',
+                    choices=('collapse', 'details', 'expand'),
+                    default='collapse',
+                    help='report errors caused by a failing import once, at the import, optionally listing every error '
+                         'it caused as other locations, or report every one of them (default: collapse)')
+
+# `--retain-issues` to keep every issue in memory, instead of releasing each once written
+parser.add_argument('--retain-issues',
+                    action='store_true',
+                    default=False,
+                    help='keep every reported issue in memory until the run is over, instead of releasing each issue '
+                         'once it is written (only counts are kept otherwise)')
+
+# `--format` to choose how issues are encoded
+parser.add_argument('--format',
+                    choices=('codeclimate', 'ndjson', 'msgpack'),
+                    default='codeclimate',
+                    help='encoding of issues: NUL-terminated JSON for CodeClimate, newline-delimited JSON, or msgpack, '
+                         'if installed (default: codeclimate)')
+
+# `--output` to write issues to a file
+parser.add_argument('--output',
+                    default=None,
+                    metavar='FILE',
+                    help='write issues to a file instead of stdout, gzip-compressed if its name ends with ".gz"')
+
+# `--log-level` to choose how much is logged
+parser.add_argument('--log-level',
+                    choices=('debug', 'info', 'warning', 'error', 'critical'),
+                    default=None,
+                    help='lowest level of messages to log on stderr, overriding "log_level" in the config (default: debug)')
+
+# `--log-queue` to log from a background thread
+parser.add_argument('--log-queue',
+                    action='store_true',
+                    default=False,
+                    help='write logs from a background thread, so linting never waits on stderr')
+
+# `--profile` to report where the time goes
+parser.add_argument('--profile',
+                    action='store_true',
+                    default=False,
+                    help='time each stage of the run and count what it processed, reported as JSON on stderr')
+
+
+# `--watch` to lint again whenever protos change
+parser.add_argument('--watch',
+                    action='store_true',
+                    default=False,
+                    help='keep running, and lint the protos affected by each change as it is saved')
+
+# `--watch-output` to choose what each watch cycle writes
+parser.add_argument('--watch-output',
+                    choices=('stream', 'delta'),
+                    default='stream',
+                    help='write every issue after each change, or only the issues added and removed')
+
+# `--debounce` to group bursts of saves
+parser.add_argument('--debounce',
+                    type=float,
+                    default=0.2,
+                    metavar='SECONDS',
+                    help='time without changes to wait for before linting them, with --watch')
+
+# `--poll` to watch without inotify
+parser.add_argument('--poll',
+                    action='store_true',
+                    default=False,
+                    help='watch for changes by walking include paths every second, instead of through inotify')
+
+
+## -- Server
+
+serve_parser = argparse.ArgumentParser(
+  prog='protolint serve',
+  description='Serve lint requests over a unix socket, keeping workspaces warm in between.')
+
+# `--socket` to listen on
+serve_parser.add_argument('--socket',
+                          type=unicode,
+                          required=True,
+                          metavar='PATH',
+                          help='path of the unix socket to listen on')
+
+client_parser = argparse.ArgumentParser(
+  prog='protolint client',
+  description='Lint through a running `protolint serve`. Other arguments are passed on as they are to protolint.')
+
+# `--socket` to connect to
+client_parser.add_argument('--socket',
+                           type=unicode,
+                           required=True,
+                           metavar='PATH',
+                           help='path of the unix socket the server listens on')
+
+# `--file` to lint only some protos
+client_parser.add_argument('--file',
+                           type=unicode,
+                           action='append',
+                           dest='files',
+                           default=None,
+                           metavar='PROTO',
+                           help='only lint this proto, which may be given more than once')
+
+# `--shutdown` to stop the server
+client_parser.add_argument('--shutdown',
+                           action='store_true',
+                           default=False,
+                           help='ask the server to shut down, instead of linting')
+
+
+## -- Batch
+
+batch_parser = argparse.ArgumentParser(
+  prog='protolint batch',
+  description='Lint many workspaces in one process. Other arguments are passed on as they are to protolint, for every workspace.')
+
+# `--manifest` listing the workspaces
+batch_parser.add_argument('--manifest',
+                          type=unicode,
+                          required=True,
+                          metavar='FILE',
+                          help='JSON list of [config, workspace] pairs, or of objects with "config", "workspace" and "name"')
+
+# `--workers` to lint several workspaces at once
+batch_parser.add_argument('--workers',
+                          type=int,
+                          default=4,
+                          help='number of workspaces to lint at once')
+
+# `--output-dir` to split issues by workspace
+batch_parser.add_argument('--output-dir',
+                          type=unicode,
+                          default=None,
+                          metavar='DIR',
+                          help='write the issues of each workspace to DIR/<name>.json (.ndjson or .msgpack, by --format), instead '
+                               'of all of them to stdout')
+
+# `--output` to write every issue to one file, declared here too, so it is not taken for `--output-dir`
+batch_parser.add_argument('--output',
+                          type=unicode,
+                          default=None,
+                          metavar='FILE',
+                          help='write the issues of every workspace to a file instead of stdout, gzip-compressed if its '
+                               'name ends with ".gz"')
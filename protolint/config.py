@@ -37,14 +37,14 @@ class LinterConfig(object):
       with open(filepath, 'r') as fhandle:
         self._config = json.load(fhandle)
 
-        output.say("Parsed config: \n" + pprint.pformat(self._config, indent=2))
+        output.say("Parsed config: \n%s", output.Lazy(pprint.pformat, self._config, indent=2))
 
     except IOError as e:  # pragma: no cover
-      print("Encountered IOError while reading config file: %s" % e)
+      output.error("Encountered IOError while reading config file: %s", e)
       sys.exit(1)
 
     except Exception as e:  # pragma: no cover
-      print("Encountered unhandled exception while reading config file: %s" % e)
+      output.error("Encountered unhandled exception while reading config file: %s", e)
       sys.exit(1)
 
   def __getitem__(self, item):
@@ -92,6 +92,14 @@ class LinterConfig(object):
 
     return self._config.get('exclude_paths', frozenset())
 
+  @property
+  def log_level(self):
+
+    """ Return the lowest level of messages to log.
+        :returns: Name of the level, or `None` if not configured. """
+
+    return self._config.get('log_level')
+
   @property
   def config_items(self):
 
@@ -0,0 +1,219 @@
+# -*- coding: utf-8 -*-
+
+"""
+
+  protolint: descriptors
+  ~~~~~~~~~~~~~~~~~~~~~~
+
+"""
+
+# field numbers in `google/protobuf/descriptor.proto`
+NAME = 1  # the name of every named descriptor
+FILE_SET_FILE = 1
+FILE_NAME, FILE_PACKAGE, FILE_DEPENDENCY = 1, 2, 3
+FILE_MESSAGE, FILE_ENUM, FILE_SERVICE, FILE_EXTENSION = 4, 5, 6, 7
+FILE_SOURCE_INFO = 9
+MESSAGE_NESTED, MESSAGE_ENUM, MESSAGE_EXTENSION = 3, 4, 6
+ENUM_VALUE = 2
+SOURCE_LOCATION, LOCATION_PATH, LOCATION_SPAN = 1, 1, 2
+
+VARINT, FIXED64, DELIMITED, FIXED32 = 0, 1, 2, 5
+
+
+def varint(data, offset):
+
+  """ Decode a base 128 varint.
+
+      :param data: Encoded bytes.
+      :param offset: Offset of the varint in `data`.
+      :returns: Tuple of the decoded value and the offset following it. """
+
+  value = shift = 0
+  while True:
+    byte = ord(data[offset])
+    offset += 1
+    value |= (byte & 0x7f) << shift
+    if byte < 0x80:
+      return value, offset
+    shift += 7
+
+
+def fields(data):
+
+  """ Decode the fields of an encoded protobuf message, without a schema.
+
+      :param data: Encoded message.
+      :returns: Generator of `(number, value)` pairs, where values are integers for
+                varints and byte strings for length-delimited fields. Fixed-width
+                fields are skipped, since descriptors carry none we read. """
+
+  offset, end = 0, len(data)
+  while offset < end:
+    tag, offset = varint(data, offset)
+    wire_type = tag & 0x7
+    if wire_type == VARINT:
+      value, offset = varint(data, offset)
+    elif wire_type == DELIMITED:
+      length, offset = varint(data, offset)
+      value, offset = data[offset:offset + length], offset + length
+    elif wire_type == FIXED64:
+      offset += 8
+      continue
+    elif wire_type == FIXED32:
+      offset += 4
+      continue
+    else:
+      raise ValueError('unsupported wire type %s' % wire_type)
+    yield tag >> 3, value
+
+
+def packed(data):
+
+  """ Decode a packed repeated varint field.
+
+      :param data: Encoded field content.
+      :returns: List of integers. """
+
+  values, offset = [], 0
+  while offset < len(data):
+    value, offset = varint(data, offset)
+    values.append(value)
+  return values
+
+
+def split(data):
+
+  """ Split an encoded `FileDescriptorSet`, as written by `protoc --descriptor_set_out`,
+      into the encoded `FileDescriptorProto` of each file in it.
+
+      :param data: Encoded `FileDescriptorSet`.
+      :returns: Dictionary of file names, as `protoc` knows them, to encoded descriptors. """
+
+  files = {}
+  for number, value in fields(data):
+    if number == FILE_SET_FILE:
+      name = next((name for field, name in fields(value) if field == FILE_NAME), None)
+      files[name] = value
+  return files
+
+
+def qualify(scope, name):
+
+  """ Qualify a name within a scope, the way `protoc` names symbols. """
+
+  return '%s.%s' % (scope, name) if scope else name
+
+
+class FileDescriptor(object):
+
+  """ Summary of a compiled `FileDescriptorProto`: its name, package, imports,
+      and every symbol it defines. Source info, from `--include_source_info`,
+      is only decoded once a definition is positioned, since it is several
+      times larger than the rest of the descriptor. """
+
+  __slots__ = ('name', 'package', 'dependencies', 'symbols', 'source', 'spans')
+
+  def __init__(self, data):
+
+    """ Decode a file descriptor.
+
+        :param data: Encoded `FileDescriptorProto`, as produced by `split`. """
+
+    self.name = None
+    self.package = ''
+    self.dependencies = []
+    self.symbols = []  # list of `(full name, path to the definition)`, in definition order
+    self.source = None
+    self.spans = None
+
+    messages, enums, extensions, services = [], [], [], []
+    for number, value in fields(data):
+      if number == FILE_NAME:
+        self.name = value
+      elif number == FILE_PACKAGE:
+        self.package = value
+      elif number == FILE_DEPENDENCY:
+        self.dependencies.append(value)
+      elif number == FILE_MESSAGE:
+        messages.append(value)
+      elif number == FILE_ENUM:
+        enums.append(value)
+      elif number == FILE_SERVICE:
+        services.append(value)
+      elif number == FILE_EXTENSION:
+        extensions.append(value)
+      elif number == FILE_SOURCE_INFO:
+        self.source = value
+
+    for index, message in enumerate(messages):
+      self.__message(message, self.package, (FILE_MESSAGE, index))
+    for index, enum in enumerate(enums):
+      self.__enum(enum, self.package, (FILE_ENUM, index))
+    for index, service in enumerate(services):
+      self.__symbol(service, self.package, (FILE_SERVICE, index))
+    for index, extension in enumerate(extensions):
+      self.__symbol(extension, self.package, (FILE_EXTENSION, index))
+
+  def position(self, path):
+
+    """ Find a definition in the source, the way `protoc` would report it.
+
+        :param path: Path to the definition, from `symbols`.
+        :returns: Tuple of the one-based line and column of the name of the
+                  definition, or `(None, None)` without source info. """
+
+    if self.spans is None:
+      self.spans = {}
+      for field, location in fields(self.source or ''):
+        if field == SOURCE_LOCATION:
+          steps = span = None
+          for part, content in fields(location):
+            if part == LOCATION_PATH:
+              steps = tuple(packed(content))
+            elif part == LOCATION_SPAN:
+              span = packed(content)
+          if steps is not None and span:
+            self.spans.setdefault(steps, span)
+
+    span = self.spans.get(path + (NAME,)) or self.spans.get(path)
+    if not span:
+      return None, None
+    return span[0] + 1, span[1] + 1
+
+  def __symbol(self, data, scope, path):
+
+    """ Record a symbol defined by a named descriptor.
+
+        :returns: Full name of the symbol. """
+
+    name = qualify(scope, next((value for number, value in fields(data) if number == NAME), ''))
+    self.symbols.append((name, path))
+    return name
+
+  def __message(self, data, scope, path):
+
+    """ Record a message and everything nested in it. """
+
+    name = self.__symbol(data, scope, path)
+    counts = {MESSAGE_NESTED: 0, MESSAGE_ENUM: 0, MESSAGE_EXTENSION: 0}
+    for number, value in fields(data):
+      if number in counts:
+        nested = path + (number, counts[number])
+        counts[number] += 1
+        if number == MESSAGE_NESTED:
+          self.__message(value, name, nested)
+        elif number == MESSAGE_ENUM:
+          self.__enum(value, name, nested)
+        else:
+          self.__symbol(value, name, nested)
+
+  def __enum(self, data, scope, path):
+
+    """ Record an enum and its values, which `protoc` scopes alongside the enum. """
+
+    self.__symbol(data, scope, path)
+    values = 0
+    for number, value in fields(data):
+      if number == ENUM_VALUE:
+        self.__symbol(value, scope, path + (ENUM_VALUE, values))
+        values += 1
@@ -0,0 +1,234 @@
+# -*- coding: utf-8 -*-
+
+"""
+
+  protolint: exclude
+  ~~~~~~~~~~~~~~~~~~
+
+"""
+
+import os
+import re
+
+from . import output
+
+
+GLOB_CHARACTERS = frozenset('*?[{')
+REGEX_PREFIX = 're:'
+REGEX_MARKERS = ('\\', '|', '$')
+
+
+def kind(pattern):
+
+  """ Tell how an exclude path is written. Paths starting with `re:` are
+      regexes, matched from the start of the path. So are paths starting with
+      `^`, or using syntax no glob or path has, like `\\.`, `|` or `$`, as
+      exclude paths always were regexes. Other paths using `*`, `**`, `?`,
+      `[...]` or `{a,b}` are globs, like CodeClimate writes them, and the rest
+      are plain paths, excluding themselves and everything under them.
+
+      :param pattern: Exclude path, as configured.
+      :returns: `'regex'`, `'glob'` or `'path'`. """
+
+  if pattern.startswith((REGEX_PREFIX, '^')) or any(marker in pattern for marker in REGEX_MARKERS):
+    return 'regex'
+  if GLOB_CHARACTERS.intersection(pattern):
+    return 'glob'
+  return 'path'
+
+
+def translate(glob):
+
+  """ Translate a glob into a regex matching whole paths. `*` and `?` never
+      match across a `/`, while `**` does, and a `**/` component also matches
+      no directory at all.
+
+      :param glob: Glob, relative to the workspace.
+      :returns: Regex source, without anchors. """
+
+  index, length, parts, braces = 0, len(glob), [], 0
+  while index < length:
+    character = glob[index]
+    if glob.startswith('**/', index):
+      parts.append('(?:[^/]*/)*')
+      index += 3
+      continue
+    if glob.startswith('**', index):
+      parts.append('.*')
+      index += 2
+      continue
+    if character == '*':
+      parts.append('[^/]*')
+    elif character == '?':
+      parts.append('[^/]')
+    elif character == '[':
+      end = glob.find(']', index + 3 if glob.startswith('[!', index) else index + 2)
+      if end < 0:
+        parts.append(re.escape(character))
+      else:
+        members = glob[index + 1:end].replace('\\', '\\\\')
+        parts.append('[^%s]' % members[1:] if members.startswith('!') else '[%s]' % members)
+        index = end
+    elif character == '{':
+      parts.append('(?:')
+      braces += 1
+    elif character == ',' and braces:
+      parts.append('|')
+    elif character == '}' and braces:
+      parts.append(')')
+      braces -= 1
+    else:
+      parts.append(re.escape(character))
+    index += 1
+  return ''.join(parts) + ')' * braces
+
+
+class _Node(object):
+
+  """ One path component of the exclude trie. """
+
+  __slots__ = ('children', 'excluded', 'globs', 'regex')
+
+  def __init__(self):
+
+    """ Initialize an empty node, excluding nothing. """
+
+    self.children = {}
+    self.excluded = False  # a plain exclude path ends here
+    self.globs = []  # regex sources of globs starting under this node, until compiled
+    self.regex = None  # every glob of this node, compiled into one regex
+
+
+class Matcher(object):
+
+  """ Every configured exclude path, compiled once so each candidate path is
+      matched in one pass over its components, however many there are. Plain
+      paths are kept in a trie of path components, each glob hangs off the
+      trie node of its leading literal components, with the globs of a node
+      compiled into one regex, and regexes are compiled into one regex too. """
+
+  __slots__ = ('root', 'regexes', 'prefix', 'workspace', 'patterns')
+
+  def __init__(self, patterns, workspace):
+
+    """ Compile exclude paths. Invalid regexes are skipped, with a warning.
+
+        :param patterns: Exclude paths, relative to the workspace, or absolute.
+        :param workspace: Path to the workspace. """
+
+    self.workspace = os.path.abspath(workspace)
+    self.prefix = os.path.join(self.workspace, '')
+    self.root = _Node()
+    self.regexes = []
+    self.patterns = 0
+
+    combined = []
+    for pattern in patterns:
+      written = kind(pattern)
+      if written == 'regex':
+        source = pattern[len(REGEX_PREFIX):] if pattern.startswith(REGEX_PREFIX) else pattern
+        try:
+          compiled = re.compile(source)
+        except (re.error, AssertionError, OverflowError) as e:
+          output.warn('Unable to compile exclude path "%s" as a regex, ignoring it: %s', pattern, e)
+          continue
+        if compiled.groups:
+          self.regexes.append(compiled)  # groups may be referred to by number, so it stays on its own
+        else:
+          combined.append(source)
+      else:
+        self.__insert(self.__relative(pattern), written == 'glob')
+      self.patterns += 1
+
+    if combined:
+      self.regexes.insert(0, re.compile('|'.join('(?:%s)' % pattern for pattern in combined)))
+    self.__compile(self.root)
+
+  def __relative(self, pattern):
+
+    """ Express a plain path or glob relative to the workspace. """
+
+    if os.path.isabs(pattern) and pattern.startswith(self.prefix):
+      pattern = pattern[len(self.prefix):]
+    while pattern.startswith('./'):
+      pattern = pattern[2:]
+    return pattern.strip('/')
+
+  def __insert(self, pattern, glob):
+
+    """ Add a plain path or glob to the trie. """
+
+    components = pattern.split('/') if pattern else []
+    while glob and components and components[-1] == '**':
+      components.pop()  # excluding everything under a directory is excluding the directory
+    node = self.root
+    for index, component in enumerate(components):
+      if glob and GLOB_CHARACTERS.intersection(component):
+        node.globs.append(translate('/'.join(components[index:])))
+        return
+      node = node.children.setdefault(component, _Node())
+    node.excluded = True
+
+  def __compile(self, node):
+
+    """ Compile the globs of a node and of every node under it. """
+
+    if node.globs:
+      node.regex = re.compile('(?:%s)/?\\Z' % '|'.join('(?:%s)' % glob for glob in node.globs))
+      node.globs = None
+    for child in node.children.itervalues():
+      self.__compile(child)
+
+  def __len__(self):
+
+    """ Number of exclude paths compiled. """
+
+    return self.patterns
+
+  def relative(self, path):
+
+    """ Express a path relative to the workspace, the way exclude paths are written.
+
+        :param path: Absolute path, or path relative to the current directory.
+        :returns: Relative path, starting with `../` for paths outside the workspace. """
+
+    if path.startswith(self.prefix):
+      return path[len(self.prefix):]
+    return os.path.relpath(os.path.abspath(path), self.workspace)
+
+  def match(self, relative, directory=False):
+
+    """ See if a path relative to the workspace is excluded.
+
+        :param relative: Relative path, from `relative`.
+        :param directory: Whether the path is that of a directory, which
+                          regexes see with a trailing `/`, as they always have.
+        :returns: `True` if the path is excluded. """
+
+    if directory and not relative.endswith('/'):
+      relative += '/'
+    for regex in self.regexes:
+      if regex.match(relative):
+        return True
+
+    node, start = self.root, 0
+    while True:
+      if node.excluded or (node.regex is not None and node.regex.match(relative, start)):
+        return True
+      end = relative.find('/', start)
+      if end < 0:
+        end = len(relative)
+      node = node.children.get(relative[start:end])
+      if node is None:
+        return False
+      start = end + 1
+
+  def __call__(self, path, directory=False):
+
+    """ See if a path is excluded.
+
+        :param path: Absolute path, or path relative to the current directory.
+        :param directory: Whether the path is that of a directory.
+        :returns: `True` if the path is excluded. """
+
+    return self.match(self.relative(path), directory)
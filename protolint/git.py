@@ -0,0 +1,30 @@
+# -*- coding: utf-8 -*-
+
+"""
+
+  protolint: git
+  ~~~~~~~~~~~~~~
+
+"""
+
+import os
+import subprocess
+
+
+def changed_protofiles(ref, path):
+
+  """ List protofiles changed since a git ref, including uncommitted changes,
+      deleted files and new untracked files.
+
+      :param ref: Git ref to compare against, like `origin/master`.
+      :param path: Path inside the git checkout to inspect.
+      :returns: Set of absolute paths to changed protofiles.
+      :raises subprocess.CalledProcessError: If `git` fails, e.g. on an unknown ref. """
+
+  git = lambda *arguments: subprocess.check_output(('git',) + arguments, cwd=path)
+
+  toplevel = git('rev-parse', '--show-toplevel').strip()
+  names = git('diff', '--name-only', '--no-renames', ref, '--', ':(top)*.proto').splitlines()
+  names.extend(git('ls-files', '--others', '--exclude-standard', '--full-name', '--', ':(top)*.proto').splitlines())
+
+  return frozenset(os.path.join(toplevel, name) for name in names if name)
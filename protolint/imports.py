@@ -0,0 +1,276 @@
+# -*- coding: utf-8 -*-
+
+"""
+
+  protolint: imports
+  ~~~~~~~~~~~~~~~~~~
+
+"""
+
+import os
+import re
+import itertools
+
+from . import output
+
+
+IMPORT_PATTERN = re.compile(r'^\s*import\s+(?:(?:public|weak)\s+)?["\']([^"\']+)["\']\s*;', re.MULTILINE)
+PACKAGE_PATTERN = re.compile(r'^\s*package\s+([\w.]+)\s*;', re.MULTILINE)
+
+
+def scan(path):
+
+  """ Cheaply scan a protofile for `import` statements, without parsing it.
+
+      :param path: Path to the protofile.
+      :returns: Tuple of imported names, as written in the file. """
+
+  with open(path, 'r') as fhandle:
+    return tuple(IMPORT_PATTERN.findall(fhandle.read()))
+
+
+def package(path):
+
+  """ Cheaply scan a protofile for its `package` statement, without parsing it.
+
+      :param path: Path to the protofile.
+      :returns: Name of its package, or an empty string for protos without one. """
+
+  with open(path, 'r') as fhandle:
+    found = PACKAGE_PATTERN.search(fhandle.read())
+  return found.group(1) if found else ''
+
+
+class ImportGraph(object):
+
+  """ Graph of `import` edges between discovered protofiles, built from a
+      text scan of each file rather than a full `protoc` parse. """
+
+  __slots__ = ('imports', 'names', 'sizes', 'proto_paths', 'found', 'directories')
+
+  def __init__(self, protofiles, proto_paths):
+
+    """ Scan each protofile and resolve its imports against `proto_paths`,
+        the same way `protoc` would.
+
+        :param protofiles: Iterable of absolute protofile paths.
+        :param proto_paths: Absolute `--proto_path` roots, in lookup order. """
+
+    self.imports = {}
+    self.names = {}
+    self.sizes = {}
+    self.proto_paths = tuple(proto_paths)
+    self.found = {}  # imported names, looked up once each
+    self.directories = {}  # whether each directory probed for an imported name exists
+
+    for protofile in protofiles:
+      self.__scan(protofile)
+      self.imports[protofile] = None
+
+    known = frozenset(self.imports)
+    for protofile, names in self.names.items():
+      self.imports[protofile] = frozenset(filter(
+        lambda resolved: resolved in known, map(self.resolve, names)))
+
+  def __scan(self, protofile):
+
+    """ Scan the imported names and size of a protofile. """
+
+    try:
+      self.names[protofile] = scan(protofile)
+      self.sizes[protofile] = os.path.getsize(protofile)
+    except (IOError, OSError) as e:
+      output.say('Unable to scan imports for "%s": %s', protofile, e)
+      self.names[protofile] = ()
+      self.sizes[protofile] = 0
+
+  def update(self, protofiles):
+
+    """ Scan protofiles again after they were modified, keeping the rest of
+        the graph. Protofiles that were not scanned before are ignored, so
+        added protofiles need a new graph.
+
+        :param protofiles: Iterable of absolute protofile paths. """
+
+    self.found.clear()
+    self.directories.clear()
+    known = frozenset(self.imports)
+    for protofile in protofiles:
+      if protofile in known:
+        self.__scan(protofile)
+        self.imports[protofile] = frozenset(filter(
+          lambda resolved: resolved in known, map(self.resolve, self.names[protofile])))
+
+  def lookup(self, name):
+
+    """ Find the first proto path holding an imported name. Each name is
+        looked up once, and a proto path is only probed for a file where the
+        directory holding it exists, which is checked once per directory.
+
+        :param name: Imported name, like `base/TestMessage.proto`.
+        :returns: Tuple of the proto path and the absolute path to the
+                  imported file, or `(None, None)`. """
+
+    if name in self.found:
+      return self.found[name]
+
+    found = None, None
+    for proto_path in self.proto_paths:
+      candidate = os.path.join(proto_path, name)
+      if candidate in self.imports:
+        found = proto_path, candidate
+        break
+      directory = os.path.dirname(candidate)
+      if directory not in self.directories:
+        self.directories[directory] = os.path.isdir(directory)
+      if self.directories[directory] and os.path.isfile(candidate):
+        found = proto_path, candidate
+        break
+    self.found[name] = found
+    return found
+
+  def resolve(self, name):
+
+    """ Resolve an imported name to a path under the first matching proto path.
+
+        :param name: Imported name, like `base/TestMessage.proto`.
+        :returns: Absolute path to the imported file, or `None`. """
+
+    return self.lookup(name)[1]
+
+  def used_paths(self):
+
+    """ Collect the proto paths some import is resolved through. Proto paths
+        no import resolves through may be dropped without changing how any
+        import resolves.
+
+        :returns: Set of proto paths. """
+
+    names = set(itertools.chain.from_iterable(self.names.values()))
+    return set(self.lookup(name)[0] for name in names) - set((None,))
+
+  def closure(self, protofile):
+
+    """ Collect a protofile and everything it imports, transitively.
+
+        :param protofile: Absolute path to a discovered protofile.
+        :returns: Set of absolute paths, including `protofile`. """
+
+    seen = set((protofile,))
+    pending = [protofile]
+    while pending:
+      for dependency in self.imports.get(pending.pop(), ()):
+        if dependency not in seen:
+          seen.add(dependency)
+          pending.append(dependency)
+    return seen
+
+  def dependents(self, paths):
+
+    """ Collect the given paths and every protofile that imports any of them,
+        transitively. Paths need not have been scanned, so importers of a
+        deleted file are still found through the name they import it by.
+
+        :param paths: Iterable of absolute protofile paths.
+        :returns: Set of absolute paths to scanned protofiles. """
+
+    reverse = {}
+    for protofile, imported in self.imports.items():
+      for dependency in imported:
+        reverse.setdefault(dependency, set()).add(protofile)
+
+    seen = set()
+    pending = []
+    for path in paths:
+      if path in self.imports:
+        pending.append(path)
+        continue
+
+      # not scanned, so match importers by every name it could be imported as
+      names = frozenset(os.path.relpath(path, proto_path) for proto_path in self.proto_paths
+                        if path.startswith(os.path.join(proto_path, '')))
+      pending.extend(protofile for protofile, imported in self.names.items()
+                     if names.intersection(imported))
+
+    while pending:
+      protofile = pending.pop()
+      if protofile not in seen:
+        seen.add(protofile)
+        pending.extend(reverse.get(protofile, ()))
+    return seen
+
+  def cycles(self, protofiles=None):
+
+    """ Group protofiles that import each other in a cycle, directly or
+        transitively, leaving every other protofile on its own. `protoc`
+        compiles the imports of each protofile it is given by itself, so only
+        files in a cycle, which it cannot compile apart, need be kept together.
+
+        :param protofiles: Subset of protofiles to group, defaults to all of them.
+        :returns: List of lists of protofiles, each in sorted order, ordered by their first protofile. """
+
+    members = frozenset(protofiles or self.imports)
+    index, lowlink, stack, on_stack, groups = {}, {}, [], set(), []
+
+    # Tarjan's algorithm, iterative so long import chains cannot exhaust the stack
+    for start in sorted(members):
+      if start in index:
+        continue
+      work = [(start, iter(sorted(self.imports.get(start, ()) & members)))]
+      index[start] = lowlink[start] = len(index)
+      stack.append(start)
+      on_stack.add(start)
+      while work:
+        protofile, dependencies = work[-1]
+        for dependency in dependencies:
+          if dependency not in index:
+            index[dependency] = lowlink[dependency] = len(index)
+            stack.append(dependency)
+            on_stack.add(dependency)
+            work.append((dependency, iter(sorted(self.imports.get(dependency, ()) & members))))
+            break
+          if dependency in on_stack:
+            lowlink[protofile] = min(lowlink[protofile], index[dependency])
+        else:
+          work.pop()
+          if work:
+            lowlink[work[-1][0]] = min(lowlink[work[-1][0]], lowlink[protofile])
+          if lowlink[protofile] == index[protofile]:
+            group = []
+            while True:
+              member = stack.pop()
+              on_stack.discard(member)
+              group.append(member)
+              if member == protofile:
+                break
+            groups.append(sorted(group))
+    return sorted(groups)
+
+  def shards(self, count, protofiles=None):
+
+    """ Split the graph into at most `count` shards of roughly equal size,
+        never splitting an import cycle. Shards are runs of protofiles in
+        sorted order, so files of a package, which tend to import the same
+        files, share a shard and `protoc` parses those imports fewer times.
+
+        :param count: Maximum number of shards.
+        :param protofiles: Subset of protofiles to shard, defaults to all of them.
+        :returns: List of non-empty lists of protofiles. """
+
+    groups = self.cycles(protofiles)
+    if count < 2 or len(groups) < 2:
+      return [list(itertools.chain.from_iterable(groups))] if groups else []
+
+    weights = [sum(self.sizes.get(protofile, 0) for protofile in group) or 1 for group in groups]
+    remaining, shards, current, weight = float(sum(weights)), [], [], 0
+    for group, group_weight in zip(groups, weights):
+      # close a shard once it holds its share of what is left to split
+      left = count - len(shards)
+      if current and left > 1 and weight + group_weight / 2.0 > remaining / left:
+        shards.append(current)
+        remaining -= weight
+        current, weight = [], 0
+      current.extend(group)
+      weight += group_weight
+    shards.append(current)
+    return shards
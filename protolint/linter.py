@@ -7,10 +7,21 @@
 
 """
 
-import os, re, sys, json, subprocess, hashlib
-
+import os, re, sys, Queue, subprocess, hashlib, tempfile, collections
+
+from . import git
+from . import baseline
+from . import sink
+from . import style
+from . import cache
+from . import descriptors
 from . import output
+from . import protoc
+from . import imports
+from . import walker
+from . import exclude
 from enum import Enum
+from multiprocessing.pool import ThreadPool
 
 try:
   import cStringIO as StringIO
@@ -48,6 +59,8 @@ class Linter(object):
     duplicateEnumValue = 15  # 'sample/Sample.proto: "sample.two" uses the same enum value as "sample.ONE". If this is intended, set 'option allow_alias = true;' to the enum definition.'
     firstEnumValueMustBeZero = 16  # 'the first enum value must be zero in proto3.'
     fieldNumberAlreadyUsed = 17  # 'field number 3 has already been used in "sample.sample" by field "blab".'
+    alreadyDefined = 18  # 'sample/Other.proto:3:9: "sample.Sample" is already defined in file "sample/Sample.proto".'
+    compilerFailed = 19  # reported by the linter, for a proto `protoc` times out, crashes or runs out of memory on
 
   Names = {
     # -- Warnings
@@ -69,7 +82,9 @@ class Linter(object):
     Errors.unexpectedEnd: "Bug Risk/Unexpected End of Input",
     Errors.duplicateEnumValue: "Bug Risk/Duplicate Enum Value",
     Errors.firstEnumValueMustBeZero: "Bug Risk/First Enum Value",
-    Errors.fieldNumberAlreadyUsed: "Bug Risk/Field Number Used"
+    Errors.fieldNumberAlreadyUsed: "Bug Risk/Field Number Used",
+    Errors.alreadyDefined: "Bug Risk/Symbol Already Defined",
+    Errors.compilerFailed: "Bug Risk/Compiler Failed"
   }
 
   Severity = {
@@ -92,7 +107,9 @@ class Linter(object):
     Errors.unexpectedEnd: "critical",
     Errors.duplicateEnumValue: "critical",
     Errors.firstEnumValueMustBeZero: "critical",
-    Errors.fieldNumberAlreadyUsed: "critical"
+    Errors.fieldNumberAlreadyUsed: "critical",
+    Errors.alreadyDefined: "critical",
+    Errors.compilerFailed: "blocker"
   }
 
   SeverityHandler = {
@@ -122,7 +139,9 @@ class Linter(object):
     Errors.unexpectedEnd: 50000,
     Errors.duplicateEnumValue: 70000,
     Errors.firstEnumValueMustBeZero: 50000,
-    Errors.fieldNumberAlreadyUsed: 60000
+    Errors.fieldNumberAlreadyUsed: 60000,
+    Errors.alreadyDefined: 70000,
+    Errors.compilerFailed: 90000
   }
 
   Categories = {
@@ -145,7 +164,9 @@ class Linter(object):
     Errors.unexpectedEnd: ["Bug Risk"],
     Errors.duplicateEnumValue: ["Bug Risk"],
     Errors.firstEnumValueMustBeZero: ["Bug Risk", "Style"],
-    Errors.fieldNumberAlreadyUsed: ["Bug Risk"]
+    Errors.fieldNumberAlreadyUsed: ["Bug Risk"],
+    Errors.alreadyDefined: ["Bug Risk"],
+    Errors.compilerFailed: ["Bug Risk"]
   }
 
   Message = {
@@ -168,24 +189,86 @@ class Linter(object):
     Errors.unexpectedEnd: "Unexpected end of input, missing '}'",
     Errors.duplicateEnumValue: "%(message)s",
     Errors.firstEnumValueMustBeZero: "the first enum value must be zero in proto3",
-    Errors.fieldNumberAlreadyUsed: "%(message)s"
+    Errors.fieldNumberAlreadyUsed: "%(message)s",
+    Errors.alreadyDefined: "%(message)s",
+    Errors.compilerFailed: "Protoc failed on this file: it %(message)s."
   }
 
+  # shapes of output lines, each taking an alternation of the messages that identify issue types
+  LintLine = r"(?P<file>[^\s:]+\.proto):(?P<line>\d+):(?P<column>\d+):?\s+'(?P<context>[^']*)' - %s"
+  LibprotobufLine = r"\[libprotobuf [^\]]*\]\s*%s"
+  WarningLine = r"'?(?P<file>[^\s':]+)'?(?::(?P<line>\d+))?(?::(?P<column>\d+))?: warning: %s"
+  ErrorLine = r"\s*(?P<file>[^\s\[:][^:]*)(?::(?P<line>\d+))?(?::(?P<column>\d+))?: \s*%s"
+
+  Patterns = (
+    # -- Warnings
+    # 'TestMessageProto3.proto:19:9: 'sampleLameMessageTitle' - Use CamelCase (with an initial capital) for message names.'
+    (Warnings.messageCase, LintLine, r".*message names.*"),
+    (Warnings.fieldCase, LintLine, r".*field names.*"),
+    (Warnings.enumTypeCase, LintLine, r".*enum type names.*"),
+    (Warnings.enumValueCase, LintLine, r".*enum value names.*"),
+    (Warnings.serviceCase, LintLine, r".*service names.*"),
+    (Warnings.rpcMethodCase, LintLine, r".*method names.*"),
+    # '[libprotobuf WARNING google/protobuf/compiler/parser.cc:546] No syntax specified for the proto file: exchange.proto. Please use ...'
+    (Warnings.syntaxUnspecified, LibprotobufLine, r"no syntax specified[^:]*: (?P<file>\S+?)\.?(?:\s.*)?"),
+    # 'auth/AuthorizeUserResponse.proto: warning: Import partner/PartnerLocation.proto but not used.'
+    # 'sample/Sample.proto:6:1: warning: Import base/TestMessage.proto is unused.'
+    (Warnings.importUnused, WarningLine, r"import (?P<context>\S*\.proto\S*) (?:but not used|is unused)\.?"),
+
+    # -- Errors, as worded by `protoc`
+    # 'sample/Sample.proto:13:3: "testMessage" is not defined.'
+    (Errors.fileNotFound, ErrorLine, r"file not found\.?"),
+    (Errors.importUnresolved, ErrorLine, r"import \"(?P<context>[^\"]*\.proto[^\"]*)\" was not found or had errors\.?"),
+    (Errors.notDefined, ErrorLine, r"\"(?P<context>[^\"]*)\" is not defined\.?"),
+    (Errors.missingFieldNumber, ErrorLine, r"missing field number\.?"),
+    (Errors.unexpectedToken, ErrorLine, r"expected[^\"]*\"(?P<context>[^\"]*)\".*"),
+    (Errors.unexpectedEnd, ErrorLine, r"reached end of input.*"),
+    (Errors.duplicateEnumValue, ErrorLine, r"\"[^\"]*\" uses the same enum value as .*"),
+    (Errors.firstEnumValueMustBeZero, ErrorLine, r"(?:the )?first enum value must be zero.*"),
+    (Errors.fieldNumberAlreadyUsed, ErrorLine, r"field number \d+ has already been used.*"),
+    (Errors.alreadyDefined, ErrorLine, r"\"(?P<context>[^\"]*)\" is already defined in .*"),
+
+    # -- Errors, worded any other way
+    (Errors.fileNotFound, ErrorLine, r".*file not found.*"),
+    (Errors.importUnresolved, ErrorLine, r"(?=.*was not found or had errors)[^\"]*\"(?P<context>[^\"]*\.proto[^\"]*)\".*"),
+    (Errors.notDefined, ErrorLine, r"(?=.*is not defined)[^\"]*\"(?P<context>[^\"]*)\".*"),
+    (Errors.missingFieldNumber, ErrorLine, r".*missing field number.*"),
+    (Errors.unexpectedToken, ErrorLine, r"(?=.*expected)[^\"]*\"(?P<context>[^\"]*)\".*"),
+    (Errors.unexpectedEnd, ErrorLine, r".*reached end of input.*"),
+    (Errors.duplicateEnumValue, ErrorLine, r".*uses the same enum value as.*"),
+    (Errors.firstEnumValueMustBeZero, ErrorLine, r".*first enum value must be zero.*"),
+    (Errors.fieldNumberAlreadyUsed, ErrorLine, r"(?=.*field number).*has already been used.*"),
+    (Errors.alreadyDefined, ErrorLine, r"(?=.*is already defined)[^\"]*\"(?P<context>[^\"]*)\".*")
+  )
+
+  Classifier = None  # compiled from `Patterns` on first use
+  Templates = None  # built from the tables above on first export, by `compile_templates`
+
   ## -- Internals -- ##
   __slots__ = (
-    'config', 'raw_output', 'issues', 'exit',
-    'arguments', 'protofiles', 'regexes')
+    'config', 'raw_output', 'issues', 'summary', 'exit', 'names',
+    'arguments', 'protofiles', 'roots', 'proto_paths', 'paths', 'graph', 'excludes', 'results', 'aborted')
 
   def __init__(self, config, arguments):
 
     """ Initialize the main `Linter` object.
 
-        :param config: `config.LinterConfig` object. """
+        :param config: `config.LinterConfig` object.
+        :param arguments: Parsed `cli.parser` arguments, or `None`. With
+                          `retain_issues`, every issue reported by the last
+                          run is kept in `issues`, which is `None` otherwise. """
 
     self.config = config
-    self.issues = []
+    self.issues = [] if getattr(arguments, 'retain_issues', False) else None
+    self.summary = Summary()
+    self.names = {}  # protofile names reported in issues, one copy of each
     self.arguments = arguments
-    self.regexes = {}
+    self.graph = None
+    self.paths = {}
+    self.proto_paths = []
+    self.excludes = None  # configured exclude paths, compiled on first discovery
+    self.results = None  # result cache to use instead of `--cache`, for linters kept running
+    self.aborted = set()  # protofiles of the last lint which `protoc` stopped compiling before linting them
 
   def __make_abspath(self, path):
 
@@ -200,422 +283,497 @@ class Linter(object):
       return os.path.abspath(os.path.join(self.__make_abspath(self.config.workspace), path))
     return path  # already absolute
 
-  def __scan(self, path):
+  def __scan(self, paths):
 
-    """ Scan one of the prefix paths for protos. """
+    """ Scan the prefix paths for protos, in-process, skipping excluded
+        directories before they are walked and excluded protos once found.
+        A prefix path nested in another is only walked once, on its own.
 
-    resolved_path = None
-    if path.startswith('/'):
-      resolved_path = path  # it's already an absolute path
-    else:
-      # it's relative to the workspace directory
-      resolved_path = os.path.abspath(
-        os.path.join(self.config.workspace, path))
-    find_output = subprocess.check_output(
-      ['find', resolved_path, '-name', '*.proto'])
+        :param paths: Absolute include paths to scan.
+        :returns: Generator of discovered protofile paths. """
 
-    if find_output:
-      for line in find_output.split('\n'):
-        yield line.strip()
+    excludes, roots = self.excludes, frozenset(paths)
+    threads = getattr(self.arguments, 'scan_threads', None)
+    if excludes is None:
+      return walker.walk_roots(paths, exclude=roots.__contains__, threads=threads)
+    return self.__included(walker.walk_roots(
+      paths, exclude=lambda path: path in roots or excludes(path, True), threads=threads))
 
-  def __compile_regex(self, formula):
+  def __included(self, protofiles):
 
-    """ Compile a regex exclude_path.
+    """ Drop protofiles matching a configured exclude path.
 
-        :param formula: Regex formula.
-        :returns: Compiled regex, which can be cached. """
+        :param protofiles: Iterable of discovered protofile paths.
+        :returns: Generator of protofile paths that are not excluded. """
 
-    if formula in self.regexes:
-      return self.regexes[formula]
-    regex = re.compile(formula)
-    self.regexes[formula] = regex
-    return regex
+    excludes = self.excludes
+    for protofile in protofiles:
+      if excludes(protofile):
+        output.say('Skipping excluded path "%s".', protofile)
+        continue
+      yield protofile
 
-  def __exclude_match(self, path, exclude_path):
+  def __roots(self):
 
-    """ See if a path candidate to be scanned could match a configured
-        exclude path.
+    """ Resolve the configured include paths into include roots, dropping
+        those that are excluded or missing, and those naming the same
+        directory as an earlier one, through symlinks or otherwise.
 
-        :param path: Path to scan, potentially.
-        :param exclude_path: Path configured for exclusion.
-        :returns: `True` if `path` should be excluded, due to matching `exclude_path`. """
+        :returns: List of tuples of an absolute include root and its real path. """
 
-    # simple prefix match
-    if not path.startswith(exclude_path) and not path.replace(self.workspace, "").startswith(exclude_path):
-      # regex match maybe?
-      try:
-        regex = self.__compile_regex(exclude_path)
-        if regex:
-          result = regex.match(path)
-          if result:
-            output.say("Path '%s' excluded by exclusion path '%s'." % (path, exclude_path))
-            return True  # should be excluded
-          else:
-            return False  # did not match
-      except ValueError:
-        output.say("Unable to compile exclude_path as regex: '%s'" % exclude_path)
-      return False  # did not exclude
-    return True  # should be excluded
+    roots, seen = [], {}
+    for configured_path in self.config.include_paths:
+      include_path = self.__make_abspath(configured_path)
+
+      # handle excluded paths
+      if self.excludes is not None and self.excludes(include_path, True):
+        output.say('Skipping excluded path "%s".', configured_path)
+        continue
+
+      if os.path.isdir(include_path):
+        realpath = os.path.realpath(include_path)
+        if realpath in seen:
+          output.say('Skipping include_path "%s", the same as "%s".', include_path, seen[realpath])
+          continue
+        seen[realpath] = include_path
+        roots.append((include_path, realpath))
+    return roots
+
+  @staticmethod
+  def __scan_paths(roots):
+
+    """ Narrow include roots to those to scan, in order, leaving out those
+        nested in a root scanned before them, whose protofiles it finds.
+
+        :param roots: List of tuples of an include root and its real path, from `__roots`.
+        :returns: List of include roots to scan. """
+
+    scanned = []
+    for include_path, realpath in roots:
+      outer = [path for path, outer_realpath in scanned if realpath.startswith(os.path.join(outer_realpath, ''))]
+      if outer:
+        output.say('Skipping include_path "%s", already scanned through "%s".', include_path, outer[0])
+        continue
+      output.say('Scanning include_path "%s"...', include_path)
+      scanned.append((include_path, realpath))
+    return [include_path for include_path, _ in scanned]
+
+  @staticmethod
+  def __nested(roots):
+
+    """ Find the include roots nested in another, comparing real paths.
+
+        :param roots: List of tuples of an include root and its real path, from `__roots`.
+        :returns: Set of the nested include roots. """
+
+    prefixes = [os.path.join(realpath, '') for _, realpath in roots]
+    return set(include_path for include_path, realpath in roots
+               if any(realpath.startswith(prefix) for prefix in prefixes))
+
+  @staticmethod
+  def __unique(protofiles):
+
+    """ Drop protofiles found again through a symlink into another root,
+        comparing real paths, resolved once per directory.
+
+        :param protofiles: List of discovered protofile paths.
+        :returns: List of protofile paths, each file listed once. """
+
+    directories, seen, unique = {}, set(), []
+    for protofile in protofiles:
+      directory, name = os.path.split(protofile)
+      if directory not in directories:
+        directories[directory] = os.path.realpath(directory)
+      realpath = os.path.join(directories[directory], name)
+      if realpath in seen:
+        output.say('Skipping already-scanned path "%s".', protofile)
+        continue
+      seen.add(realpath)
+      unique.append(protofile)
+    return unique
+
+  def __minimal_proto_paths(self, roots, nested, protofiles):
+
+    """ Pick the smallest set of include roots to pass as `--proto_path`: those
+        not nested in another root and holding discovered protofiles, so
+        `protoc` can name each of them, and those some import is resolved
+        through first. Dropping any other root changes neither, so `protoc`
+        resolves every import exactly as before, without probing roots that
+        never hold what it looks for. Roots keep their order, and the import
+        graph built here is kept for the run.
+
+        :param roots: List of tuples of an include root and its real path, from `__roots`.
+        :param nested: Nested include roots, from `__nested`.
+        :param protofiles: List of discovered protofile paths.
+        :returns: List of include roots, in lookup order. """
+
+    proto_paths = [include_path for include_path, _ in roots]
+    if len(proto_paths) < 2:
+      return proto_paths
+
+    self.graph = imports.ImportGraph(protofiles, proto_paths)
+    needed = self.graph.used_paths()
+    for proto_path in proto_paths:
+      prefix = os.path.join(proto_path, '')
+      if proto_path not in nested and any(protofile.startswith(prefix) for protofile in protofiles):
+        needed.add(proto_path)
+
+    minimal = [proto_path for proto_path in proto_paths if proto_path in needed]
+    if len(minimal) < len(proto_paths):
+      output.say('Passing %s of %s include paths to protoc, as no import is resolved through the others.',
+                 len(minimal), len(proto_paths))
+    self.graph.proto_paths = tuple(minimal)
+    return minimal
+
+  def discover(self):
+
+    """ Resolve the configured include paths and scan them for protos. Include
+        roots naming the same directory are scanned once, and roots nested in
+        one scanned earlier are not scanned again, so each protofile is found
+        once, and only the include roots `protoc` needs are kept as proto
+        paths. The import graph of an earlier scan is dropped, so it is built
+        afresh.
+
+        :returns: List of discovered protofile paths. """
+
+    self.graph = None
+    self.proto_paths = []
+    if self.excludes is None and self.config.exclude_paths:
+      self.excludes = exclude.Matcher(self.config.exclude_paths, self.workspace)
+
+    roots = self.__roots()
+    self.roots = self.__scan_paths(roots)
+    protofiles = list(self.__scan(self.roots))
+    if len(self.roots) > 1:
+      protofiles = self.__unique(protofiles)
+
+    if __debug__ and output.enabled('debug'):
+      if len(protofiles) == 0:
+        output.say('Found no protos.')
+      else:
+        output.say('Found %s protos:', len(protofiles))
+        for proto_file in protofiles:
+          output.say('- %s', proto_file)
 
-  def __command(self, base):
+    if len(protofiles) == 0:
+      output.say("No files to analyze. Exiting.")
+      sys.exit(0)
+
+    self.proto_paths = self.__minimal_proto_paths(roots, self.__nested(roots), protofiles)
+    self.protofiles = frozenset(protofiles)
+    self.__index_paths(protofiles)
+    return protofiles
+
+  def __command(self, base, protofiles):
 
     """ Generate command flags to pass to `protoc`.
 
         :param base: Initial command arguments.
+        :param protofiles: Protofiles to compile in this invocation.
         :return: Command flags, based on config. """
 
-    prefixes = []
-    protofiles = []
-    exclude_paths = self.config.exclude_paths
-    include_paths = self.config.include_paths
+    base.extend('--proto_path=%s' % proto_path for proto_path in self.proto_paths)
+    base.extend(protofiles)
+    base.append('--lint_out=/.linter')
+    return base
 
-    for configured_path in include_paths:
+  def __import_graph(self):
 
-      # handle excluded paths
-      if configured_path in exclude_paths or (
-        any(filter(lambda exclude_path: self.__exclude_match(configured_path, exclude_path), exclude_paths))):
-        output.say('Skipping excluded path "%s".' % configured_path)
-        continue
+    """ Build the import graph of discovered protofiles, once per run.
 
-      protofile_batch = []
-      include_path = self.__make_abspath(configured_path)
+        :returns: `imports.ImportGraph` of the workspace. """
 
-      if os.path.isdir(include_path):
-        prefixes.append('--proto_path=%s' % include_path)
+    if self.graph is None:
+      self.graph = imports.ImportGraph(self.protofiles, self.proto_paths)
+    return self.graph
 
-        output.say('Scanning include_path "%s"...' % include_path)
+  def __changed(self, protofiles, ref):
 
-        for protofile in self.__scan(include_path):
-          if protofile:
-            protofile_batch.append(protofile)
+    """ Narrow discovered protofiles to those changed since a git ref, plus
+        every protofile that transitively imports one of them.
 
-        if __debug__:
-          if len(protofile_batch) == 0:
-            output.say('Found no protos.')
-          else:
-            output.say('Found %s protos:' % str(len(protofile_batch)))
-            for proto_file in protofile_batch:
-              output.say('- %s' % proto_file)
+        :param protofiles: List of discovered protofile paths.
+        :param ref: Git ref to compare against.
+        :returns: List of protofiles affected by the change. """
 
-        if len(protofile_batch) > 0:
-          protofiles.extend(protofile_batch)
+    try:
+      changed = git.changed_protofiles(ref, self.__make_abspath(self.workspace))
+    except (OSError, subprocess.CalledProcessError) as e:
+      output.error('Unable to list protos changed since "%s": %s', ref, e)
+      sys.exit(1)
 
-    if len(protofiles) == 0:
+    # git reports real paths, which may differ from scanned paths through symlinks
+    realpaths = dict((os.path.realpath(protofile), protofile) for protofile in protofiles)
+    changed = [realpaths.get(os.path.realpath(path), path) for path in changed]
+
+    affected = self.__import_graph().dependents(changed)
+    output.info('Found %s protos changed since "%s", affecting %s protos.', len(changed), ref, len(affected))
+
+    if len(affected) == 0:
       output.say("No files to analyze. Exiting.")
       sys.exit(0)
 
-    base.extend(prefixes)
-    base.extend(protofiles)
-    self.protofiles = frozenset(protofiles)
-    base.append('--lint_out=/.linter')
-    return base
+    return [protofile for protofile in protofiles if protofile in affected]
 
-  def __resolve_warning(self, issue_msg):
-
-    """ Resolve a unique enumerated code for this issue so
-        it may be understood for severity and remediation.
-
-        :param issue_msg: Parsed message from the issue.
-        :returns: Enumerated `Warning` type for this issue.
-        :raises ValueError: If the `Warning` type cannot be parsed. """
-
-    # @TODO(sgammon): fork/file PRs to get issue ID output from plugin
-    # from: https://github.com/ckaznocha/protoc-gen-lint/blob/master/linter/linter.go#L32
-
-    if 'message names' in issue_msg:
-      return Linter.Warnings.messageCase
-    elif 'field names' in issue_msg:
-      return Linter.Warnings.fieldCase
-    elif 'enum type names' in issue_msg:
-      return Linter.Warnings.enumTypeCase
-    elif 'enum value names' in issue_msg:
-      return Linter.Warnings.enumValueCase
-    elif 'service names' in issue_msg:
-      return Linter.Warnings.serviceCase
-    elif 'method names' in issue_msg:
-      return Linter.Warnings.rpcMethodCase
-    elif 'no syntax specified' in issue_msg:
-      return Linter.Warnings.syntaxUnspecified
-    elif 'import' in issue_msg and 'but not used' in issue_msg:
-      return Linter.Warnings.importUnused
-    else:
-      raise ValueError('cannot parse issue line for type: %s' % issue_msg)
-
-  def __resolve_error(self, error_msg):
-
-    """ Resolve a unique enumerated code for a potential error so
-        it may be understood for severity and remediation.
-
-        :param error_msg: Potential error message from the compiler.
-        :returns: Enumerated `Error` type for this issue, or `None`. """
-
-    # @TODO(sgammon): fork/file PRs to get issue ID output from plugin
-    # from: https://github.com/ckaznocha/protoc-gen-lint/blob/master/linter/linter.go#L32
-
-    if 'file not found' in error_msg:
-      return Linter.Errors.fileNotFound
-    elif 'was not found or had errors' in error_msg:
-      return Linter.Errors.importUnresolved
-    elif 'is not defined' in error_msg:
-      return Linter.Errors.notDefined
-    elif 'missing field number' in error_msg:
-      return Linter.Errors.missingFieldNumber
-    elif 'expected' in error_msg:
-      return Linter.Errors.unexpectedToken
-    elif 'reached end of input' in error_msg:
-      return Linter.Errors.unexpectedEnd
-    elif 'uses the same enum value as' in error_msg:
-      return Linter.Errors.duplicateEnumValue
-    elif 'first enum value must be zero' in error_msg:
-      return Linter.Errors.firstEnumValueMustBeZero
-    elif 'field number' in error_msg and 'has already been used' in error_msg:
-      return Linter.Errors.fieldNumberAlreadyUsed
-    raise NotImplementedError("Error is not implemented: '%s'" % error_msg)
-
-  def __resolve_context(self, resolved_error, error_message):
-
-    """ Resolve contextual information during the parsing of an error
-        emitted by the `protoc` compiler.
-
-        :param resolved_error: `Error` type.
-        :param error_message: Error message to parse.
-        :returns: Context related to the error to include. """
-
-    error_sample = error_message.lower().strip()
-    if resolved_error == Linter.Errors.fileNotFound:
-      return  # context is not supported for file-not-found stuff
-    elif resolved_error == Linter.Errors.unexpectedEnd:
-      return  # no context needed
-    elif resolved_error == Linter.Errors.missingFieldNumber:
-      return  # compiler provides no context for missing field number errors
-    elif resolved_error == Linter.Errors.duplicateEnumValue:
-      return  # no context for duplicate enum values
-    elif resolved_error == Linter.Errors.firstEnumValueMustBeZero:
-      return  # no context since it's self-explanatory
-    elif resolved_error == Linter.Errors.fieldNumberAlreadyUsed:
-      return  # context is in the message
-    elif resolved_error == Linter.Errors.importUnresolved:
-      error_split = error_message.split("\"")
-      if len(error_split) > 2 and ".proto" in error_split[1]:
-        # it's an import error, the context is in the second position
-        return error_split[1]
-    elif resolved_error in frozenset((
-      Linter.Errors.unexpectedToken, Linter.Errors.notDefined)):
-      error_split = error_message.split("\"")
-      if len(error_split) > 2:
-        # return the symbol that failed
-        return error_split[1]
-    raise NotImplementedError("Error is unimplemented for context: '%s'" % error_message)
-
-  def __parse(self, issue_output):
-
-    """ Parse the output of the `protoc-gen-lint` tool.
-
-        :param output: Output from the linter. """
-
-    # samples:
-    # TestMessageProto3.proto:19:9: 'sampleLameMessageTitle' - Use CamelCase (with an initial capital) for message names.
-    # TestMessageProto3.proto:25:10: 'aggravatingCamelCase' - Use underscore_separated_names for field names.
-    # TestMessageProto3.proto:14:3: 'hello' - Use CAPITALS_WITH_UNDERSCORES  for enum value names.
-    # auth/AuthorizeUserResponse.proto: warning: Import partner/PartnerLocation.proto but not used.
-    for raw_issue in issue_output:
-      # @TODO(sgammon): all of this parsing code needs cleanup work
-      issue_split = raw_issue.split(' - ')
-
-      if not len(issue_split) == 2 or ('libprotobuf' in raw_issue):
-        # it could be an error from the compiler
-        compiler_split = raw_issue.split(': ')
-        if len(compiler_split) == 2:
-          # still could be an error
-          error_file, error_message = tuple(map(lambda x: x.strip(), compiler_split))
-          resolved_error = self.__resolve_error(error_message.lower())
-          if resolved_error:
-            context = self.__resolve_context(resolved_error, error_message)
-
-            error_context = {
-              'protocontext': context}
-
-            if ":" in error_file:
-              # it may have a line and column
-              error_file_split = error_file.split(':')
-              if len(error_file_split) > 1:
-                if len(error_file_split) == 2:
-                  # it's a line number
-                  error_file, error_line = tuple(map(lambda x: x.strip(), error_file_split))
-                  error_context.update({
-                    "protoline": int(error_line)})
-                elif len(error_file_split) == 3:
-                  # it's a line number and a column number
-                  error_file, error_line, error_column = tuple(map(lambda x: x.strip(), error_file_split))
-                  error_context.update({
-                    "protoline": int(error_line),
-                    "protocolumn": int(error_column)})
-
-            yield Error(self, raw_issue, resolved_error, error_message, error_file, **error_context)
-            continue
-
-        # see if libprotobuf is complaining
-        if 'libprotobuf' in raw_issue:
-          lpsplit = raw_issue.split(']')
-          if len(lpsplit) == 2:
-            lpprefix, lpmessage = tuple(map(lambda x: x.strip(), lpsplit))
-
-            lp_protofile = None
-            if '.proto' in lpmessage:
-              # there is a protofile. find it
-              lpblock_split = lpmessage.split(" ")
-              for lp_subblock in lpblock_split:
-                if '.proto' in lp_subblock:
-                  # we found the protofile
-                  if lp_subblock.endswith("."):
-                    lp_protofile = lp_subblock[:-1]
-                  else:
-                    lp_protofile = lp_subblock
-                  break
-
-            if lp_protofile is None:
-              raise ValueError("unable to resolve libprotobuf protofile: \"%s\"" % raw_issue)
-
-            yield Issue(
-              self,
-              raw=raw_issue,
-              type=self.__resolve_warning(lpmessage.lower()),
-              message=lpmessage,
-              protofile=lp_protofile,
-              protoline=1,
-              protocolumn=1,
-              protocontext=None)
-
-            continue
-
-        if 'warning:' in raw_issue:
-          # it's a raw warning, perhaps file-level
-          # 'auth/AuthorizeUserResponse.proto: warning: Import partner/PartnerLocation.proto but not used.'
-          rw_split = raw_issue.split(': ')
-          if rw_split[1] == "warning":
-            # it's a warning, like above
-            rw_protofile, rw_context, rw_message, rw_line, rw_column = (
-              rw_split[0].strip().replace("'", ""),
-              None,
-              rw_split[-1],
-              1,
-              1)
-
-            for rw_block in rw_split[1:]:
-              if '.proto' in rw_block:
-                rw_subsplit = rw_block.split(" ")
-                for rw_subblock in rw_subsplit:
-                  if '.proto' in rw_subblock:
-                    # we found it
-                    rw_context = rw_subblock.strip()
-                    break
-                if rw_context is not None:
-                  break
-
-            if ':' in rw_protofile:
-              rwp_split = rw_protofile.split(':')
-              if len(rwp_split) == 2:  # it's a line reference, like `Blah.proto:123`
-                try:
-                  rw_line = int(rwp_split[-1])
-                except ValueError:
-                  output.say("Unable to decode presumed line number as integer: \"%s\"." % rwp_split[-1])
-              elif len(rwp_split) == 3:  # it's a line and column reference, like `Blah.proto:123:45`
-                try:
-                  rw_line = int(rwp_split[-2])
-                  rw_column = int(rwp_split[-1])
-                except ValueError:
-                  output.say("Unable to decode presumed line and column number as integers: \"%s\"." % str(rwp_split[-2:]))
-
-            yield Issue(
-              self,
-              raw=raw_issue,
-              type=self.__resolve_warning(rw_message.lower()),
-              message=rw_message,
-              protofile=rw_protofile,
-              protoline=rw_line,
-              protocolumn=rw_column,
-              protocontext=rw_context)
-
-            continue
-
-        alt_warning_split = raw_issue.split(": ")
-        if len(alt_warning_split) == 2:
-          if '.proto' in alt_warning_split[0]:
-            # alt warning format:
-            # 'sample/Sample.proto: "sample.two" uses the same enum value as "sample.ONE". If this is intended, set 'option allow_alias = true;' to the enum definition.'
-            alt_filename, alt_message = tuple(alt_warning_split)
-            alt_filename = alt_filename.replace("'", "")
-            alt_line, alt_column = (1, 1)
-
-            if ':' in alt_filename:
-              alt_filename_split = alt_filename.split(':')
-              if len(rwp_split) == 2:  # it's a line reference, like `Blah.proto:123`
-                try:
-                  alt_line = int(alt_filename_split[-1])
-                except ValueError:
-                  output.say("Unable to decode presumed line number as integer: \"%s\"." % alt_filename_split[-1])
-              elif len(alt_filename_split) == 3:  # it's a line and column reference, like `Blah.proto:123:45`
-                try:
-                  alt_line = int(alt_filename_split[-2])
-                  alt_column = int(alt_filename_split[-1])
-                except ValueError:
-                  output.say("Unable to decode presumed line and column number as integers: \"%s\"." % str(alt_filename_split[-2:]))
-
-            yield Error(
-              self,
-              raw=raw_issue,
-              type=self.__resolve_error(alt_message.lower()),
-              message=alt_message,
-              protofile=alt_filename,
-              protoline=alt_line,
-              protocolumn=alt_column,
-              protocontext=None)
-
-        # not an error
-        raise NotImplementedError("No way to handle output: '%s'" % raw_issue)
+  def __shards(self, protofiles):
+
+    """ Split discovered protofiles into shards for parallel execution,
+        keeping files that import each other in a cycle in the same shard.
+
+        :param protofiles: List of discovered protofile paths.
+        :returns: List of protofile lists, one per `protoc` invocation. """
 
+    jobs = getattr(self.arguments, 'jobs', None) or 1
+    if jobs < 2:
+      return [protofiles]
+
+    shards = self.__import_graph().shards(jobs, protofiles)
+    output.say('Split %s protos into %s shards.', len(protofiles), len(shards))
+    return shards
+
+  @staticmethod
+  def compile_patterns(patterns):
+
+    """ Compile a table of output patterns into a single regex, so each line of
+        output is classified with one match. Patterns sharing a line shape are
+        folded into one alternative, so the location part of a line is only
+        parsed once, and groups are renamed so they stay unique.
+
+        :param patterns: Sequence of `(type, shape, message)` patterns, tried in order.
+        :returns: Tuple of the compiled regex, and a dictionary mapping the index of
+                  each message group to its issue type and the indexes of the `file`,
+                  `line`, `column` and `context` groups that apply to it (`0` where
+                  the pattern has no such group). """
+
+    rename = lambda pattern, prefix: re.sub(r'\(\?P<(\w+)>', r'(?P<%s\1>' % prefix, pattern)
+
+    shapes = []
+    for index, (issue_type, shape, message) in enumerate(patterns):
+      if not shapes or shapes[-1][0] != shape:
+        shapes.append((shape, []))
+      shapes[-1][1].append((index, rename(message, 't%s_' % index)))
+
+    classifier = re.compile('^(?:%s)$' % '|'.join(
+      rename(shape, 's%s_' % shape_index) % ('(?:%s)' % '|'.join(
+        '(?P<t%s>%s)' % (index, message) for index, message in messages))
+      for shape_index, (shape, messages) in enumerate(shapes)), re.IGNORECASE)
+
+    fields = {}
+    for shape_index, (shape, messages) in enumerate(shapes):
+      for index, _ in messages:
+        groups = []
+        for name in ('file', 'line', 'column', 'context'):
+          candidates = [classifier.groupindex[group] for group in ('t%s_%s' % (index, name), 's%s_%s' % (shape_index, name))
+                        if group in classifier.groupindex]
+          groups.append(candidates[0] if candidates else 0)
+        fields[classifier.groupindex['t%s' % index]] = (patterns[index][0], tuple(groups))
+    return classifier, fields
+
+  @staticmethod
+  def compile_templates():
+
+    """ Prebuild the part of the exported form of an issue that only depends
+        on its type, for each type, so exporting an issue copies it and only
+        adds what is particular to the issue.
+
+        :returns: Dictionary mapping each issue type to its template. """
+
+    return dict((issue_type, {
+      "type": "issue",
+      "check_name": Linter.Names[issue_type],
+      "categories": Linter.Categories[issue_type],
+      "severity": Linter.Severity[issue_type]
+    }) for issue_type in Linter.Names)
+
+  def intern(self, protofile):
+
+    """ Share one copy of each protofile name among the issues of this linter.
+
+        :param protofile: Protofile name, as reported.
+        :returns: The first equal name seen. """
+
+    return self.names.setdefault(protofile, protofile)
+
+  def classify(self, raw_issue):
+
+    """ Classify a single line of output from `protoc` or `protoc-gen-lint`,
+        resolving its type, file, line, column and context in one match.
+
+        :param raw_issue: Raw line of output.
+        :returns: `Issue` or `Error` object for the line.
+        :raises NotImplementedError: If the line matches no known output. """
+
+    if Linter.Classifier is None:
+      Linter.Classifier = Linter.compile_patterns(Linter.Patterns)
+    classifier, fields = Linter.Classifier
+
+    match = classifier.match(raw_issue)
+    if match is None:
+      raise NotImplementedError("No way to handle output: '%s'" % raw_issue)
+
+    index = match.lastindex
+    issue_type, groups = fields[index]
+    values = match.groups()
+    protofile, protoline, protocolumn, protocontext = [
+      values[group - 1] if group else None for group in groups]
+
+    return (Error if issue_type.__class__ is Linter.Errors else Issue)(
+      self, raw_issue, issue_type, values[index - 1].rstrip(), protofile,
+      int(protoline) if protoline else None,
+      int(protocolumn) if protocolumn else None,
+      protocontext)
+
+  def __package(self, name, packages):
+
+    """ Find the package of a protofile, as `protoc` names it.
+
+        :param name: Name of the protofile, relative to a proto path.
+        :param packages: Dictionary of packages found so far, to look each protofile up once.
+        :returns: Name of its package, an empty string for protos without one,
+                  or `None` if the protofile cannot be found. """
+
+    if name not in packages:
+      packages[name] = None
+      for proto_path in self.proto_paths:
+        candidate = os.path.join(proto_path, name)
+        if os.path.isfile(candidate):
+          try:
+            packages[name] = imports.package(candidate)
+          except (IOError, OSError):
+            pass
+          break
+    return packages[name]
+
+  def __cause_of(self, error, causes, packages):
+
+    """ Attribute an undefined symbol to an import its proto failed to compile
+        because of. The symbol must be qualified with the package of that
+        import, or, where the import cannot be found to read its package, be
+        qualified with any package but that of the proto using it. Unqualified
+        symbols, like a typo, are never attributed to an import.
+
+        :param error: `notDefined` error, with the symbol in its context.
+        :param causes: List of tuples of each root import and the package of the
+                       import leading to it, `None` where unknown, for the proto.
+        :param packages: Dictionary of packages found so far.
+        :returns: Root import the error is caused by, or `None`. """
+
+    symbol = (error.context or '').lstrip('.')
+    if '.' not in symbol:
+      return None
+    for cause, package in causes:
+      if package and symbol.startswith(package + '.'):
+        return cause
+    own = self.__package(error.file, packages)
+    if own and symbol.startswith(own + '.'):
+      return None
+    for cause, package in causes:
+      if package is None:
+        return cause
+    return None
+
+  def collapse(self, issues, details=False):
+
+    """ Collapse cascades of compiler errors into their root cause. When an
+        import is missing or fails to compile, `protoc` reports it as
+        unresolved in every proto importing it, then every symbol those protos
+        use from it as undefined, and so on for the protos importing those.
+        Each such error is attributed to the import at the root of its
+        cascade, and reported once, at the earliest proto importing it by
+        path and line, however its errors arrived, along with how many errors
+        and protos it affects. Other issues pass through as they arrive, and
+        root causes follow once every issue is seen, since the protos of a
+        cascade may be compiled by separate runs of `protoc`.
+
+        :param issues: Iterable of `Issue` and `Error` objects, in output order.
+        :param details: Keep the location of every collapsed error, to be exported.
+        :returns: Generator of `Issue`, `Error` and `Cascade` objects. """
+
+    unresolved = collections.OrderedDict()  # protofile, as `protoc` names it: its unresolved imports
+    undefined = []  # undefined symbols in protos with unresolved imports, until every issue is seen
+    packages = {}  # protofile, as `protoc` names it: its package
+    location = lambda error: (error.file, error.line or 0, error.column or 0)
+
+    for issue in issues:
+      if issue.type == Linter.Errors.importUnresolved and issue.context:
+        unresolved.setdefault(issue.file, []).append(issue)
+      elif issue.type == Linter.Errors.notDefined and issue.file in unresolved:
+        undefined.append(issue)
       else:
-        # it's output from the linter
-        issue_context_raw, issue_message = tuple(issue_split)
-
-        # parse issue context
-        issue_context_split = issue_context_raw.split(' ')
-        issue_file_line_context, further_context = issue_context_split[0], ' '.join(issue_context_split[1:]).strip().replace('\'', '')
-
-        # parse file/line context
-        issue_file_line_context_split = issue_file_line_context.split('.proto')
-        issue_file_name = '.'.join((issue_file_line_context_split[0], 'proto'))
-        issue_line_number = issue_file_line_context.split(':')[1]
-        issue_column_number = issue_file_line_context.split(':')[2]
-
-        yield Issue(
-          self,
-          raw=raw_issue,
-          type=self.__resolve_warning(issue_message),
-          message=issue_message,
-          protofile=issue_file_name,
-          protoline=int(issue_line_number.replace(':', '').strip()),
-          protocolumn=int(issue_column_number.replace(':', '').strip()),
-          protocontext=further_context)
-
-  def __execute(self):
-
-    """ Execute the linter tool according to the provided config,
-        and gather the output so it may be parsed.
-
-        :returns: Gathered output of the tool, in a `StringIO` object. """
-
-    command = self.__command(['protoc'])
-    issues_to_output = []
+        yield issue
+
+    def root_of(name):
+      seen = set()
+      while name in unresolved and name not in seen:
+        seen.add(name)
+        name = min(unresolved[name], key=location).context
+      return name
+
+    roots = {}  # root import: errors it caused
+    causes = {}  # protofile: root imports it failed to compile because of, with the packages of its imports
+    for protofile, errors in unresolved.iteritems():
+      for error in errors:
+        cause = root_of(error.context)
+        roots.setdefault(cause, []).append(error)
+        causes.setdefault(protofile, []).append((cause, self.__package(error.context, packages)))
+
+    for error in sorted(undefined, key=location):
+      cause = self.__cause_of(error, causes[error.file], packages)
+      if cause is None:
+        yield error
+      else:
+        roots[cause].append(error)
+
+    collapsed = 0
+    for errors in sorted(roots.values(), key=lambda errors: min(location(error) for error in errors)):
+      errors.sort(key=location)
+      root = min(errors, key=lambda error: (error.type != Linter.Errors.importUnresolved,) + location(error))
+      if len(errors) == 1:
+        yield root
+        continue
+      cascade = Cascade(root, details)
+      for error in errors:
+        if error is not root:
+          cascade.add(error)
+      collapsed += cascade.errors
+      yield cascade
+
+    if collapsed:
+      output.info('Collapsed %s errors caused by %s broken imports.', collapsed, len(roots))
+
+  def __run(self, command, timeout=None, outcome=None):
+
+    """ Run a single `protoc` invocation, without a shell, streaming its output
+        line by line as it is produced, instead of buffering it until `protoc`
+        exits. Commands too long for the command line go through an argument file.
+        The run is killed once past its timeout, along with plugins it started,
+        and with `--protoc-memory`, the memory of each of them is capped.
+
+        :param command: Full `protoc` command to run.
+        :param timeout: Seconds the run may take, or `None` to let it run.
+        :param outcome: Dictionary to record under `linted` whether `protoc`
+                        ran the plugin, once the run is done, if given.
+        :returns: Generator of output lines due to be parsed.
+        :raises protoc.Failure: If the run timed out, or crashed or was killed without output. """
+
+    issue_count = 0
     issue_count_from_plugin = None
+    libprotobuf_warning = False
+    memory = getattr(self.arguments, 'protoc_memory', None)
 
-    try:
-      result = subprocess.check_output(' '.join(command), stderr=subprocess.STDOUT, shell=True)
+    with protoc.command_line(command) as argv:
+      try:
+        process = protoc.start(argv, memory and memory * 1024 * 1024)
+      except OSError as e:
+        output.error('Unable to run "%s": %s', argv[0], e)
+        sys.exit(1)
+
+      watchdog = protoc.Watchdog(process, timeout)
+      finished = False
+      try:
+        for line in iter(process.stdout.readline, ''):
+          line = line.rstrip('\r\n')
 
-    except subprocess.CalledProcessError as e:
-      if e.output:
-        # we have output
-        for line in e.output.split('\n'):
           # filter out lines that are empty
           if not line: continue
 
@@ -627,28 +785,437 @@ class Linter(object):
               lastline_split = line.split(' ')
               count_str = lastline_split[-1].replace('.', '').strip()
               issue_count_from_plugin = int(count_str)
-            except ValueError as e:
+            except ValueError:
               pass
 
           # process issues
           else:
             # it's a warning line, due to be parsed
-            issues_to_output.append(line)
+            issue_count += 1
+            libprotobuf_warning = libprotobuf_warning or 'libprotobuf WARNING' in line
+            yield line
+        finished = True
+
+      finally:
+        watchdog.cancel()
+        if not finished:
+          protoc.kill(process)  # abandoned half way, its output is not wanted anymore
+        process.stdout.close()
+        returncode = process.wait()
+
+    if watchdog.expired:
+      raise protoc.Failure('timed out', 'after %ss' % timeout)
+    if returncode < 0:
+      raise protoc.Failure('was killed', 'by signal %s' % -returncode)
+    if returncode == 0:
+      output.info('No issues found.')
+    elif issue_count == 0 and issue_count_from_plugin is None:
+      raise protoc.Failure('crashed without output', 'with status %s' % returncode)
+    if outcome is not None:
+      # compile errors in any proto stop `protoc` before it runs the plugin on every proto
+      outcome['linted'] = returncode == 0 or issue_count_from_plugin is not None
+
+    if (issue_count != issue_count_from_plugin) and __debug__:
+      if not libprotobuf_warning:
+        output.warn('Number of reported issues from plugin (%s) does not match number of issues parsed (%s).',
+                    issue_count_from_plugin, issue_count)
+    else:
+      output.info('Reporting %s issues.', issue_count)
+
+  def __protoc_name(self, protofile):
+
+    """ Name a protofile the way `protoc` reports it, relative to the first
+        `--proto_path` holding it.
+
+        :param protofile: Absolute path to a protofile.
+        :returns: Name of the protofile in `protoc` output. """
+
+    for proto_path in self.proto_paths:
+      prefix = os.path.join(proto_path, '')
+      if protofile.startswith(prefix):
+        return protofile[len(prefix):]
+    return protofile
+
+  def __compile(self, protofiles, timeout, seen=frozenset()):
+
+    """ Compile protofiles with one supervised `protoc` run, classifying its
+        output as it streams in. If the run times out, crashes or is killed
+        without output, or produces output about a proto that cannot be
+        parsed, its protofiles are split in halves, each compiled again, so
+        the healthy ones are still linted, down to the protofiles failing on
+        their own, which are reported as `compilerFailed` errors. Output that
+        cannot be parsed and names no proto is logged, and otherwise ignored. Issues
+        reported before a run failed are not reported again. Protofiles of a
+        run stopped by compile errors before the plugin ran are recorded in
+        `aborted`, since their lint warnings are missing.
+
+        :param protofiles: Protofiles to compile.
+        :param timeout: Seconds the run may take, or `None` to let it run.
+        :param seen: Hashes of output lines reported already, by failed runs over these protofiles.
+        :returns: Generator of `Issue` and `Error` objects. """
+
+    reported = set(seen)
+    outcome = {}
+    lines = self.__run(self.__command(['protoc'], protofiles), timeout, outcome)
+    try:
+      for line in lines:
+        key = hash(line)
+        if key in reported:
+          continue
+        try:
+          issue = self.classify(line)
+        except (NotImplementedError, ValueError) as e:
+          if protoc.names_proto(line):
+            raise protoc.Failure('produced output that could not be parsed', repr(line))
+          reported.add(key)
+          output.warn('Ignoring output of protoc about no proto in particular: %s', e)  # bisecting would not isolate it
+          continue
+        reported.add(key)
+        yield issue
+      if not outcome.get('linted'):
+        self.aborted.update(protofiles)
+      return
+    except protoc.Failure as e:
+      failure = e
+    finally:
+      lines.close()
+
+    if len(protofiles) == 1:
+      output.error('Protoc %s on "%s".', failure, protofiles[0])
+      yield Error(self, None, Linter.Errors.compilerFailed, failure.reason, self.__protoc_name(protofiles[0]))
+      return
+
+    output.warn('Protoc %s on %s protos, compiling them again in halves to isolate the cause.',
+                failure, len(protofiles))
+    half = len(protofiles) // 2
+    for part in (protofiles[:half], protofiles[half:]):
+      for issue in self.__compile(part, protoc.timeout_for(timeout, len(part), len(protofiles)), reported):
+        yield issue
+
+  def __execute(self, protofiles):
+
+    """ Execute the linter tool according to the provided config, and
+        classify its output while `protoc` is running. With `--jobs` above
+        one, protos are split into shards which are compiled by parallel
+        `protoc` processes, and their issues are merged as they arrive. Shards
+        compile the protos they import themselves, so errors in a proto that
+        several of them import are reported once, by location and message,
+        as a single `protoc` run would report them. Each run is
+        supervised, and isolates the protos it fails on.
+
+        :param protofiles: Protofiles to compile.
+        :returns: Generator of `Issue` and `Error` objects. """
+
+    shards = self.__shards(protofiles)
+    timeout = getattr(self.arguments, 'protoc_timeout', None)
+    if timeout is None:
+      timeout = protoc.DEFAULT_TIMEOUT
+
+    if len(shards) == 1:
+      for issue in self.__compile(shards[0], timeout):
+        yield issue
+      return
+
+    issues = Queue.Queue(maxsize=1024)
+
+    def run_shard(protofiles):
+      try:
+        for issue in self.__compile(protofiles, timeout):
+          issues.put(issue)
+      except BaseException as e:
+        issues.put(e)  # re-raised in the consuming thread
       else:
-        output.error("Protoc crashed but we got no output.")
-        sys.exit(1)
+        issues.put(None)
 
-    else:
-      output.info('No issues found.')
+    pool = ThreadPool(len(shards))
+    reported = set()  # locations and messages of errors, which several shards may report
+    try:
+      pool.map_async(run_shard, shards)
+      finished = 0
+      while finished < len(shards):
+        issue = issues.get()
+        if issue is None:
+          finished += 1
+        elif isinstance(issue, BaseException):
+          raise issue
+        elif isinstance(issue, Error):
+          key = (issue.file, issue.line, issue.column, issue.message)
+          if key not in reported:
+            reported.add(key)
+            yield issue
+        else:
+          yield issue
+    finally:
+      pool.terminate()
 
-    if (len(issues_to_output) != issue_count_from_plugin) and __debug__:
-      if not any(filter(lambda line: 'libprotobuf WARNING' in line, e.output)):
-        output.warn('Number of reported issues from plugin (%s) does not match number of issues parsed (%s).' % (
-                      issue_count_from_plugin, len(issues_to_output)))
-    else:
-      output.info('Reporting %s issues.' % len(issues_to_output))
+  def __result_cache(self):
+
+    """ Open the result cache configured with `--cache`, if any.
+
+        :returns: `cache.ResultCache`, or `None` if caching is disabled. """
 
-    return issues_to_output
+    if self.results is not None:
+      return self.results
+
+    cache_path = getattr(self.arguments, 'cache', None)
+    if not cache_path:
+      return None
+
+    settings = {'proto_paths': self.proto_paths, 'config': self.config.config}
+    if getattr(self.arguments, 'style_only', False):
+      settings['style_only'] = True  # results of the style checker are not those of protoc
+
+    return cache.ResultCache(
+      self.__make_abspath(cache_path),
+      settings=settings,
+      limit=(getattr(self.arguments, 'cache_size', None) or 256) * 1024 * 1024)
+
+  def __descriptor_cache(self):
+
+    """ Open the descriptor cache, kept alongside results under `--cache`.
+
+        :returns: `cache.DescriptorCache`, or `None` if caching is disabled. """
+
+    cache_path = getattr(self.arguments, 'cache', None)
+    if not cache_path:
+      return None
+
+    return cache.DescriptorCache(
+      os.path.join(self.__make_abspath(cache_path), 'descriptors'),
+      settings={'proto_paths': self.proto_paths},
+      limit=(getattr(self.arguments, 'cache_size', None) or 256) * 1024 * 1024)
+
+  def __compile_descriptors(self, protofiles):
+
+    """ Compile protofiles into a descriptor set with `protoc`, including imports
+        and source info, without running `protoc-gen-lint`.
+
+        :param protofiles: Protofiles to compile in one invocation.
+        :returns: Dictionary of file names, as `protoc` knows them, to encoded
+                  `FileDescriptorProto`s, or `None` if `protoc` failed. """
+
+    descriptor, path = tempfile.mkstemp(suffix='.pb')
+    os.close(descriptor)
+    try:
+      command = ['protoc', '--descriptor_set_out=%s' % path, '--include_imports', '--include_source_info']
+      command.extend('--proto_path=%s' % proto_path for proto_path in self.proto_paths)
+      command.extend(protofiles)
+      with open(os.devnull, 'w') as devnull, protoc.command_line(command) as argv:
+        if subprocess.call(argv, stdout=devnull, stderr=devnull) != 0:
+          return None
+      with open(path, 'rb') as fhandle:
+        return descriptors.split(fhandle.read())
+    finally:
+      os.remove(path)
+
+  def __bisect_descriptors(self, protofiles):
+
+    """ Compile protofiles into descriptors, splitting them in halves each
+        time `protoc` fails, so a few broken protos cost a few runs each,
+        rather than one run per protofile.
+
+        :param protofiles: Protofiles to compile.
+        :returns: Dictionary of file names, as `protoc` knows them, to encoded
+                  `FileDescriptorProto`s, for every protofile that compiled. """
+
+    compiled = self.__compile_descriptors(protofiles)
+    if compiled is not None or len(protofiles) == 1:
+      return compiled or {}
+
+    compiled = {}
+    half = len(protofiles) // 2
+    for part in (protofiles[:half], protofiles[half:]):
+      compiled.update(self.__bisect_descriptors(part))
+    return compiled
+
+  def __descriptors(self, protofiles):
+
+    """ Load the compiled descriptor of each protofile. With `--cache`, unchanged
+        protofiles reuse cached descriptors, and only the rest are compiled, in
+        one `protoc` run. If that run fails, they are compiled again in halves,
+        like `__compile` does, and those that still fail on their own are
+        skipped, since linting reports them.
+
+        :param protofiles: List of discovered protofile paths.
+        :returns: List of `descriptors.FileDescriptor`, in protofile order. """
+
+    store = self.__descriptor_cache()
+    graph = self.__import_graph()
+    keys = dict((protofile, store.key(protofile, graph)) for protofile in protofiles) if store else {}
+
+    encoded = {}
+    for protofile in protofiles:
+      data = store.get(keys[protofile]) if store else None
+      if data is not None:
+        encoded[protofile] = data
+
+    misses = [protofile for protofile in protofiles if protofile not in encoded]
+    if misses:
+      compiled = self.__bisect_descriptors(misses)
+
+      wanted = frozenset(misses)
+      for name, data in compiled.items():
+        protofile = graph.resolve(name)
+        if protofile in wanted:
+          encoded[protofile] = data
+          if store:
+            store.put(keys[protofile], data)
+    output.info('Compiled descriptors for %s of %s protos.', len(misses), len(protofiles))
+
+    if store:
+      store.save()
+    return [descriptors.FileDescriptor(encoded[protofile]) for protofile in protofiles if protofile in encoded]
+
+  def __duplicate_definitions(self, files):
+
+    """ Find symbols defined by more than one protofile. `protoc` only notices
+        these when both files are compiled together, which they are not when
+        they land in separate shards, or one of them is replayed from cache.
+
+        :param files: List of `descriptors.FileDescriptor`, in compilation order.
+        :returns: Generator of `Error` objects, worded as `protoc` would. """
+
+    definitions = {}
+    for descriptor in files:
+      for symbol, path in descriptor.symbols:
+        first = definitions.setdefault(symbol, descriptor.name)
+        if first != descriptor.name:
+          line, column = descriptor.position(path)
+          yield self.classify('%s:%s:%s: "%s" is already defined in file "%s".' % (
+            descriptor.name, line or 1, column or 1, symbol, first))
+
+  def __check_descriptors(self, issues, protofiles):
+
+    """ Pass issues through, then run checks against the compiled descriptors of
+        every protofile at once. Errors `protoc` already reported are not
+        repeated.
+
+        :param issues: Iterable of `Issue` and `Error` objects found so far.
+        :param protofiles: List of discovered protofile paths.
+        :returns: Generator of issues. """
+
+    reported = set()
+    for issue in issues:
+      if issue.type is Linter.Errors.alreadyDefined:
+        reported.add(issue.unique_hash)
+      yield issue
+
+    for issue in self.__duplicate_definitions(self.__descriptors(protofiles)):
+      if issue.unique_hash not in reported:
+        yield issue
+
+  def __issue_owners(self, issue, compiled):
+
+    """ Attribute an issue to the compiled protofiles it belongs to, so it can
+        be cached alongside them.
+
+        :param issue: `Issue` or `Error` parsed from `protoc` output.
+        :param compiled: Dictionary of compiled protofiles to their issue records.
+        :returns: List of owning protofiles, an empty list if the issue belongs to a
+                  file whose results were replayed from cache, or `None` if the
+                  issue cannot be attributed to any protofile. """
+
+    graph = self.__import_graph()
+    resolved = graph.resolve(issue.file)
+    if resolved in compiled:
+      return [resolved]
+    if resolved in graph.imports:
+      return []
+
+    # errors about missing imports name the import, so they belong to its importers
+    importers = [protofile for protofile in compiled if issue.file in graph.names[protofile]]
+    return importers or None
+
+  def __lint_cached(self, protofiles, results):
+
+    """ Lint protofiles through the result cache: files whose content and
+        imports are unchanged replay their cached issues, and only the rest
+        are compiled by `protoc`. Results of protofiles in a run which compile
+        errors stopped before the plugin ran are not cached, since they lack
+        the warnings of the plugin.
+
+        :param protofiles: List of discovered protofile paths.
+        :param results: `cache.ResultCache` to read from and write to.
+        :returns: Generator of `Issue` and `Error` objects. """
+
+    graph = self.__import_graph()
+    keys = dict((protofile, results.key(protofile, graph)) for protofile in protofiles)
+    misses = []
+
+    for protofile in protofiles:
+      records = results.get(keys[protofile])
+      if records is None:
+        misses.append(protofile)
+        continue
+      for record in records:
+        yield BaseIssue.restore(self, record)
+
+    output.info('Replayed cached results for %s of %s protos.', len(protofiles) - len(misses), len(protofiles))
+
+    if misses:
+      compiled = dict((protofile, []) for protofile in misses)
+      cacheable = True
+
+      for issue in self.__execute(misses):
+        owners = self.__issue_owners(issue, compiled)
+        if owners is None or issue.type is Linter.Errors.compilerFailed:  # protoc may not fail next time
+          cacheable = False
+        elif not owners:
+          continue  # already replayed from the cached results of its own file
+        else:
+          for owner in owners:
+            compiled[owner].append(issue.record())
+        yield issue
+
+      if cacheable:
+        for protofile, records in compiled.items():
+          if protofile not in self.aborted:  # lint warnings are missing, not absent
+            results.put(keys[protofile], records)
+        if self.aborted:
+          output.say('Not caching results of %s protos protoc stopped compiling before linting them.',
+                     len(self.aborted))
+      else:
+        output.say('Some issues could not be attributed to a protofile, not caching results.')
+
+    results.save()
+
+  def __lint_style(self, protofiles, results=None):
+
+    """ Check naming style, syntax and imports in-process, instead of running
+        `protoc` with `protoc-gen-lint`. Protos that cannot be parsed are
+        skipped, since `protoc` would report errors for them instead. With
+        `--jobs` above one, protos are checked across a pool of processes.
+
+        :param protofiles: List of discovered protofile paths.
+        :param results: `cache.ResultCache` to replay unchanged protos from, if any.
+        :returns: Generator of `Issue` objects. """
+
+    keys = {}
+    if results is not None:
+      graph = self.__import_graph()
+      keys = dict((protofile, results.key(protofile, graph)) for protofile in protofiles)
+      misses = []
+      for protofile in protofiles:
+        records = results.get(keys[protofile])
+        if records is None:
+          misses.append(protofile)
+          continue
+        for record in records:
+          yield BaseIssue.restore(self, record)
+      output.info('Replayed cached results for %s of %s protos.', len(protofiles) - len(misses), len(protofiles))
+      protofiles = misses
+
+    jobs = getattr(self.arguments, 'jobs', None) or 1
+    for protofile, records, error in style.check_all(protofiles, self.proto_paths, jobs):
+      if error:
+        output.warn('Unable to check style of "%s": %s', protofile, error)
+      elif results is not None:
+        results.put(keys[protofile], records)
+      for record in records:
+        yield BaseIssue.restore(self, record)
+
+    if results is not None:
+      results.save()
 
   @property
   def workspace(self):
@@ -658,6 +1225,166 @@ class Linter(object):
 
     return self.config.workspace
 
+  def __workspace_path(self, path):
+
+    """ Express an absolute protofile path relative to the workspace root.
+
+        :param path: Absolute path to a protofile.
+        :returns: Path to the protofile from the workspace root. """
+
+    workspace = os.path.join(self.__make_abspath(self.workspace), '')
+    if path.startswith(workspace):
+      return path[len(workspace):]
+    return path.lstrip("/")  # outside the workspace, keep the full path
+
+  def __index_paths(self, protofiles):
+
+    """ Index discovered protofiles by every name `protoc` may report them
+        under, which is their path relative to a `--proto_path`, or their
+        absolute path. Where a name is ambiguous, the first proto path in
+        lookup order wins, just as it would for `protoc`.
+
+        :param protofiles: List of discovered protofile paths. """
+
+    self.paths = {}
+    for proto_path in self.proto_paths:
+      prefix = os.path.join(proto_path, '')
+      for protofile in protofiles:
+        if protofile.startswith(prefix):
+          self.paths.setdefault(protofile[len(prefix):], self.__workspace_path(protofile))
+    for protofile in protofiles:
+      self.paths.setdefault(protofile, self.__workspace_path(protofile))
+
+  def __lint(self, protofiles, results):
+
+    """ Lint protofiles with the style checker, with `protoc`, or through the
+        result cache, as configured.
+
+        :param protofiles: List of discovered protofile paths.
+        :param results: `cache.ResultCache` to read from and write to, if any.
+        :returns: Generator of `Issue` and `Error` objects. """
+
+    self.aborted = set()
+    if getattr(self.arguments, 'style_only', False):
+      return self.__lint_style(protofiles, results)
+    if results is None:
+      # execute protoc with protoc-gen-lint, then parse the output
+      return self.__execute(protofiles)
+    return self.__lint_cached(protofiles, results)
+
+  def __lint_owned(self, protofiles):
+
+    """ Lint protofiles, attributing each issue to the protofile it belongs to.
+
+        :param protofiles: List of discovered protofile paths.
+        :returns: Dictionary of each protofile to a list of its issues, and of `None`
+                  to a list of issues that cannot be attributed to any of them. """
+
+    owned = dict((protofile, []) for protofile in protofiles)
+    unowned = []
+    for issue in self.__lint(protofiles, self.__result_cache()):
+      owners = self.__issue_owners(issue, owned)
+      if owners is None:
+        unowned.append(issue)
+      for owner in owners or ():
+        owned[owner].append(issue)
+    owned[None] = unowned
+    return owned
+
+  def watch(self, changes, protofiles=None):
+
+    """ Lint the workspace, then lint it again each time protos change. Only
+        changed protos and the protos importing them are linted again, while
+        every other proto keeps its issues, and protos are only discovered
+        again when some were added or removed. Protos of a `protoc` run that
+        compile errors stopped before the plugin ran are linted again on the
+        next cycle too, since their warnings are missing.
+
+        :param changes: Iterable of sets of changed paths, one per cycle, like
+                        `watch.debounced`. Paths are those of added, modified or
+                        removed protofiles, or of directories holding them.
+        :param protofiles: Protofiles to lint, from `discover`, or `None` to discover them.
+        :returns: Generator of lists of every current issue, one list per cycle,
+                  with cascades collapsed and descriptors checked like `__call__`. """
+
+    if protofiles is None:
+      protofiles = self.discover()
+    owned = self.__lint_owned(protofiles)
+    stale = set(self.aborted)
+    yield list(self.__refine(self.__flatten(owned), protofiles))
+
+    for changed in changes:
+      known = self.protofiles
+      directories = [os.path.join(path, '') for path in changed if not path.endswith(walker.PROTO_SUFFIX)]
+      if directories or any(path not in known or not os.path.isfile(path) for path in changed):
+        self.discover()  # protos were added or removed
+        for protofile in known - self.protofiles:
+          del owned[protofile]
+      else:
+        self.__import_graph().update(changed)
+
+      touched = set(path for path in changed if path.endswith(walker.PROTO_SUFFIX))
+      touched.update(protofile for protofile in known | self.protofiles
+                     for directory in directories if protofile.startswith(directory))
+      relint = sorted((self.__import_graph().dependents(touched) | stale) & self.protofiles)
+      output.info('Linting %s protos affected by %s changes.', len(relint), len(changed))
+      if relint:
+        owned.update(self.__lint_owned(relint))
+        stale = set(self.aborted)
+      if relint or known != self.protofiles:
+        yield list(self.__refine(self.__flatten(owned), sorted(self.protofiles)))
+
+  @staticmethod
+  def __flatten(owned):
+
+    """ List the issues of every protofile, in protofile order, and only once
+        for issues belonging to several protofiles. """
+
+    seen = set()
+    return [issue for protofile in sorted(owned) for issue in owned[protofile]
+            if id(issue) not in seen and not seen.add(id(issue))]
+
+  def __refine(self, issues, protofiles):
+
+    """ Collapse cascades of compiler errors, unless `--cascades expand`, then
+        run descriptor checks, with `--descriptor-checks`, the same way for
+        every run and every watch cycle.
+
+        :param issues: Iterable of `Issue` and `Error` objects, in output order.
+        :param protofiles: List of protofile paths linted.
+        :returns: Generator of issues. """
+
+    cascades = getattr(self.arguments, 'cascades', None) or 'collapse'
+    if cascades != 'expand':
+      issues = self.collapse(issues, details=cascades == 'details')
+
+    if getattr(self.arguments, 'descriptor_checks', False):
+      issues = self.__check_descriptors(issues, protofiles)
+    return issues
+
+  def __suppress_known(self, issues, baseline_path):
+
+    """ Drop issues whose fingerprints are in a baseline file, before they
+        are exported or serialized.
+
+        :param issues: Iterable of `Issue` and `Error` objects.
+        :param baseline_path: Path to a baseline file written by `--write-baseline`.
+        :returns: Generator of issues not in the baseline. """
+
+    known = baseline.Baseline(baseline_path)
+    output.say('Loaded %s fingerprints from baseline "%s".', len(known), baseline_path)
+
+    suppressed = 0
+    try:
+      for issue in issues:
+        if issue.unique_hash in known:
+          suppressed += 1
+          continue
+        yield issue
+    finally:
+      known.close()
+      output.info('Suppressed %s issues found in the baseline.', suppressed)
+
   def make_path_for_protofile(self, protofile):
 
     """ Make an absolute link for a protofile.
@@ -665,45 +1392,98 @@ class Linter(object):
         :param protofile: Protobuf file postfix.
         :return: Path to protofile from workspace root. """
 
-    resolved_path = None
-    for path in self.protofiles:
-      if path.endswith(protofile):
-        resolved_path = path
+    resolved_path = self.paths.get(protofile)
+    if resolved_path is not None:
+      return resolved_path
 
-    if not resolved_path:
+    # not a name protoc would use, fall back to the shortest path with a matching suffix
+    matches = sorted((path for path in self.protofiles if path.endswith(protofile)), key=lambda path: (len(path), path))
+    if not matches:
       raise ValueError("unable to resolve absolute path for protobuf file: %s" % protofile)
 
-    resolved_path = resolved_path.replace(self.workspace, "")
-    if resolved_path.startswith("/"):
-      return "/".join(resolved_path.split("/")[1:])
+    resolved_path = self.paths[protofile] = self.__workspace_path(matches[0])
     return resolved_path
 
   ## -- CLI Interface -- ##
-  def __call__(self):
+  def __call__(self, protofiles=None):
 
     """ Run the linter tool on the configured workspace and with the
         specified config arguments, if any.
 
-        :returns: Output code, `0` if successful, `1` if something crashed. """
+        Issues are yielded as they are found, and released once the caller is
+        done with them, unless retained. Either way, `summary` counts them.
+
+        :param protofiles: Protofiles to lint, from `discover`, or `None` to discover them.
+        :returns: Generator of `Issue` and `Error` objects. """
+
+    self.summary = Summary()
+    if self.issues is not None:
+      self.issues = []
+
+    if protofiles is None:
+      protofiles = self.discover()
+    results = self.__result_cache()
+
+    changed_since = getattr(self.arguments, 'changed_since', None)
+    if changed_since:
+      protofiles = self.__changed(protofiles, changed_since)
+
+    issues = self.__refine(self.__lint(protofiles, results), protofiles)
 
-    # execute protoc with protoc-gen-lint, then parse the output
-    for issue in self.__parse(self.__execute()):
-      self.issues.append(issue)
+    baseline_path = getattr(self.arguments, 'baseline', None)
+    if baseline_path and getattr(self.arguments, 'write_baseline', False):
+      # record every issue as known, then report them all as usual
+      issues = list(issues)
+      count = baseline.write(baseline_path, (issue.unique_hash for issue in issues))
+      output.info('Wrote %s fingerprints to baseline "%s".', count, baseline_path)
+    elif baseline_path:
+      issues = self.__suppress_known(issues, baseline_path)
+
+    for issue in issues:
+      self.summary.add(issue)
+      if self.issues is not None:
+        self.issues.append(issue)
       yield issue
 
       if hasattr(self.arguments, 'verbose') and self.arguments.verbose:
-        output.say('Reporting issue: %s' % issue)
+        output.say('Reporting issue: %s', issue)
 
     raise StopIteration()
 
 
+class Summary(object):
+
+  """ Running counts of the issues reported by a run of the linter, kept in
+      place of the issues themselves, which are released once written. """
+
+  __slots__ = ('total', 'types', 'files')
+
+  def __init__(self):
+
+    """ Start counting from zero. """
+
+    self.total = 0
+    self.types = collections.Counter()  # name of the issue type: issues of that type
+    self.files = collections.Counter()  # protofile, as reported: issues in that protofile
+
+  def add(self, issue):
+
+    """ Count one reported issue.
+
+        :param issue: `Issue` or `Error` object. """
+
+    self.total += 1
+    self.types[issue.type.name] += 1
+    self.files[issue.file] += 1
+
+
 class BaseIssue(object):
 
   """ Base issue object, shared by `Issue` and `Error` for common functionality. """
 
   ## -- Internals -- ##
   __slots__ = (
-    'raw', 'type', 'linter', 'message',
+    'type', 'message', 'fingerprint',
     'file', 'line', 'column', 'context')
 
   def __init__(self,
@@ -716,24 +1496,30 @@ class BaseIssue(object):
                protocolumn=None,
                protocontext=None):
 
-    """ Initialize a detected issue from the `protoc-gen-lint` tool.
+    """ Initialize a detected issue from the `protoc-gen-lint` tool. Only what
+        identifies the issue is kept: the raw line is dropped, the file name
+        is interned, and the message is formatted once, here. The linter is
+        not kept: whatever exports the issue resolves its path.
 
-        :param linter: The linter that created this object.
-        :param raw: Raw line as emitted by the tool.
+        :param linter: The linter that created this object, interning its file name.
+        :param raw: Raw line as emitted by the tool, which is not kept.
         :param type: Parsed type of `Warning` from `raw`.
-        :param code: Numeric code corresponding to this issue type.
         :param message: Message emitted by the tool, parsed from `raw`.
         :param protofile: Protobuf file that caused the issue.
         :param protoline: Line in the protobuf file that caused the issue. """
 
-    self.linter = linter
     self.type = type
-    self.raw = raw
-    self.file = protofile
+    self.file = linter.intern(protofile)
     self.line = protoline or 1
     self.column = protocolumn or 1
     self.context = protocontext
-    self.message = Linter.Message[type] % self.render_context(message)
+    self.fingerprint = None  # computed on first use, by `unique_hash`
+
+    template = Linter.Message[type]
+    if template == "%(message)s":
+      self.message = message
+    else:
+      self.message = template % self.render_context(message)
 
   ## -- Methods -- ##
   def render_context(self, message):
@@ -749,25 +1535,52 @@ class BaseIssue(object):
       "column": self.column,
       "context": self.context,
       "type": self.type,
-      "raw": self.raw,
       "message": message
     }
 
   def serialize(self, exported):
 
-    """ Serialize the exported version of this structure for use with CodeClimate.
-        :returns: JSON-serialized exported object. """
+    """ Serialize the exported version of this structure in the format chosen
+        with `--format`, which is what CodeClimate reads by default.
+        :returns: Serialized exported object. """
 
-    return json.dumps(exported) + "\0"
+    return sink.encode(exported)
 
-  def write(self):
+  def write(self, resolve):
 
     """ Write this issue to `stdout` in a JSON-serialized structure
-        that CodeClimate is capable of reading. """
+        that CodeClimate is capable of reading.
+
+        :param resolve: Function resolving a protofile name to its path, like
+                        `Linter.make_path_for_protofile`. """
+
+    Linter.SeverityHandler[Linter.Severity[self.type]]("[%s] %s: %s", self.type.name, self.file, self.message)
+    output.issue(self, resolve)
+
+  def record(self):
+
+    """ Reduce this issue to a JSON-serializable record, which `restore` can
+        turn back into an identical issue, fingerprint included. The raw line
+        is not kept, so it is recorded as `None`.
+
+        :returns: List of the fields of this issue. """
 
-    output.say('Writing issue "%s"...' % repr(self))
-    Linter.SeverityHandler[Linter.Severity[self.type]]("[%s]: %s" % (self.type.name, self.message))
-    output.issue(self)
+    return [type(self).__name__, self.type.name, None, self.message,
+            self.file, self.line, self.column, self.context]
+
+  @staticmethod
+  def restore(linter, record):
+
+    """ Rebuild an issue from a record produced by `record`.
+
+        :param linter: The linter restoring this issue.
+        :param record: Record produced by `record`.
+        :returns: `Issue` or `Error` object. """
+
+    kind, type_name, raw, message, protofile, protoline, protocolumn, protocontext = record
+    if kind == 'Error':
+      return Error(linter, raw, Linter.Errors[type_name], message, protofile, protoline, protocolumn, protocontext)
+    return Issue(linter, raw, Linter.Warnings[type_name], message, protofile, protoline, protocolumn, protocontext)
 
   def format_location(self):
 
@@ -789,16 +1602,46 @@ class BaseIssue(object):
       return " "
     return " context='%s', " % self.context
 
-  def __call__(self):
+  def export(self, resolve):
+
+    """ Export this object to a dictionary that describes it so it may be written
+        to `stdout` to be handled by CodeClimate, from the template of its type.
+
+        :param resolve: Function resolving a protofile name to its path, like
+                        `Linter.make_path_for_protofile`.
+        :returns: Exported `dict` to pass to CodeClimate. """
+
+    if Linter.Templates is None:
+      Linter.Templates = Linter.compile_templates()
+    exported = Linter.Templates[self.type].copy()
+    exported["description"] = self.message
+    exported["fingerprint"] = self.unique_hash
+    exported["location"] = {
+      "path": resolve(self.file),
+      "positions": {
+        "begin": {
+          "line": self.line,
+          "column": self.column
+        },
+        "end": {
+          "line": self.line,
+          "column": self.column
+        }
+      }
+    }
+    return exported
+
+  def __call__(self, resolve):
 
     """ Dispatch `self.serialize` on the exported form of this object, which prepares
         it to be pulled into CodeClimate.
 
+        :param resolve: Function resolving a protofile name to its path.
         :returns: Exported and serialized version of this issue. """
 
     if self.type == Linter.Errors.fileNotFound:
       return
-    return self.serialize(self.export())
+    return self.serialize(self.export(resolve))
 
 
 class Issue(BaseIssue):
@@ -819,46 +1662,18 @@ class Issue(BaseIssue):
   @property
   def unique_hash(self):
 
-    """ Calculate and return a unique hash for this issue.
+    """ Calculate and return a unique hash for this issue, once.
         :returns: Unique hash, as a hex digest, for this specific issue. """
 
-    return hashlib.sha256('::'.join((map(unicode, (
-      "v1",
-      self.type.name,
-      self.message,
-      self.file,
-      self.line,
-      self.column,
-      self.context))))).hexdigest()
-
-  def export(self):
-
-    """ Export this object to a dictionary that describes it so it may be written
-        to `stdout` to be handled by CodeClimate.
-
-        :returns: Exported `dict` to pass to CodeClimate. """
-
-    return {
-      "type": "issue",
-      "check_name": Linter.Names[self.type],
-      "description": Linter.Message[self.type] % self.render_context(self.message),
-      "categories": Linter.Categories[self.type],
-      "severity": Linter.Severity[self.type],
-      "fingerprint": self.unique_hash,
-      "location": {
-        "path": self.linter.make_path_for_protofile(self.file),
-        "positions": {
-          "begin": {
-            "line": self.line,
-            "column": self.column
-          },
-          "end": {
-            "line": self.line,
-            "column": self.column
-          }
-        }
-      }
-    }
+    if self.fingerprint is None:
+      self.fingerprint = hashlib.sha256(u"v1::%s::%s::%s::%s::%s::%s" % (
+        self.type.name,
+        self.message,
+        self.file,
+        self.line,
+        self.column,
+        self.context)).hexdigest()
+    return self.fingerprint
 
 
 class Error(BaseIssue):
@@ -880,40 +1695,66 @@ class Error(BaseIssue):
   @property
   def unique_hash(self):
 
-    """ Calculate and return a unique hash for this error.
+    """ Calculate and return a unique hash for this error, once.
         :returns: Unique hash, as a hex digest, for this specific error. """
 
-    return hashlib.sha256('::'.join((map(unicode, (
-      "v1",
-      self.type.name,
-      self.message,
-      self.file))))).hexdigest()
+    if self.fingerprint is None:
+      self.fingerprint = hashlib.sha256(u"v1::%s::%s::%s" % (
+        self.type.name,
+        self.message,
+        self.file)).hexdigest()
+    return self.fingerprint
 
-  def export(self):
 
-    """ Export this object to a dictionary that describes it so it may be written
-        to `stdout` to be handled by CodeClimate.
+class Cascade(Error):
+
+  """ Represents an import that was not found or had errors, as the root
+      cause of every error it caused in the protos importing it. It is
+      reported where the first of them was, and fingerprinted as that error
+      would be, while its description counts the rest of them. """
+
+  __slots__ = ('errors', 'files', 'details')
+
+  def __init__(self, root, details=False):
+
+    """ Start a cascade from the first error a failing import caused.
 
+        :param root: `Error` reporting the import as unresolved.
+        :param details: Keep the location of each error added to the cascade. """
+
+    for name in BaseIssue.__slots__:
+      setattr(self, name, getattr(root, name))
+    self.errors = 0
+    self.files = set((root.file,))
+    self.details = [] if details else None
+
+  def add(self, error):
+
+    """ Attribute another error to this cascade.
+
+        :param error: `Error` caused by the same import. """
+
+    self.errors += 1
+    self.files.add(error.file)
+    if self.details is not None:
+      self.details.append((error.file, error.line, error.column))
+
+  def export(self, resolve):
+
+    """ Export this cascade like the error it started from, describing how far
+        it reaches, and with `details`, where every other error it caused was.
+
+        :param resolve: Function resolving a protofile name to its path.
         :returns: Exported `dict` to pass to CodeClimate. """
 
-    return {
-      "type": "issue",
-      "check_name": Linter.Names[self.type],
-      "description": Linter.Message[self.type] % self.render_context(self.message),
-      "categories": Linter.Categories[self.type],
-      "severity": Linter.Severity[self.type],
-      "fingerprint": self.unique_hash,
-      "location": {
-        "path": self.linter.make_path_for_protofile(self.file),
+    exported = super(Cascade, self).export(resolve)
+    exported["description"] += " It caused %s more errors, in %s protos." % (self.errors, len(self.files))
+    if self.details is not None:
+      exported["other_locations"] = [{
+        "path": resolve(protofile),
         "positions": {
-          "begin": {
-            "line": self.line,
-            "column": self.column
-          },
-          "end": {
-            "line": self.line,
-            "column": self.column
-          }
+          "begin": {"line": line, "column": column},
+          "end": {"line": line, "column": column}
         }
-      }
-    }
+      } for protofile, line, column in self.details]
+    return exported
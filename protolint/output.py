@@ -11,65 +11,282 @@
 
 import sys
 import json
+import Queue
+import atexit
 import logging
+import threading
 import colorlog
 
+from . import sink
 
-colorlog.basicConfig(
-  stream=sys.stderr,
-  level=logging.DEBUG,
-  format="[%(log_color)s%(levelname)s%(reset)s] %(name)s: %(message)s")
+
+LEVELS = {
+  'debug': logging.DEBUG,
+  'info': logging.INFO,
+  'warning': logging.WARNING,
+  'error': logging.ERROR,
+  'critical': logging.CRITICAL}
+
+DEFAULT_LEVEL = 'debug'
+FORMAT = "[%(log_color)s%(levelname)s%(reset)s] %(name)s: %(message)s"
 
 
 logger = colorlog.getLogger('protolint')
+logger.addHandler(logging.NullHandler())  # silent until `configure`, when used as a library
+stream = None  # buffered sink for issues on `stdout`, opened by the first issue
+destination = None  # file issues are written to instead of `stdout`, opened by `open_issues`
+handler = None  # handler installed by `configure`
 
 
-def say(*arguments):
+class Lazy(object):
 
-  """ Say something verbosely to the log. """
+  """ Defers building part of a log message until it is formatted, which only
+      happens if the message is logged at all. """
+
+  __slots__ = ('func', 'arguments', 'keywords')
+
+  def __init__(self, func, *arguments, **keywords):
+
+    """ Defer a call.
+
+        :param func: Function producing the text, like `pprint.pformat`.
+        :param arguments: Positional arguments for `func`.
+        :param keywords: Keyword arguments for `func`. """
+
+    self.func = func
+    self.arguments = arguments
+    self.keywords = keywords
+
+  def __str__(self):
+
+    """ Make the call, for `%s` formatting. """
+
+    return unicode(self.func(*self.arguments, **self.keywords)).encode('utf-8')
+
+  def __unicode__(self):
+
+    """ Make the call, for `%s` formatting into unicode. """
+
+    return unicode(self.func(*self.arguments, **self.keywords))
+
+
+class QueueHandler(logging.Handler):
+
+  """ Hands log records to a background thread, which formats and writes
+      them through another handler, so logging never blocks on `stderr`.
+      Arguments of queued messages are formatted later, on that thread, so
+      they must not be changed after they are logged. """
+
+  def __init__(self, target):
+
+    """ Start the background thread.
+
+        :param target: Handler to write records through. """
+
+    logging.Handler.__init__(self)
+    self.target = target
+    self.queue = Queue.Queue()
+    self.thread = threading.Thread(target=self.__drain, name='protolint-log')
+    self.thread.daemon = True
+    self.thread.start()
+
+  def __drain(self):
+
+    """ Write queued records until `close`. """
+
+    while True:
+      record = self.queue.get()
+      if record is None:
+        return
+      self.target.handle(record)
+
+  def emit(self, record):
+
+    """ Queue a record for the background thread. """
+
+    self.queue.put(record)
+
+  def close(self):
+
+    """ Write every record still queued, then stop the background thread. """
+
+    if self.thread.is_alive():
+      self.queue.put(None)
+      self.thread.join()
+    self.target.close()
+    logging.Handler.close(self)
+
+
+def level_of(name):
+
+  """ Resolve the name of a log level.
+
+      :param name: One of `LEVELS`, in any case.
+      :returns: Numeric `logging` level.
+      :raises ValueError: If there is no such level. """
+
+  try:
+    return LEVELS[name.lower()]
+  except (KeyError, AttributeError):
+    raise ValueError('unknown log level "%s", expected one of: %s' % (name, ', '.join(sorted(LEVELS))))
+
+
+def configure(level=DEFAULT_LEVEL, queued=False):
+
+  """ Start logging to `stderr`, replacing any handler installed before.
+
+      :param level: Name of the lowest level to log, one of `LEVELS`.
+      :param queued: Write logs from a background thread, through `QueueHandler`. """
+
+  global handler
+
+  if handler is not None:
+    logger.removeHandler(handler)
+    handler.close()
+
+  target = colorlog.StreamHandler(sys.stderr)
+  target.setFormatter(colorlog.ColoredFormatter(FORMAT))
+  handler = QueueHandler(target) if queued else target
+  logger.addHandler(handler)
+  logger.setLevel(level_of(level))
+
+
+def set_level(level):
+
+  """ Change the lowest level to log, keeping the handler.
+
+      :param level: Name of the level, one of `LEVELS`. """
+
+  logger.setLevel(level_of(level))
+
+
+def enabled(level):
+
+  """ Tell whether messages at a level are logged, to skip work done only for them.
+
+      :param level: Name of the level, one of `LEVELS`.
+      :returns: `True` if they are logged. """
+
+  return __debug__ and logger.isEnabledFor(LEVELS[level])
+
+
+def say(message, *arguments):
+
+  """ Say something verbosely to the log. Arguments are only formatted into
+      the message, with `%`, if it is logged at the active level. """
 
   if __debug__:  # pragma: no cover
-    logger.debug(" ".join(map(unicode, arguments)))
+    logger.debug(message, *arguments)
 
 
-def info(*arguments):
+def info(message, *arguments):
 
   """ Say something verbosely to the log. """
 
   if __debug__:  # pragma: no cover
-    logger.info(" ".join(map(unicode, arguments)))
+    logger.info(message, *arguments)
 
 
-def warn(*arguments):
+def warn(message, *arguments):
 
   """ Issue a warning to the log. """
 
   if __debug__:  # pragma: no cover
-    logger.warning(" ".join(map(unicode, arguments)))
+    logger.warning(message, *arguments)
 
 
-def error(*arguments):
+def error(message, *arguments):
 
   """ Output an error to the log. """
 
   if __debug__:  # pragma: no cover
-    logger.error(" ".join(map(unicode, arguments)))
+    logger.error(message, *arguments)
 
 
-def critical(*arguments):
+def critical(message, *arguments):
 
   """ Output a critical message to the log. """
 
   if __debug__:  # pragma: no cover
-    logger.critical(" ".join(map(unicode, arguments)))
+    logger.critical(message, *arguments)
 
 
-def issue(detected):  # pragma: no cover
+def issue(detected, resolve):  # pragma: no cover
 
-  """ Output a CodeClimate-formatted JSON issue to `stdout`.
+  """ Output an issue, in the chosen format, CodeClimate's by default.
 
-    :param detected: Detected `linter.Issue` object to format. """
+    :param detected: Detected `linter.Issue` object to format.
+    :param resolve: Function resolving a protofile name to its path. """
 
-  value = detected()
+  value = detected(resolve)
   if value:
-    print >> sys.stdout, value
+    write(value)
+
+
+def open_issues(format='codeclimate', path=None):
+
+  """ Choose how issues are encoded, and where they are written: to `stdout`,
+      or straight to a file, which is gzip-compressed if its name ends with
+      `.gz`. Issues written so far are flushed first.
+
+    :param format: Name of the format, from `sink.FORMATS`.
+    :param path: Path of the file to write issues to, or `None` for `stdout`.
+    :raises ValueError: If the format cannot be used.
+    :raises IOError: If the file cannot be opened. """
+
+  global stream, destination
+
+  sink.select(format)
+  close_issues()
+  if path:
+    destination = open(path, 'wb')
+    stream = sink.IssueSink(destination, compress=path.endswith('.gz'))
+
+
+def close_issues():
+
+  """ Flush issues written so far, ending and closing the file they went to, if any. """
+
+  global stream, destination
+
+  if stream is not None:
+    stream.close()
+  if destination is not None:
+    destination.close()
+  stream = destination = None
+
+
+def write(value):  # pragma: no cover
+
+  """ Write a serialized document to `stdout`, or to the file chosen with
+    `open_issues`, through the buffered sink.
+
+    :param value: Serialized document, terminated as its format expects. """
+
+  global stream
+
+  if stream is None or (destination is None and stream.stream is not sys.stdout):
+    if stream is not None:
+      stream.close()
+    stream = sink.IssueSink(sys.stdout)
+  stream.write(value)
+
+
+def flush():  # pragma: no cover
+
+  """ Flush any issues still buffered for `stdout`. """
+
+  if stream is not None:
+    stream.flush()
+
+
+def shutdown():  # pragma: no cover
+
+  """ Flush any issues still buffered, and any logs still queued. """
+
+  close_issues()
+  if handler is not None:
+    handler.close()
+
+
+atexit.register(shutdown)
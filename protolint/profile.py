@@ -0,0 +1,253 @@
+# -*- coding: utf-8 -*-
+
+"""
+
+  protolint: profile
+  ~~~~~~~~~~~~~~~~~~
+
+"""
+
+import sys
+import json
+import time
+import atexit
+import ctypes
+import ctypes.util
+import threading
+import functools
+import collections
+
+
+try:
+  from time import monotonic as clock
+except ImportError:  # pragma: no cover
+  class Timespec(ctypes.Structure):
+    _fields_ = [('seconds', ctypes.c_long), ('nanoseconds', ctypes.c_long)]
+
+  CLOCK_MONOTONIC = 1  # from `<time.h>`
+
+  try:
+    _clock_gettime = ctypes.CDLL(ctypes.util.find_library('c'), use_errno=True).clock_gettime
+  except (OSError, AttributeError):
+    clock = time.time  # not monotonic, but the best there is
+  else:
+    _timespec = threading.local()
+
+    def clock():
+
+      """ Read the monotonic clock, in seconds. """
+
+      spec = getattr(_timespec, 'spec', None)
+      if spec is None:
+        spec = _timespec.spec = Timespec()
+      _clock_gettime(CLOCK_MONOTONIC, ctypes.byref(spec))
+      return spec.seconds + spec.nanoseconds * 1e-9
+
+
+# stage timings and counters, only gathered while instrumentation is installed
+stages = collections.defaultdict(lambda: [0, 0.0, 0.0])  # name: [calls, seconds, seconds not spent in other stages]
+counters = collections.Counter()
+started = None
+installed = []  # `(owner, attribute, original)` for each instrumented function
+frames = threading.local()  # stack of nested timings, per thread
+
+
+def enter():
+
+  """ Start timing a stage, nested in whichever stage is being timed already. """
+
+  stack = getattr(frames, 'stack', None)
+  if stack is None:
+    stack = frames.stack = []
+  stack.append(0.0)  # time spent in nested stages
+  return clock()
+
+
+def leave(name, start, calls=1):
+
+  """ Stop timing a stage, and charge its time to it and not to the stage it is nested in. """
+
+  elapsed = clock() - start
+  stack = frames.stack
+  nested = stack.pop()
+  if stack:
+    stack[-1] += elapsed
+  stage = stages[name]
+  stage[0] += calls
+  stage[1] += elapsed
+  stage[2] += elapsed - nested
+
+
+def timed(name, func, counted=None):
+
+  """ Wrap a function to time each call as a stage.
+
+      :param name: Name of the stage.
+      :param func: Function to wrap.
+      :param counted: Function to call with each result, to count what it is.
+      :returns: Wrapped function. """
+
+  @functools.wraps(func)
+  def wrapper(*args, **kwargs):
+    start = enter()
+    try:
+      result = func(*args, **kwargs)
+    finally:
+      leave(name, start)
+    if counted is not None:
+      counted(result)
+    return result
+  return wrapper
+
+
+def timed_generator(name, func, counted=None):
+
+  """ Wrap a generator function to time each step of its generators as a
+      stage, which leaves out the time its consumer spends on each value.
+
+      :param name: Name of the stage.
+      :param func: Generator function to wrap.
+      :param counted: Function to call with each value, to count what it is.
+      :returns: Wrapped generator function. """
+
+  @functools.wraps(func)
+  def wrapper(*args, **kwargs):
+    iterator = iter(func(*args, **kwargs))
+    calls = 1
+    while True:
+      start = enter()
+      try:
+        value = next(iterator)
+      except StopIteration:
+        leave(name, start, calls)
+        return
+      except BaseException:
+        leave(name, start, calls)
+        raise
+      leave(name, start, calls)
+      calls = 0
+      if counted is not None:
+        counted(value)
+      yield value
+  return wrapper
+
+
+def instrument(owner, attribute, wrap, *args):
+
+  """ Replace a function, method or property of a module or class with an
+      instrumented version, until `disable`.
+
+      :param owner: Module or class holding the function.
+      :param attribute: Name of the function, as stored on `owner`.
+      :param wrap: `timed` or `timed_generator`.
+      :param args: Name of the stage, and optionally a function counting results. """
+
+  original = vars(owner)[attribute] if isinstance(owner, type) else getattr(owner, attribute)
+  if isinstance(original, property):
+    replacement = property(wrap(args[0], original.fget, *args[1:]), doc=original.__doc__)
+  elif isinstance(original, staticmethod):
+    replacement = staticmethod(wrap(args[0], original.__func__, *args[1:]))
+  else:
+    replacement = wrap(args[0], original, *args[1:])
+  installed.append((owner, attribute, original))
+  setattr(owner, attribute, replacement)
+
+
+def count_output(line):
+
+  """ Count a line of `protoc` output. """
+
+  counters['protoc.lines'] += 1
+  counters['protoc.bytes'] += len(line) + 1  # with the line break stripped from it
+
+
+def count_parsed(issue):
+
+  """ Count a line of output by the pattern it matched. """
+
+  counters['parse.%s' % issue.type.name] += 1
+
+
+def count_issue(issue):
+
+  """ Count a reported issue by type. """
+
+  counters['issues.%s' % issue.type.name] += 1
+
+
+def enable(report=True):
+
+  """ Instrument the hot paths of the linter, from discovering protos to
+      writing issues. Nothing is instrumented unless this is called, so
+      profiling costs nothing when disabled.
+
+      :param report: Write the report to `stderr` when the process exits. """
+
+  from . import style
+  from . import linter
+  from . import output
+
+  global started
+  if installed:
+    return
+  started = clock()
+
+  Linter, BaseIssue = linter.Linter, linter.BaseIssue
+  instrument(Linter, '__call__', timed_generator, 'lint', count_issue)
+  instrument(Linter, 'discover', timed, 'scan')
+  instrument(Linter, '_Linter__run', timed_generator, 'protoc', count_output)
+  instrument(Linter, 'classify', timed, 'parse', count_parsed)
+  instrument(Linter, '_Linter__lint_style', timed_generator, 'style')
+  instrument(Linter, 'make_path_for_protofile', timed, 'paths')
+  instrument(linter.Issue, 'unique_hash', timed, 'fingerprint')
+  instrument(linter.Error, 'unique_hash', timed, 'fingerprint')
+  instrument(BaseIssue, 'export', timed, 'export')
+  instrument(BaseIssue, 'serialize', timed, 'serialize')
+  instrument(BaseIssue, 'restore', timed, 'restore')
+  instrument(style, 'parse', timed, 'style.parse')
+  instrument(output, 'write', timed, 'output')
+  instrument(output, 'flush', timed, 'output')
+
+  if report:
+    atexit.register(write)
+
+
+def disable():
+
+  """ Remove all instrumentation, and forget what it gathered. """
+
+  global started
+  while installed:
+    owner, attribute, original = installed.pop()
+    setattr(owner, attribute, original)
+  stages.clear()
+  counters.clear()
+  started = None
+
+
+def report():
+
+  """ Summarize what instrumentation gathered so far.
+
+      :returns: JSON-serializable dictionary, with the calls, the total time
+                and the time not spent in other stages for each stage, and
+                counters of output read from `protoc`, lines parsed and issues
+                reported, each by type. """
+
+  return {
+    "type": "profile",
+    "elapsed": round(clock() - started, 6) if started is not None else 0.0,
+    "stages": dict((name, {"calls": calls, "seconds": round(seconds, 6), "self_seconds": round(own, 6)})
+                   for name, (calls, seconds, own) in stages.items()),
+    "counters": dict(counters)}
+
+
+def write(stream=None):
+
+  """ Write the report as one line of JSON, to `stderr` by default, leaving
+      `stdout` to the issues. """
+
+  from . import output
+
+  output.flush()  # so the time spent writing the last issues is included
+  (stream or sys.stderr).write(json.dumps(report(), sort_keys=True) + "\n")
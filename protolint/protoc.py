@@ -0,0 +1,199 @@
+# -*- coding: utf-8 -*-
+
+"""
+
+  protolint: protoc
+  ~~~~~~~~~~~~~~~~~
+
+"""
+
+import os
+import re
+import sys
+import errno
+import signal
+import tempfile
+import threading
+import subprocess
+import contextlib
+
+
+# bytes of arguments to pass on the command line, beyond which they are passed
+# through an argument file, well below `ARG_MAX` and the limit on each argument
+ARGUMENT_LIMIT = 64 * 1024
+
+DEFAULT_TIMEOUT = 600.0  # seconds a `protoc` run may take, before it is killed
+MINIMUM_TIMEOUT = 10.0  # seconds a run over part of the protos may take, however small the part
+
+# output naming the proto it is about, as `protoc` reports errors
+PROTO_OUTPUT = re.compile(r'^[^:\s][^:]*\.proto(?::|$)')
+
+
+class Failure(Exception):
+
+  """ Raised when a `protoc` run fails without saying which proto it failed
+      on: it timed out, it crashed or was killed without output, or it
+      produced output that could not be parsed. """
+
+  def __init__(self, reason, detail=None):
+
+    """ Describe a failed run.
+
+        :param reason: What went wrong, the same for every run failing the same way.
+        :param detail: Particulars of this run, to log, if any. """
+
+    super(Failure, self).__init__(reason)
+    self.reason = reason
+    self.detail = detail
+
+  def __str__(self):
+
+    """ Describe the failure, with its particulars. """
+
+    return '%s (%s)' % (self.reason, self.detail) if self.detail else self.reason
+
+
+class Watchdog(object):
+
+  """ Kills a process once it runs past its deadline. """
+
+  __slots__ = ('process', 'timer', 'expired')
+
+  def __init__(self, process, timeout):
+
+    """ Start watching a process.
+
+        :param process: `subprocess.Popen` object to watch.
+        :param timeout: Seconds the process may run, or `None` to let it run. """
+
+    self.process = process
+    self.expired = False
+    self.timer = None
+    if timeout:
+      self.timer = threading.Timer(timeout, self.expire)
+      self.timer.daemon = True
+      self.timer.start()
+
+  def expire(self):
+
+    """ Kill the process, since its deadline passed. """
+
+    self.expired = True
+    kill(self.process)
+
+  def cancel(self):
+
+    """ Stop watching the process, which is done, and wait for the timer
+        thread to end, so none is left behind when the interpreter exits. """
+
+    if self.timer is not None:
+      self.timer.cancel()
+      self.timer.join()
+
+
+def kill(process):
+
+  """ Kill a process started by `start`, and every process it started in
+      turn, like `protoc-gen-lint`, which would otherwise keep its output open
+      after it is gone. Processes that exited already are left alone.
+
+      :param process: `subprocess.Popen` object, leading its own process group. """
+
+  try:
+    os.killpg(process.pid, signal.SIGKILL)
+  except OSError as e:
+    if e.errno != errno.ESRCH:
+      raise
+
+
+def limited(command, memory):
+
+  """ Cap the memory of a command, so `protoc` aborts when an allocation fails
+      past the cap, instead of driving the machine into swap. The cap is set
+      by `sh` with `ulimit -v` right before it executes the command, so no
+      Python code runs in the child. It bounds the address space of `protoc`
+      and of each plugin it starts, each on its own.
+
+      :param command: Argument vector to run.
+      :param memory: Address space each process may use, in bytes, or `None`.
+      :returns: Argument vector running `command` under the cap. """
+
+  if not memory:
+    return command
+  return ['/bin/sh', '-c', 'ulimit -v %d && exec "$0" "$@"' % max(1, memory // 1024)] + command
+
+
+def start(argv, memory=None):
+
+  """ Start a command with its output and errors piped, as the leader of a
+      new process group, so `kill` reaches every process it starts. The group
+      is set up by `os.setpgrp`, which is a builtin, so the child runs no
+      Python code between `fork` and `exec`, and may safely be started from
+      any thread.
+
+      :param argv: Argument vector to run.
+      :param memory: Address space each process may use, in bytes, or `None`.
+      :returns: `subprocess.Popen` object.
+      :raises OSError: If the command could not be started. """
+
+  return subprocess.Popen(limited(argv, memory), stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+                          preexec_fn=os.setpgrp)
+
+
+def timeout_for(timeout, count, total):
+
+  """ Scale a timeout down to the share of protos a run compiles, so that
+      isolating a proto which hangs `protoc` does not wait out the whole
+      timeout at every step.
+
+      :param timeout: Seconds a run over every proto may take, or `None`.
+      :param count: Protos compiled by this run.
+      :param total: Protos compiled by the run with the whole timeout.
+      :returns: Seconds this run may take, or `None`. """
+
+  if not timeout:
+    return None
+  return max(min(timeout, MINIMUM_TIMEOUT), timeout * count / float(total))
+
+
+def names_proto(line):
+
+  """ Tell whether a line of output is about a particular proto, which running
+      `protoc` over fewer protos could isolate. """
+
+  return PROTO_OUTPUT.match(line) is not None
+
+
+def encode(argument):
+
+  """ Encode an argument for the command line, as paths are encoded on disk. """
+
+  if isinstance(argument, unicode):
+    return argument.encode(sys.getfilesystemencoding() or 'utf-8')
+  return argument
+
+
+@contextlib.contextmanager
+def command_line(command, limit=ARGUMENT_LIMIT):
+
+  """ Prepare a `protoc` command to be run without a shell. Commands too long
+      for the command line pass their arguments through an argument file,
+      which `protoc` reads as `@<filename>`, one argument per line, and which
+      is removed once the command is done with.
+
+      :param command: Command to run, `protoc` followed by its arguments.
+      :param limit: Bytes of arguments to pass on the command line at most.
+      :returns: Context manager giving the argument vector to run. """
+
+  command = [encode(argument) for argument in command]
+  if sum(len(argument) + 1 for argument in command) <= limit or any('\n' in argument for argument in command):
+    yield command  # arguments holding line breaks cannot go through a file
+    return
+
+  descriptor, path = tempfile.mkstemp(prefix='protolint-', suffix='.args')
+  try:
+    with os.fdopen(descriptor, 'wb') as fhandle:
+      fhandle.write(''.join(argument + '\n' for argument in command[1:]))
+    yield [command[0], '@' + path]
+  finally:
+    os.remove(path)
@@ -0,0 +1,291 @@
+# -*- coding: utf-8 -*-
+
+"""
+
+  protolint: server
+  ~~~~~~~~~~~~~~~~~
+
+"""
+
+import os
+import json
+import time
+import socket
+import threading
+import SocketServer
+
+from . import cli
+from . import sink
+from . import cache
+from . import config
+from . import linter
+from . import output
+
+
+def stat(path):
+
+  """ Identify the current version of a file by its modification time and size.
+
+      :param path: Path to the file.
+      :returns: Tuple of modification time and size, or `None` if it is missing. """
+
+  try:
+    result = os.stat(path)
+  except OSError:
+    return None
+  return result.st_mtime, result.st_size
+
+
+class Workspace(object):
+
+  """ Warm state for linting one workspace with one set of arguments: its
+      config, a linter holding the scanned file index and import graph, the
+      results of each protofile, and the last response, which is replayed
+      for as long as no protofile changes. """
+
+  __slots__ = ('arguments', 'config', 'config_stat', 'linter', 'snapshot', 'response', 'lock')
+
+  def __init__(self, arguments):
+
+    """ Prepare warm state for a workspace, loaded on the first lint.
+
+        :param arguments: Parsed `cli.parser` arguments, with absolute paths. """
+
+    self.arguments = arguments
+    self.config = None
+    self.config_stat = None
+    self.linter = None
+    self.snapshot = None
+    self.response = None
+    self.lock = threading.Lock()
+
+  def __load(self):
+
+    """ Load the config, starting over with fresh state whenever it changes. """
+
+    config_stat = stat(self.arguments.config)
+    if self.linter is not None and config_stat == self.config_stat:
+      return
+
+    self.config = config.LinterConfig(self.arguments.config, self.arguments.workspace)
+    self.config_stat = config_stat
+    self.linter = linter.Linter(self.config, self.arguments)
+    self.linter.results = cache.MemoryCache(settings={})
+    self.snapshot = self.response = None
+
+  def lint(self, files=None):
+
+    """ Lint the workspace, or some protofiles in it, walking it again to pick
+        up added and removed protofiles. Unchanged protofiles replay their
+        results, and if nothing changed at all, the last response is replayed.
+
+        :param files: Absolute paths of the protofiles to lint, or `None` for all of them.
+        :returns: Tuple of the serialized issue documents, and whether they were replayed. """
+
+    with self.lock:
+      self.__load()
+      protofiles = self.linter.discover()
+      snapshot = (files, [(protofile, stat(protofile)) for protofile in protofiles])
+      if snapshot == self.snapshot:
+        return self.response, True
+
+      if files is not None:
+        wanted = frozenset(files)
+        protofiles = [protofile for protofile in protofiles if protofile in wanted]
+
+      # plain JSON, which each client encodes in the `--format` it asked for
+      documents = []
+      for issue in self.linter(protofiles):
+        if issue.type != linter.Linter.Errors.fileNotFound:
+          documents.append(sink.dumps(issue.export(self.linter.make_path_for_protofile)))
+
+      self.snapshot, self.response = snapshot, documents
+      return documents, False
+
+
+class Handler(SocketServer.StreamRequestHandler):
+
+  """ Answers requests on one connection. Each request is one line of JSON,
+      answered with a line of JSON holding its status and the number of
+      issues that follow, then one line per issue, each a CodeClimate issue
+      document in plain JSON. """
+
+  def handle(self):
+
+    """ Answer requests until the client disconnects. """
+
+    for line in iter(self.rfile.readline, ''):
+      start = time.time()
+      try:
+        request = json.loads(line)
+      except ValueError as e:
+        status, documents, extra = 1, [], {'error': 'Invalid request: %s' % e}
+      else:
+        status, documents, extra = self.server.answer(request)
+
+      extra.update(status=status, issues=len(documents), elapsed=round(time.time() - start, 6))
+      self.wfile.write(json.dumps(extra) + '\n')
+      for document in documents:
+        self.wfile.write(document + '\n')
+      self.wfile.flush()
+
+
+class Server(SocketServer.ThreadingMixIn, SocketServer.UnixStreamServer):
+
+  """ Long-lived process answering lint requests over a unix socket, keeping
+      the state of each workspace it linted warm in between. """
+
+  daemon_threads = True
+
+  def __init__(self, path):
+
+    """ Listen on a unix socket.
+
+        :param path: Path to create the socket at. """
+
+    SocketServer.UnixStreamServer.__init__(self, path, Handler)
+    self.workspaces = {}
+    self.lock = threading.Lock()
+
+  def workspace(self, request):
+
+    """ Find the warm state for the workspace and arguments of a lint request.
+
+        :param request: Lint request, with the `arguments` and `cwd` of the client.
+        :returns: `Workspace` object. """
+
+    arguments = cli.parser.parse_args(request.get('arguments', []))
+
+    # paths are relative to the client, not to the server
+    cwd = request.get('cwd', os.getcwd())
+    for name in ('config', 'workspace', 'baseline'):
+      if getattr(arguments, name, None):
+        setattr(arguments, name, os.path.abspath(os.path.join(cwd, getattr(arguments, name))))
+
+    # how issues are written is up to the client, and shares the workspace
+    key = tuple(sorted((name, value) for name, value in vars(arguments).items() if name not in ('format', 'output')))
+    with self.lock:
+      if key not in self.workspaces:
+        output.info('Warming up workspace "%s"...', arguments.workspace)
+        self.workspaces[key] = Workspace(arguments)
+      return self.workspaces[key]
+
+  def answer(self, request):
+
+    """ Answer a single request.
+
+        :param request: Decoded request, with a `command` of `lint`, `ping` or `shutdown`.
+        :returns: Tuple of the exit status, the issue documents, and a dictionary of other fields. """
+
+    command = request.get('command', 'lint')
+    if command == 'ping':
+      return 0, [], {'pid': os.getpid(), 'workspaces': len(self.workspaces)}
+    if command == 'shutdown':
+      threading.Thread(target=self.shutdown).start()
+      return 0, [], {}
+    if command != 'lint':
+      return 1, [], {'error': 'Unknown command: "%s".' % command}
+
+    try:
+      workspace = self.workspace(request)
+      files = request.get('files')
+      if files is not None:
+        files = sorted(os.path.abspath(os.path.join(request.get('cwd', os.getcwd()), path)) for path in files)
+      documents, replayed = workspace.lint(files)
+    except SystemExit as e:
+      # the linter exits early when there is nothing to lint, or something crashed
+      return e.code or 0, [], {}
+    except Exception as e:
+      output.error('Failed to answer request: %r', e)
+      return 1, [], {'error': 'Failed to lint: %s' % e}
+    return 0, documents, {'replayed': replayed}
+
+
+def serve(path):
+
+  """ Serve lint requests on a unix socket until asked to shut down.
+
+      :param path: Path to create the socket at.
+      :returns: Exit status. """
+
+  if os.path.exists(path):
+    probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+      probe.connect(path)
+    except socket.error:
+      os.remove(path)  # left behind by a server that did not shut down cleanly
+    else:
+      output.error('Already serving on "%s".', path)
+      return 1
+    finally:
+      probe.close()
+
+  server = Server(path)
+  output.info('Serving lint requests on "%s".', path)
+  try:
+    server.serve_forever()
+  except KeyboardInterrupt:  # pragma: no cover
+    pass
+  finally:
+    server.server_close()
+    os.remove(path)
+  output.info('All done.')
+  return 0
+
+
+def request(path, message):
+
+  """ Send a request to a server, and read its response.
+
+      :param path: Path to the socket of the server.
+      :param message: JSON-serializable request.
+      :returns: Tuple of the decoded status line, and a list of serialized issue documents.
+      :raises socket.error: If the server cannot be reached. """
+
+  connection = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+  try:
+    connection.connect(path)
+    connection.sendall(json.dumps(message) + '\n')
+    reader = connection.makefile('rb')
+    status = json.loads(reader.readline() or '{"status": 1, "issues": 0, "error": "No response."}')
+    documents = [reader.readline().rstrip('\n') for _ in xrange(status['issues'])]
+    return status, documents
+  finally:
+    connection.close()
+
+
+def client(argv):
+
+  """ Run a lint through a server, writing issues to `stdout` just as a full
+      run of `protolint` would, or to the `--output` it forwards, encoded in
+      the `--format` it forwards.
+
+      :param argv: Arguments for `cli.client_parser`, followed by those of `cli.parser`.
+      :returns: Exit status. """
+
+  arguments, forwarded = cli.client_parser.parse_known_args(argv)
+  if arguments.shutdown:
+    message = {'command': 'shutdown'}
+  else:
+    message = {'command': 'lint', 'cwd': os.getcwd(), 'arguments': forwarded, 'files': arguments.files}
+    try:
+      linted = cli.parser.parse_args(forwarded)
+      output.open_issues(linted.format, linted.output)
+    except (ValueError, IOError) as e:
+      output.error('Unable to write issues: %s', e)
+      return 1
+
+  try:
+    status, documents = request(arguments.socket, message)
+  except socket.error as e:
+    output.error('Unable to reach server on "%s": %s', arguments.socket, e)
+    return 1
+
+  if 'error' in status:
+    output.error(status['error'])
+  output.say('Received %s issues in %.3fs.', status['issues'], status['elapsed'])
+
+  for document in documents:
+    output.write(sink.encode(json.loads(document)))
+  output.close_issues()
+  return status['status']
@@ -0,0 +1,233 @@
+# -*- coding: utf-8 -*-
+
+"""
+
+  protolint: sink
+  ~~~~~~~~~~~~~~~
+
+"""
+
+import os
+import sys
+import time
+import zlib
+import errno
+import threading
+import collections
+
+try:
+  import ujson
+except ImportError:  # pragma: no cover
+  ujson = None
+
+try:
+  import msgpack
+except ImportError:  # pragma: no cover
+  msgpack = None
+
+import json
+
+
+DEFAULT_SIZE = 256 * 1024  # bytes of issue documents to buffer before flushing
+DEFAULT_INTERVAL = 1.0  # seconds to hold buffered documents before flushing
+GZIP_LEVEL = 6  # compression level of gzip-compressed streams, as `gzip` defaults to
+
+
+def dumps(exported):
+
+  """ Encode an exported issue as JSON, with `ujson` when it is installed.
+
+      :param exported: JSON-serializable structure.
+      :returns: JSON-encoded string. """
+
+  if ujson is not None:
+    return ujson.dumps(exported, escape_forward_slashes=False)
+  return json.dumps(exported)
+
+
+def codeclimate(exported):
+
+  """ Encode an exported issue as CodeClimate reads it: JSON, terminated by a `NUL`. """
+
+  return dumps(exported) + "\0"
+
+
+def ndjson(exported):
+
+  """ Encode an exported issue as one line of newline-delimited JSON. """
+
+  return dumps(exported) + "\n"
+
+
+def packed(exported):
+
+  """ Encode an exported issue with msgpack, whose documents delimit themselves. """
+
+  return msgpack.packb(exported, use_bin_type=False)
+
+
+# encodings of issue documents, by the name `--format` selects them with, along with the file extension for each
+FORMATS = collections.OrderedDict((
+  ('codeclimate', (codeclimate, '.json')),
+  ('ndjson', (ndjson, '.ndjson')),
+  ('msgpack', (packed, '.msgpack'))))
+
+encode = codeclimate  # encoding of issue documents, chosen by `select`
+
+
+def select(name):
+
+  """ Choose how issue documents are encoded, from then on.
+
+      :param name: Name of the format, from `FORMATS`.
+      :returns: Encoding function.
+      :raises ValueError: If the format is unknown, or its library is not installed. """
+
+  global encode
+
+  if name not in FORMATS:
+    raise ValueError('unknown format "%s"' % name)
+  if name == 'msgpack' and msgpack is None:
+    raise ValueError('the msgpack format requires the "msgpack" package, which is not installed')
+  encode = FORMATS[name][0]
+  return encode
+
+
+class IssueSink(object):
+
+  """ Buffered writer for the stream of issue documents, in whichever format
+      they are encoded, like the NUL-terminated documents CodeClimate reads
+      from `stdout`. Documents are batched and written with one call per
+      flush, once the buffer passes a size threshold, or once it has been
+      held past a time threshold, by a timer, even if no other document
+      arrives, and are optionally gzip-compressed on the way. If the reader
+      goes away, the rest of the stream is dropped. """
+
+  __slots__ = ('stream', 'descriptor', 'size', 'interval', 'buffered', 'length', 'flushed', 'broken', 'written',
+               'compressor', 'lock', 'timer')
+
+  def __init__(self, stream=None, size=DEFAULT_SIZE, interval=DEFAULT_INTERVAL, compress=False):
+
+    """ Open a sink over a stream. Streams backed by a file descriptor are
+        flushed first, so earlier output stays in order, and then written to
+        directly, skipping the stream's own buffer.
+
+        :param stream: File object to write to, defaults to `sys.stdout`.
+        :param size: Size of the buffer, in bytes.
+        :param interval: Longest time to hold buffered documents, in seconds.
+        :param compress: Gzip-compress the stream, which `close` then ends. """
+
+    self.stream = stream or sys.stdout
+    try:
+      self.descriptor = self.stream.fileno()
+      self.stream.flush()
+    except (AttributeError, IOError, ValueError):
+      self.descriptor = None  # in-memory stream, like a `StringIO`
+
+    self.size = size
+    self.interval = interval
+    self.buffered = []
+    self.length = 0
+    self.flushed = time.time()
+    self.broken = False
+    self.written = 0
+    self.compressor = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 16 + zlib.MAX_WBITS) if compress else None  # gzip framing
+    self.lock = threading.Lock()  # the timer flushes from its own thread
+    self.timer = None  # flushes documents held past the interval, while any are buffered
+
+  def write(self, document):
+
+    """ Buffer one issue document, flushing if a threshold is reached.
+
+        :param document: Serialized document, including its terminator. """
+
+    with self.lock:
+      if self.broken:
+        return
+      self.buffered.append(document)
+      self.length += len(document)
+      if self.length >= self.size or time.time() - self.flushed >= self.interval:
+        self.__flush()
+      elif self.timer is None:
+        self.timer = threading.Timer(self.interval, self.__expire)
+        self.timer.daemon = True
+        self.timer.start()
+
+  def flush(self):
+
+    """ Write out every buffered document, and stop the timer, which the
+        next buffered document arms again. """
+
+    with self.lock:
+      if self.timer is not None:
+        self.timer.cancel()
+        self.timer = None
+      self.__flush()
+
+  def __flush(self):
+
+    """ Write out every buffered document, with the lock held. """
+
+    self.flushed = time.time()
+    if not self.buffered or self.broken:
+      return
+
+    data = ''.join(self.buffered)
+    if isinstance(data, unicode):
+      data = data.encode('utf-8')
+    self.buffered = []
+    self.length = 0
+    if self.compressor is not None:
+      data = self.compressor.compress(data)
+    self.send(data)
+
+  def __expire(self):
+
+    """ Flush documents held past the interval, from the timer, which the
+        next buffered document arms again. Flushes on write leave it
+        running, rather than starting a thread for each. """
+
+    with self.lock:
+      self.timer = None
+      self.__flush()
+
+  def close(self):
+
+    """ Write out every buffered document, and end the compressed stream, if
+        compressing. The underlying stream is left open, and the timer is
+        stopped. """
+
+    with self.lock:
+      timer, self.timer = self.timer, None
+      self.__flush()
+      if self.compressor is not None and not self.broken:
+        compressor, self.compressor = self.compressor, None
+        self.send(compressor.flush())
+    if timer is not None:
+      timer.cancel()
+      timer.join()
+
+  def send(self, data):
+
+    """ Write encoded data to the stream, all of it, in as few calls as possible.
+
+        :param data: Bytes to write. """
+
+    if not data:
+      return
+    try:
+      if self.descriptor is None:
+        self.stream.write(data)
+        self.stream.flush()
+      else:
+        view = memoryview(data)
+        while view:
+          view = view[os.write(self.descriptor, view):]
+    except (IOError, OSError) as e:
+      if e.errno != errno.EPIPE:
+        raise
+      self.broken = True
+      from . import output
+      output.warn('Issue reader closed its end of the stream, dropping further issues.')
+      return
+    self.written += len(data)
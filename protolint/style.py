@@ -0,0 +1,705 @@
+# -*- coding: utf-8 -*-
+
+"""
+
+  protolint: style
+  ~~~~~~~~~~~~~~~~
+
+"""
+
+import os
+import re
+import itertools
+import multiprocessing
+
+
+IDENTIFIER, NUMBER, STRING, SYMBOL, END = 'identifier', 'number', 'string', 'symbol', 'end'
+
+# each match is a token with the whitespace and comments before it, grouping the token alone
+TOKEN_PATTERN = re.compile(r"""
+  (?:\s+|//[^\n]*|/\*.*?\*/)*
+  ([A-Za-z_][A-Za-z0-9_]*|[0-9][A-Za-z0-9_.]*|"(?:[^"\\\n]|\\.)*"|'(?:[^'\\\n]|\\.)*'|\S)""",
+  re.DOTALL | re.VERBOSE)
+
+is_identifier = re.compile(r'[A-Za-z_][A-Za-z0-9_]*$').match
+
+SCALARS = frozenset((
+  'double', 'float', 'int32', 'int64', 'uint32', 'uint64', 'sint32', 'sint64',
+  'fixed32', 'fixed64', 'sfixed32', 'sfixed64', 'bool', 'string', 'bytes'))
+
+LABELS = frozenset(('optional', 'required', 'repeated'))
+
+# naming rules, worded as `protoc-gen-lint` reports them
+camel_case = lambda name: name[:1].isupper() and '_' not in name
+lower_underscore = lambda name: name == name.lower()
+upper_underscore = lambda name: name == name.upper()
+
+RULES = {
+  'messageCase': (camel_case, "Use CamelCase (with an initial capital) for message names."),
+  'fieldCase': (lower_underscore, "Use underscore_separated_names for field names."),
+  'enumTypeCase': (camel_case, "Use CamelCase (with an initial capital) for enum type names."),
+  'enumValueCase': (upper_underscore, "Use CAPITALS_WITH_UNDERSCORES  for enum value names."),
+  'serviceCase': (camel_case, "Use CamelCase (with an initial capital) for service names."),
+  'rpcMethodCase': (camel_case, "Use CamelCase (with an initial capital) for RPC method names.")
+}
+
+SYNTAX_UNSPECIFIED = (
+  "No syntax specified for the proto file: %s. Please use 'syntax = \"proto2\";' or "
+  "'syntax = \"proto3\";' to specify a syntax version. (Defaulted to proto2 syntax.)")
+
+
+def kind_of(text):
+
+  """ Tell the kind of a token from its text. """
+
+  first = text[:1]
+  if not first:
+    return END
+  if first.isalpha() or first == '_':
+    return IDENTIFIER
+  if first.isdigit():
+    return NUMBER
+  if first in '"\'' and len(text) > 1:
+    return STRING
+  return SYMBOL
+
+
+class Tokens(object):
+
+  """ Tokens of protobuf source, split in one pass of the token pattern.
+      Positions are only worked out for the tokens that need them, and are
+      1-based, with tabs advancing to the next multiple of 8 columns, the way
+      `protoc` counts them. """
+
+  __slots__ = ('source', 'texts', 'cursor', 'offset', 'line', 'line_offset')
+
+  def __init__(self, source):
+
+    """ Split protobuf source into tokens, skipping whitespace and comments.
+
+        :param source: Content of a protofile. """
+
+    self.source = source
+    self.texts = TOKEN_PATTERN.findall(source)
+    self.cursor = self.offset = self.line_offset = 0
+    self.line = 1
+
+  def position(self, index):
+
+    """ Work out the position of a token. Tokens are usually asked for in
+        order, so each call only scans the source since the previous one.
+
+        :param index: Index of the token.
+        :returns: Tuple of the line and column of the token. """
+
+    if index < self.cursor:
+      self.cursor = self.offset = self.line_offset = 0
+      self.line = 1
+
+    match = next(itertools.islice(TOKEN_PATTERN.finditer(self.source, self.offset), index - self.cursor, None))
+    self.cursor, self.offset = index, match.start()
+    start = match.start(1)
+
+    source = self.source
+    self.line += source.count('\n', self.line_offset, start)
+    self.line_offset = start
+    line_start = source.rfind('\n', 0, start) + 1
+
+    if source.find('\t', line_start, start) == -1:
+      column = start - line_start
+    else:
+      column = 0
+      for character in source[line_start:start]:
+        column += 8 - column % 8 if character == '\t' else 1
+    return self.line, column + 1
+
+
+def tokenize(source):
+
+  """ Split protobuf source into tokens, skipping whitespace and comments.
+
+      :param source: Content of a protofile.
+      :returns: Generator of `(kind, text, line, column)` tuples. """
+
+  tokens = Tokens(source)
+  for index, text in enumerate(tokens.texts):
+    line, column = tokens.position(index)
+    yield kind_of(text), text, line, column
+
+
+def qualify(scope, name):
+
+  """ Join a scope and a name into a full name. """
+
+  return scope + '.' + name if scope else name
+
+
+class Declarations(object):
+
+  """ Declarations parsed from a protofile: enough of its structure to check
+      naming rules and resolve which imports it uses, without compiling it. """
+
+  __slots__ = ('syntax', 'package', 'imports', 'violations', 'symbols', 'references',
+               'tokens', 'texts', 'index')
+
+  def __init__(self, source):
+
+    """ Parse the declarations in a protofile.
+
+        :param source: Content of the protofile.
+        :raises ValueError: If the source cannot be parsed. """
+
+    self.syntax = False
+    self.package = ''
+    self.imports = []  # `(name, line, column, modifier)`
+    self.violations = []  # `(rule, name, line, column)` for every name breaking a naming rule
+    self.symbols = set()  # full names of types and extensions defined in the file
+    self.references = []  # `(scope, name)` for every type or extension referenced
+
+    self.tokens = Tokens(source)
+    self.texts = self.tokens.texts
+    self.texts.extend(('', '', ''))  # end of input, with room to look ahead past it
+    self.index = 0
+    try:
+      self.parse_file()
+    finally:
+      self.tokens = self.texts = None
+
+  def release(self):
+
+    """ Drop what is only needed to check this file itself, keeping what its
+        importers need, which are its symbols and its own imports.
+
+        :returns: This object. """
+
+    self.violations = self.references = None
+    return self
+
+  ## -- Tokens -- ##
+  def peek(self, offset=0):
+
+    """ Look at the text of an upcoming token without consuming it, which is
+        empty at the end of input. """
+
+    index = self.index + offset
+    return self.texts[index] if index < len(self.texts) else ''
+
+  def next(self):
+
+    """ Consume the next token, returning its text. """
+
+    text = self.peek()
+    if not text:
+      raise ValueError('unexpected end of input')
+    self.index += 1
+    return text
+
+  def accept(self, text):
+
+    """ Consume the next token if it has the given text. """
+
+    if self.texts[self.index] == text:
+      self.index += 1
+      return True
+    return False
+
+  def error(self, message):
+
+    """ Build an error for the next token. """
+
+    if not self.peek():
+      return ValueError('unexpected end of input, %s' % message)
+    line, column = self.tokens.position(self.index)
+    return ValueError('%s:%s: %s, found "%s"' % (line, column, message, self.peek()))
+
+  def expect(self, text):
+
+    """ Consume the next token, which must have the given text. """
+
+    if self.texts[self.index] != text:
+      raise self.error('expected "%s"' % text)
+    self.index += 1
+
+  def identifier(self):
+
+    """ Consume the next token, which must be an identifier, returning its text. """
+
+    text = self.texts[self.index]
+    if not is_identifier(text):
+      raise self.error('expected identifier')
+    self.index += 1
+    return text
+
+  def type_name(self):
+
+    """ Consume a possibly qualified type name, like `.base.TestMessage`. """
+
+    texts = self.texts
+    start = self.index
+    if texts[start] == '.':
+      self.index += 1
+    self.identifier()
+    while texts[self.index] == '.':
+      self.index += 1
+      self.identifier()
+    return ''.join(texts[start:self.index])
+
+  def name(self, rule, scope):
+
+    """ Consume the name of a declaration, noting it if it breaks the given
+        rule, and returning its full name in scope. """
+
+    index = self.index
+    name = self.identifier()
+    if rule and not RULES[rule][0](name):
+      line, column = self.tokens.position(index)
+      self.violations.append((rule, name, line, column))
+    return qualify(scope, name)
+
+  def skip(self, scope):
+
+    """ Consume the rest of a statement, through its closing `;`, noting any
+        custom options it references. """
+
+    texts = self.texts
+    try:
+      end = texts.index(';', self.index)
+    except ValueError:
+      raise self.error('expected ";"')
+
+    statement = texts[self.index:end]
+    if '{' not in statement and '(' not in statement:
+      self.index = end + 1  # the usual case, like the `= 1;` ending a field
+      return
+
+    depth = 0
+    while True:
+      text = self.next()
+      if text == '(' and (texts[self.index] == '.' or is_identifier(texts[self.index])):
+        self.references.append((scope, self.type_name()))
+      elif text == '{':
+        depth += 1
+      elif text == '}':
+        depth -= 1
+        if depth < 0:
+          self.index -= 1
+          raise self.error('unexpected "}"')
+      elif text == ';' and depth == 0:
+        return
+
+  ## -- Declarations -- ##
+  def parse_file(self):
+
+    """ Parse top-level statements. """
+
+    texts = self.texts
+    while texts[self.index]:
+      text = texts[self.index]
+      if text == ';':
+        self.index += 1
+      elif text in ('syntax', 'edition') and self.peek(1) == '=':
+        self.syntax = True
+        self.skip(self.package)
+      elif text == 'package':
+        self.index += 1
+        self.package = self.type_name()
+        self.expect(';')
+      elif text == 'import':
+        line, column = self.tokens.position(self.index)
+        self.index += 1
+        modifier = self.next() if texts[self.index] in ('public', 'weak') else None
+        name = self.next()
+        if kind_of(name) != STRING:
+          self.index -= 1
+          raise self.error('expected string')
+        self.imports.append((name[1:-1], line, column, modifier))
+        self.expect(';')
+      elif text == 'message':
+        self.index += 1
+        self.parse_message(self.package)
+      elif text == 'enum':
+        self.index += 1
+        self.parse_enum(self.package)
+      elif text == 'service':
+        self.index += 1
+        self.parse_service(self.package)
+      elif text == 'extend':
+        self.index += 1
+        self.parse_extend(self.package)
+      elif text == 'option':
+        self.skip(self.package)
+      else:
+        raise self.error('expected top-level statement')
+
+  def parse_message(self, scope):
+
+    """ Parse a message, after its `message` keyword. """
+
+    full_name = self.name('messageCase', scope)
+    self.symbols.add(full_name)
+    self.parse_message_body(full_name)
+
+  def parse_message_body(self, scope):
+
+    """ Parse the body of a message, or of a group. """
+
+    texts = self.texts
+    self.expect('{')
+    while True:
+      text = texts[self.index]
+      if text == '}':
+        self.index += 1
+        return
+      elif text == ';':
+        self.index += 1
+      elif text in ('message', 'enum', 'oneof') and texts[self.index + 2] == '{':
+        self.index += 1
+        if text == 'message':
+          self.parse_message(scope)
+        elif text == 'enum':
+          self.parse_enum(scope)
+        else:
+          self.identifier()  # oneof names are not checked
+          self.parse_fields(scope, extension=False)
+      elif text == 'extend':
+        self.index += 1
+        self.parse_extend(scope)
+      elif text in ('option', 'reserved', 'extensions'):
+        self.skip(scope)
+      else:
+        self.parse_field(scope, extension=False)
+
+  def parse_fields(self, scope, extension):
+
+    """ Parse a block of fields, like a `oneof` or an `extend`. """
+
+    texts = self.texts
+    self.expect('{')
+    while True:
+      text = texts[self.index]
+      if text == '}':
+        self.index += 1
+        return
+      elif text == ';':
+        self.index += 1
+      elif text == 'option':
+        self.skip(scope)
+      else:
+        self.parse_field(scope, extension)
+
+  def parse_field(self, scope, extension):
+
+    """ Parse a field, a map field, or a group. """
+
+    texts = self.texts
+    if texts[self.index] in LABELS:
+      self.index += 1
+
+    text = texts[self.index]
+    if texts[self.index + 2] == '=' and text != 'group' and is_identifier(text):
+      self.index += 1
+      field_type = text  # the usual case, a field with an unqualified type
+
+    elif text == 'group' and is_identifier(texts[self.index + 1]):
+      # a group declares a nested message, and a field with its name in lower case
+      self.index += 1
+      full_name = self.name('messageCase', scope)
+      self.symbols.add(full_name)
+      while texts[self.index] != '{':
+        if self.next() == '(' and is_identifier(texts[self.index]):
+          self.references.append((scope, self.type_name()))
+      self.parse_message_body(full_name)
+      return
+
+    elif text == 'map' and texts[self.index + 1] == '<':
+      self.index += 2
+      self.type_name()
+      self.expect(',')
+      field_type = self.type_name()
+      self.expect('>')
+
+    else:
+      field_type = self.type_name()
+
+    if field_type not in SCALARS:
+      self.references.append((scope, field_type))
+
+    full_name = self.name(None if extension else 'fieldCase', scope)
+    if extension:
+      self.symbols.add(full_name)
+    self.expect('=')
+    self.skip(scope)
+
+  def parse_extend(self, scope):
+
+    """ Parse an `extend` block, after its keyword. """
+
+    self.references.append((scope, self.type_name()))
+    self.parse_fields(scope, extension=True)
+
+  def parse_enum(self, scope):
+
+    """ Parse an enum, after its `enum` keyword. Enum values are scoped
+        alongside the enum itself, not within it. """
+
+    texts = self.texts
+    full_name = self.name('enumTypeCase', scope)
+    self.symbols.add(full_name)
+    self.expect('{')
+    while True:
+      text = texts[self.index]
+      if text == '}':
+        self.index += 1
+        return
+      elif text == ';':
+        self.index += 1
+      elif text in ('option', 'reserved') and texts[self.index + 1] != '=':
+        self.skip(full_name)
+      else:
+        self.symbols.add(self.name('enumValueCase', scope))
+        self.skip(full_name)
+
+  def parse_service(self, scope):
+
+    """ Parse a service, after its `service` keyword. """
+
+    texts = self.texts
+    full_name = self.name('serviceCase', scope)
+    self.symbols.add(full_name)
+    self.expect('{')
+    while True:
+      text = texts[self.index]
+      if text == '}':
+        self.index += 1
+        return
+      elif text == ';':
+        self.index += 1
+      elif text == 'rpc' and is_identifier(texts[self.index + 1]):
+        self.index += 1
+        self.name('rpcMethodCase', full_name)
+        for keyword in (None, 'returns'):
+          if keyword:
+            self.expect(keyword)
+          self.expect('(')
+          if texts[self.index] == 'stream' and texts[self.index + 1] != ')':
+            self.index += 1
+          self.references.append((scope, self.type_name()))
+          self.expect(')')
+        if self.accept('{'):
+          while not self.accept('}'):
+            if not self.accept(';'):
+              self.skip(full_name)
+        else:
+          self.expect(';')
+      else:
+        self.skip(full_name)
+
+
+def parse(path):
+
+  """ Parse the declarations in a protofile.
+
+      :param path: Path to the protofile.
+      :returns: `Declarations` for the file.
+      :raises ValueError: If the file cannot be parsed.
+      :raises IOError: If the file cannot be read. """
+
+  with open(path, 'r') as fhandle:
+    return Declarations(fhandle.read())
+
+
+class Checker(object):
+
+  """ Checks protofiles against the naming rules of `protoc-gen-lint`, and
+      for the `protoc` warnings about missing syntax and unused imports,
+      producing the same issue records that `protoc` output parses into. """
+
+  __slots__ = ('proto_paths', 'parsed', 'exported')
+
+  def __init__(self, proto_paths):
+
+    """ Prepare to check protofiles found under the given proto paths.
+
+        :param proto_paths: Absolute `--proto_path` roots, in lookup order. """
+
+    self.proto_paths = tuple(proto_paths)
+    self.parsed = {}
+    self.exported = {}
+
+  def name(self, path):
+
+    """ Name a protofile the way `protoc` does, relative to its proto path. """
+
+    for proto_path in self.proto_paths:
+      prefix = os.path.join(proto_path, '')
+      if path.startswith(prefix):
+        return path[len(prefix):]
+    return path
+
+  def resolve(self, name):
+
+    """ Resolve an imported name against the proto paths. """
+
+    for proto_path in self.proto_paths:
+      candidate = os.path.join(proto_path, name)
+      if os.path.isfile(candidate):
+        return candidate
+    return None
+
+  def declarations(self, path):
+
+    """ Parse a protofile once, returning `None` if it cannot be parsed. """
+
+    if path not in self.parsed:
+      try:
+        self.parsed[path] = parse(path).release()
+      except (IOError, ValueError):
+        self.parsed[path] = None
+    return self.parsed[path]
+
+  def exports(self, path, seen=None):
+
+    """ Collect the symbols a protofile makes visible to its importers: its
+        own, and those of anything it imports publicly.
+
+        :returns: Set of full names, or `None` if the file cannot be parsed. """
+
+    if path in self.exported:
+      return self.exported[path]
+
+    declarations = self.declarations(path)
+    if declarations is None:
+      return None
+
+    seen = seen or set()
+    seen.add(path)
+    symbols = set(declarations.symbols)
+    for name, _, _, modifier in declarations.imports:
+      resolved = self.resolve(name) if modifier == 'public' else None
+      if resolved and resolved not in seen:
+        symbols.update(self.exports(resolved, seen) or ())
+    self.exported[path] = symbols
+    return symbols
+
+  def unused_imports(self, declarations):
+
+    """ Find imports that no reference in a file resolves into, the way
+        `protoc` resolves names: from the innermost scope outwards, with the
+        first definition found taking precedence. Imports that cannot be
+        resolved or parsed are never reported, since `protoc` would fail on
+        them instead.
+
+        :returns: List of `(name, line, column)` for unused imports. """
+
+    candidates = []
+    for name, line, column, modifier in declarations.imports:
+      if modifier == 'public':
+        continue  # public imports are there for importers, not for this file
+      resolved = self.resolve(name)
+      symbols = self.exports(resolved) if resolved else None
+      if symbols is None:
+        continue
+      candidates.append([name, line, column, symbols, False])
+
+    if not candidates:
+      return []
+
+    for scope, reference in declarations.references:
+      if reference.startswith('.'):
+        scopes, reference = [''], reference[1:]
+      else:
+        scopes = [scope]
+        while scope:
+          scope = scope.rpartition('.')[0]
+          scopes.append(scope)
+
+      for scope in scopes:
+        full_name = qualify(scope, reference)
+        if full_name in declarations.symbols:
+          break
+        owners = [candidate for candidate in candidates if full_name in candidate[3]]
+        if owners:
+          for candidate in owners:
+            candidate[4] = True
+          break
+
+    return [(name, line, column) for name, line, column, _, used in candidates if not used]
+
+  def check(self, path):
+
+    """ Check a protofile.
+
+        :param path: Absolute path to the protofile.
+        :returns: List of issue records, as `BaseIssue.record` produces them.
+        :raises ValueError: If the file cannot be parsed.
+        :raises IOError: If the file cannot be read. """
+
+    declarations = parse(path)
+    self.parsed[path] = declarations
+    protofile = self.name(path)
+    records = []
+
+    if not declarations.syntax:
+      message = SYNTAX_UNSPECIFIED % protofile
+      raw = "[libprotobuf WARNING google/protobuf/compiler/parser.cc:546] %s" % message
+      records.append(['Issue', 'syntaxUnspecified', raw, message, protofile, None, None, None])
+
+    for name, line, column in self.unused_imports(declarations):
+      message = "Import %s is unused." % name
+      raw = "%s:%s:%s: warning: %s" % (protofile, line, column, message)
+      records.append(['Issue', 'importUnused', raw, message, protofile, line, column, name])
+
+    for rule, name, line, column in declarations.violations:
+      message = RULES[rule][1]
+      raw = "%s:%s:%s: '%s' - %s" % (protofile, line, column, name, message)
+      records.append(['Issue', rule, raw, message, protofile, line, column, name])
+
+    declarations.release()  # kept for importers, which only need its symbols
+    return records
+
+
+# checker for each worker process, built by `_initialize`
+_checker = None
+
+
+def _initialize(proto_paths):
+
+  """ Build the checker for a worker process. """
+
+  global _checker
+  _checker = Checker(proto_paths)
+
+
+def _check(path, checker=None):
+
+  """ Check a protofile in a worker process, or with the given checker,
+      returning its path, records and any error, so one broken file does not
+      stop the others. """
+
+  try:
+    return path, (checker or _checker).check(path), None
+  except (IOError, ValueError) as e:
+    return path, [], str(e)
+
+
+def check_all(protofiles, proto_paths, processes=1):
+
+  """ Check protofiles, optionally across a pool of processes.
+
+      :param protofiles: Iterable of absolute protofile paths.
+      :param proto_paths: Absolute `--proto_path` roots, in lookup order.
+      :param processes: Number of worker processes, `1` to check in-process.
+      :returns: Generator of `(path, records, error)` tuples, in order. """
+
+  if processes < 2:
+    checker = Checker(proto_paths)  # not the global one, so threads may check at once
+    for protofile in protofiles:
+      yield _check(protofile, checker)
+    return
+
+  pool = multiprocessing.Pool(processes, _initialize, (proto_paths,))
+  try:
+    for result in pool.imap(_check, protofiles, chunksize=64):
+      yield result
+  finally:
+    pool.terminate()
@@ -0,0 +1,148 @@
+# -*- coding: utf-8 -*-
+
+"""
+
+  protolint: walker
+  ~~~~~~~~~~~~~~~~~
+
+"""
+
+import os
+
+from . import output
+from multiprocessing.pool import ThreadPool
+
+try:
+  from os import scandir
+except ImportError:  # pragma: no cover
+  try:
+    from scandir import scandir
+  except ImportError:
+    scandir = None
+
+
+PROTO_SUFFIX = '.proto'
+
+
+class _Entry(object):
+
+  """ Minimal stand-in for `os.DirEntry`, used when `scandir` is unavailable. """
+
+  __slots__ = ('name', 'path')
+
+  def __init__(self, directory, name):
+
+    """ Initialize a directory entry.
+
+        :param directory: Directory containing the entry.
+        :param name: Name of the entry within `directory`. """
+
+    self.name = name
+    self.path = os.path.join(directory, name)
+
+  def is_dir(self):
+
+    """ Whether this entry is a directory, following symlinks. """
+
+    return os.path.isdir(self.path)
+
+  def is_file(self):
+
+    """ Whether this entry is a regular file, following symlinks. """
+
+    return os.path.isfile(self.path)
+
+
+def _entries(directory):
+
+  """ List the entries of a directory, sorted by name so walks are stable.
+
+      :param directory: Directory to list.
+      :returns: Sorted list of directory entries. """
+
+  if scandir is not None:
+    return sorted(scandir(directory), key=lambda entry: entry.name)
+  return [_Entry(directory, name) for name in sorted(os.listdir(directory))]
+
+
+def walk(root, exclude=None, suffix=PROTO_SUFFIX):
+
+  """ Walk a directory tree in-process, lazily yielding the path of every
+      file ending in `suffix`. Directories matching `exclude` are pruned
+      before they are listed, and symlinked directories are only entered
+      once, so symlink loops cannot recurse forever.
+
+      :param root: Directory to walk.
+      :param exclude: Callable taking a directory path, returning `True` to prune it.
+      :param suffix: File suffix to match.
+      :returns: Generator of matching file paths. """
+
+  try:
+    root_stat = os.stat(root)
+  except OSError as e:
+    output.say('Unable to scan path "%s": %s', root, e)
+    return
+
+  seen = set(((root_stat.st_dev, root_stat.st_ino),))
+  pending = [root]
+
+  while pending:
+    directory = pending.pop()
+    try:
+      entries = _entries(directory)
+    except OSError as e:
+      output.say('Unable to scan path "%s": %s', directory, e)
+      continue
+
+    subdirectories = []
+    for entry in entries:
+      try:
+        if entry.is_dir():
+          if exclude is not None and exclude(entry.path):
+            output.say('Skipping excluded path "%s".', entry.path)
+            continue
+          entry_stat = os.stat(entry.path)
+          identity = (entry_stat.st_dev, entry_stat.st_ino)
+          if identity in seen:
+            output.say('Skipping already-scanned path "%s".', entry.path)
+            continue
+          seen.add(identity)
+          subdirectories.append(entry.path)
+
+        elif entry.name.endswith(suffix) and entry.is_file():
+          yield entry.path
+
+      except OSError:  # pragma: no cover
+        continue  # broken symlink, or the entry vanished mid-walk
+
+    # push in reverse so subdirectories are visited in sorted order
+    pending.extend(reversed(subdirectories))
+
+
+def walk_roots(roots, exclude=None, threads=None, suffix=PROTO_SUFFIX):
+
+  """ Walk several directory trees, yielding matching files root by root.
+      With more than one thread, roots are walked concurrently in a thread
+      pool, but results are still yielded in the order of `roots`.
+
+      :param roots: Iterable of directories to walk.
+      :param exclude: Callable taking a directory path, returning `True` to prune it.
+      :param threads: Number of threads to walk with, defaults to one.
+      :param suffix: File suffix to match.
+      :returns: Generator of matching file paths. """
+
+  roots = list(roots)
+
+  if not threads or threads < 2 or len(roots) < 2:
+    for root in roots:
+      for path in walk(root, exclude, suffix):
+        yield path
+    return
+
+  pool = ThreadPool(min(threads, len(roots)))
+  try:
+    for batch in pool.imap(lambda root: list(walk(root, exclude, suffix)), roots):
+      for path in batch:
+        yield path
+  finally:
+    pool.terminate()
@@ -0,0 +1,271 @@
+# -*- coding: utf-8 -*-
+
+"""
+
+  protolint: watch
+  ~~~~~~~~~~~~~~~~
+
+"""
+
+import os
+import sys
+import time
+import errno
+import select
+import struct
+import ctypes
+import ctypes.util
+
+from . import sink
+from . import baseline
+from . import output
+from . import walker
+
+
+DEFAULT_DEBOUNCE = 0.2  # seconds without changes before a burst of them is linted
+DEFAULT_INTERVAL = 1.0  # seconds between walks when polling
+
+# from `<sys/inotify.h>`
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ISDIR = 0x40000000
+IN_CLOEXEC = 0x00080000
+IN_MASK = IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+
+EVENT = struct.Struct('iIII')  # `struct inotify_event`, followed by its name
+
+try:
+  libc = ctypes.CDLL(ctypes.util.find_library('c'), use_errno=True)
+  libc.inotify_init1, libc.inotify_add_watch
+except (OSError, AttributeError):  # pragma: no cover
+  libc = None
+
+
+class Inotify(object):
+
+  """ Watches directory trees through Linux `inotify`, by way of `ctypes`. Every
+      directory in them is watched, including directories created later. """
+
+  __slots__ = ('roots', 'descriptor', 'directories')
+
+  def __init__(self, roots):
+
+    """ Start watching directory trees.
+
+        :param roots: Directories to watch, recursively.
+        :raises OSError: If `inotify` is unavailable. """
+
+    if libc is None:
+      raise OSError(errno.ENOSYS, 'inotify is unavailable')
+
+    self.roots = list(roots)
+    self.directories = {}
+    self.descriptor = libc.inotify_init1(IN_CLOEXEC)
+    if self.descriptor < 0:
+      raise OSError(ctypes.get_errno(), 'inotify_init1 failed')
+
+    for root in self.roots:
+      self.__watch(root)
+
+  def __watch(self, root):
+
+    """ Watch a directory and every directory in it. """
+
+    for directory, _, _ in os.walk(root, followlinks=True):
+      # `ctypes` would pass `unicode` paths as wide strings
+      encoded = directory.encode(sys.getfilesystemencoding()) if isinstance(directory, unicode) else directory
+      watch = libc.inotify_add_watch(self.descriptor, encoded, IN_MASK)
+      if watch < 0:
+        output.warn('Unable to watch "%s": %s', directory, os.strerror(ctypes.get_errno()))
+      else:
+        self.directories[watch] = directory
+
+  def changes(self, timeout=None):
+
+    """ Wait for changes.
+
+        :param timeout: Seconds to wait for, or `None` to wait until something changes.
+        :returns: Set of changed protofile and directory paths, empty if none changed in time. """
+
+    readable, _, _ = select.select([self.descriptor], [], [], timeout)
+    if not readable:
+      return set()
+
+    data = os.read(self.descriptor, 64 * 1024)
+    changed = set()
+    offset = 0
+    while offset < len(data):
+      watch, mask, _, length = EVENT.unpack_from(data, offset)
+      name = data[offset + EVENT.size:offset + EVENT.size + length].rstrip('\0')
+      offset += EVENT.size + length
+
+      if mask & IN_Q_OVERFLOW:
+        output.warn('Missed changes to watched directories, linting everything again.')
+        changed.update(self.roots)
+        continue
+      if mask & IN_IGNORED:
+        self.directories.pop(watch, None)
+        continue
+
+      directory = self.directories.get(watch)
+      if directory is None:
+        continue
+      if isinstance(directory, unicode):
+        name = name.decode(sys.getfilesystemencoding(), 'replace')
+      path = os.path.join(directory, name)
+      if mask & IN_ISDIR:
+        if mask & (IN_CREATE | IN_MOVED_TO):
+          self.__watch(path)
+        changed.add(path)
+      elif name.endswith(walker.PROTO_SUFFIX):
+        changed.add(path)
+    return changed
+
+  def close(self):
+
+    """ Stop watching. """
+
+    os.close(self.descriptor)
+
+
+class Poller(object):
+
+  """ Watches directory trees by walking them again and again, comparing the
+      modification time and size of each protofile, where `inotify` is not
+      available or does not work, like on network filesystems. """
+
+  __slots__ = ('roots', 'interval', 'snapshot')
+
+  def __init__(self, roots, interval=DEFAULT_INTERVAL):
+
+    """ Start watching directory trees.
+
+        :param roots: Directories to watch, recursively.
+        :param interval: Seconds between walks. """
+
+    self.roots = list(roots)
+    self.interval = interval
+    self.snapshot = self.__snapshot()
+
+  def __snapshot(self):
+
+    """ Walk the watched directories, recording every protofile. """
+
+    snapshot = {}
+    for path in walker.walk_roots(self.roots):
+      try:
+        stat = os.stat(path)
+      except OSError:
+        continue
+      snapshot[path] = (stat.st_mtime, stat.st_size)
+    return snapshot
+
+  def changes(self, timeout=None):
+
+    """ Wait for changes.
+
+        :param timeout: Seconds to wait for, or `None` to wait until something changes.
+        :returns: Set of changed protofile paths, empty if none changed in time. """
+
+    deadline = None if timeout is None else time.time() + timeout
+    while True:
+      time.sleep(self.interval if deadline is None else max(0, min(self.interval, deadline - time.time())))
+      snapshot = self.__snapshot()
+      changed = set(path for path in set(snapshot).union(self.snapshot)
+                    if snapshot.get(path) != self.snapshot.get(path))
+      self.snapshot = snapshot
+      if changed or (deadline is not None and time.time() >= deadline):
+        return changed
+
+  def close(self):
+
+    """ Stop watching. """
+
+
+def watcher(roots, poll=False):
+
+  """ Watch directory trees through `inotify`, or by polling where it fails.
+
+      :param roots: Directories to watch, recursively.
+      :param poll: Poll even if `inotify` is available.
+      :returns: `Inotify` or `Poller` object. """
+
+  if not poll:
+    try:
+      return Inotify(roots)
+    except OSError as e:
+      output.warn('Unable to watch through inotify, polling instead: %s', e)
+  return Poller(roots)
+
+
+def debounced(source, delay=DEFAULT_DEBOUNCE):
+
+  """ Group bursts of changes, like an editor saving several files, by waiting
+      for changes and then until there are none for `delay` seconds.
+
+      :param source: `Inotify` or `Poller` object.
+      :param delay: Seconds without changes that end a burst.
+      :returns: Generator of sets of changed paths, one per burst. """
+
+  while True:
+    changed = set()
+    while not changed:
+      changed.update(source.changes())
+    while True:
+      more = source.changes(delay)
+      if not more:
+        break
+      changed.update(more)
+    yield changed
+
+
+def run(linter, arguments):
+
+  """ Lint the workspace, then lint it again whenever protos change, until
+      interrupted. Each cycle writes every current issue to `stdout`, or with
+      `--watch-output delta`, one document listing the issues added since the
+      last cycle and the fingerprints of those removed.
+
+      :param linter: `linter.Linter` for the workspace.
+      :param arguments: Parsed `cli.parser` arguments.
+      :returns: Exit status. """
+
+  protofiles = linter.discover()
+  source = watcher(linter.roots, getattr(arguments, 'poll', False))
+  delta = getattr(arguments, 'watch_output', 'stream') == 'delta'
+  changes = debounced(source, getattr(arguments, 'debounce', None) or DEFAULT_DEBOUNCE)
+
+  baseline_path = getattr(arguments, 'baseline', None)
+  known = baseline.Baseline(baseline_path) if baseline_path else ()
+
+  previous = None
+  try:
+    for issues in linter.watch(changes, protofiles):
+      issues = [issue for issue in issues if issue.unique_hash not in known]
+      current = dict((issue.unique_hash, issue) for issue in issues)
+      if delta and previous is not None:
+        added = [issue.export(linter.make_path_for_protofile) for fingerprint, issue in current.items() if fingerprint not in previous]
+        removed = sorted(fingerprint for fingerprint in previous if fingerprint not in current)
+        output.write(sink.encode({"type": "delta", "added": added, "removed": removed}))
+      else:
+        for issue in issues:
+          issue.write(linter.make_path_for_protofile)
+      output.flush()
+
+      if previous is not None:
+        output.info('Found %s issues, %s added and %s removed.',
+                    len(current), len(set(current) - set(previous)), len(set(previous) - set(current)))
+      output.info('Watching for changes...')
+      previous = current
+  except KeyboardInterrupt:  # pragma: no cover
+    pass
+  finally:
+    source.close()
+    if baseline_path:
+      known.close()
+  return 0
@@ -0,0 +1,73 @@
+# -*- coding: utf-8 -*-
+
+"""
+
+  testsuite: baseline
+  ~~~~~~~~~~~~~~~~~~~
+
+"""
+
+import os
+import shutil
+import hashlib
+import tempfile
+import unittest
+
+from protolint import baseline
+
+
+class BaselineTests(unittest.TestCase):
+
+  """ Test the `protolint.baseline` package. """
+
+  def setUp(self):
+
+    """ Make a scratch directory for baseline files. """
+
+    self.root = tempfile.mkdtemp()
+    self.path = os.path.join(self.root, 'baseline.bin')
+
+  def tearDown(self):
+
+    """ Remove the scratch directory. """
+
+    shutil.rmtree(self.root)
+
+  def test_roundtrip(self):
+
+    """ make sure written fingerprints are found, and others are not """
+
+    fingerprints = [hashlib.sha256(str(index)).hexdigest() for index in range(5000)]
+    self.assertEqual(baseline.write(self.path, fingerprints + fingerprints[:10]), 5000, "duplicates must be dropped")
+
+    known = baseline.Baseline(self.path)
+    try:
+      self.assertEqual(len(known), 5000)
+      for fingerprint in fingerprints:
+        self.assertTrue(fingerprint in known, "written fingerprints must be found")
+      for index in range(5000, 6000):
+        self.assertFalse(hashlib.sha256(str(index)).hexdigest() in known, "other fingerprints must not be found")
+    finally:
+      known.close()
+
+  def test_empty(self):
+
+    """ make sure an empty baseline loads and knows nothing """
+
+    baseline.write(self.path, [])
+    known = baseline.Baseline(self.path)
+    self.assertEqual(len(known), 0)
+    self.assertFalse(hashlib.sha256('').hexdigest() in known)
+    known.close()
+
+  def test_invalid(self):
+
+    """ make sure files that are not baselines are rejected """
+
+    with open(self.path, 'wb') as fhandle:
+      fhandle.write('not a baseline' * 100)
+    with self.assertRaises(ValueError):
+      baseline.Baseline(self.path)
+    open(self.path, 'wb').close()
+    with self.assertRaises(ValueError):
+      baseline.Baseline(self.path)
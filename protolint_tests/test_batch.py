@@ -0,0 +1,107 @@
+# -*- coding: utf-8 -*-
+
+"""
+
+  testsuite: batch
+  ~~~~~~~~~~~~~~~~
+
+"""
+
+import os
+import json
+import shutil
+import tempfile
+import unittest
+
+from protolint import batch
+from .base import switchout_streams, restore_streams
+
+
+class BatchTests(unittest.TestCase):
+
+  """ Test the `protolint.batch` package. """
+
+  def setUp(self):
+
+    """ Build two scratch workspaces, each with one badly named message. """
+
+    self.root = tempfile.mkdtemp()
+    with open(os.path.join(self.root, 'config.json'), 'w') as fhandle:
+      json.dump({'include_paths': []}, fhandle)
+    for name in ('first', 'second'):
+      os.makedirs(os.path.join(self.root, name))
+      with open(os.path.join(self.root, name, 'Sample.proto'), 'w') as fhandle:
+        fhandle.write('syntax = "proto3";\nmessage %s {}\n' % name)
+
+  def tearDown(self):
+
+    """ Remove the scratch workspaces. """
+
+    shutil.rmtree(self.root)
+
+  def manifest(self, workspaces):
+
+    """ Write a manifest, returning its path. """
+
+    path = os.path.join(self.root, 'manifest.json')
+    with open(path, 'w') as fhandle:
+      json.dump(workspaces, fhandle)
+    return path
+
+  def run_batch(self, *arguments):
+
+    """ Run a style-only batch, returning its exit status and each document written to `stdout`. """
+
+    switchout_streams()
+    try:
+      status = batch.run(list(arguments) + ['--style-only', '--log-level', 'critical'])
+    finally:
+      stdout, _ = restore_streams()
+    return status, [json.loads(document) for document in stdout.getvalue().split('\0') if document.strip()]
+
+  def test_load(self):
+
+    """ make sure manifests resolve paths and name workspaces uniquely """
+
+    entries = batch.load(self.manifest([['config.json', 'first'], ['config.json', 'first'],
+                                        {'config': 'config.json', 'workspace': 'second', 'name': 'other'}]))
+    self.assertEqual([entry.name for entry in entries], ['first', 'first-2', 'other'])
+    self.assertEqual(entries[0].workspace, os.path.join(self.root, 'first'))
+    self.assertEqual(entries[2].config, os.path.join(self.root, 'config.json'))
+    self.assertRaises(ValueError, batch.load, self.manifest([['config.json']]))
+
+  def test_multiplexed(self):
+
+    """ make sure issues of every workspace are written to one stream, tagged """
+
+    status, documents = self.run_batch('--manifest', self.manifest([['config.json', 'first'], ['config.json', 'second']]))
+    self.assertEqual(status, 0)
+    self.assertEqual(sorted((document['workspace'], document['location']['path']) for document in documents),
+                     [('first', 'Sample.proto'), ('second', 'Sample.proto')])
+
+  def test_cache(self):
+
+    """ make sure a relative cache is shared, relative to where the batch runs """
+
+    self.addCleanup(os.chdir, os.getcwd())
+    os.chdir(self.root)
+    status, _ = self.run_batch('--manifest', self.manifest([['config.json', 'first'], ['config.json', 'second']]),
+                               '--cache', 'cache')
+    self.assertEqual(status, 0)
+    self.assertTrue(os.path.isdir(os.path.join(self.root, 'cache')))
+    self.assertFalse(any(os.path.exists(os.path.join(self.root, name, 'cache')) for name in ('first', 'second')),
+                     "each workspace must not have a cache of its own")
+
+  def test_output_dir(self):
+
+    """ make sure issues may be split by workspace, and that failures do not stop other workspaces """
+
+    output_dir = os.path.join(self.root, 'out')
+    status, documents = self.run_batch('--manifest', self.manifest([['config.json', 'first'], ['missing.json', 'second']]),
+                                       '--output-dir', output_dir, '--workers', '2')
+    self.assertEqual(status, 1, "failing workspaces must fail the batch")
+    self.assertEqual(documents, [])
+    self.assertEqual(sorted(os.listdir(output_dir)), ['first.json', 'second.json'])
+    with open(os.path.join(output_dir, 'first.json'), 'r') as fhandle:
+      written = [json.loads(document) for document in fhandle.read().split('\0') if document.strip()]
+    self.assertEqual([document['workspace'] for document in written], ['first'])
@@ -0,0 +1,180 @@
+# -*- coding: utf-8 -*-
+
+"""
+
+  testsuite: cache
+  ~~~~~~~~~~~~~~~~
+
+"""
+
+import os
+import time
+import shutil
+import threading
+import tempfile
+import unittest
+
+from protolint import cache
+from protolint import imports
+from .base import switchout_streams, restore_streams
+
+
+class CacheTests(unittest.TestCase):
+
+  """ Test the `protolint.cache` package. """
+
+  def setUp(self):
+
+    """ Build a scratch workspace with a proto importing another. """
+
+    self.root = tempfile.mkdtemp()
+    self.workspace = os.path.join(self.root, 'workspace')
+    os.makedirs(self.workspace)
+    self.base = self.write('Base.proto', 'syntax = "proto3";\nmessage Base {}\n')
+    self.sample = self.write('Sample.proto', 'syntax = "proto3";\nimport "Base.proto";\nmessage Sample { Base base = 1; }\n')
+    self.results = cache.ResultCache(os.path.join(self.root, 'cache'), settings={'proto_paths': [self.workspace]})
+
+  def tearDown(self):
+
+    """ Remove the scratch workspace. """
+
+    shutil.rmtree(self.root)
+
+  def write(self, name, content):
+
+    """ Write a proto into the scratch workspace. """
+
+    path = os.path.join(self.workspace, name)
+    with open(path, 'w') as fhandle:
+      fhandle.write(content)
+    return path
+
+  def graph(self):
+
+    """ Build an import graph over the scratch workspace. """
+
+    return imports.ImportGraph([self.base, self.sample], [self.workspace])
+
+  def test_roundtrip(self):
+
+    """ store records under a key and load them back """
+
+    key = self.results.key(self.sample, self.graph())
+    self.assertEqual(self.results.get(key), None, "an empty cache must miss")
+    self.results.put(key, [['Issue', 'fieldCase', 'raw', 'message', 'Sample.proto', 1, 2, None]])
+    self.assertEqual(self.results.get(key)[0][1], 'fieldCase', "stored records must be loadable")
+
+  def test_key_imports(self):
+
+    """ make sure keys change when a transitive import changes, but not otherwise """
+
+    before = self.results.key(self.sample, self.graph())
+    self.assertEqual(before, self.results.key(self.sample, self.graph()), "keys must be stable")
+
+    self.write('Base.proto', 'syntax = "proto3";\nmessage Base { string changed = 1; }\n')
+    fresh = cache.ResultCache(self.results.root, settings={'proto_paths': [self.workspace]})
+    self.assertNotEqual(before, fresh.key(self.sample, self.graph()), "keys must change with imported content")
+
+  def test_key_settings(self):
+
+    """ make sure keys change with linter settings """
+
+    other = cache.ResultCache(self.results.root, settings={'proto_paths': []})
+    self.assertNotEqual(self.results.key(self.base, self.graph()), other.key(self.base, self.graph()))
+
+  def test_digest_precheck(self):
+
+    """ make sure unchanged files are not rehashed once the index is saved """
+
+    digest = self.results.digest(self.base)
+    self.results.save()
+    fresh = cache.ResultCache(self.results.root, settings={})
+    fresh.index[self.base][2] = 'recorded'
+    self.assertEqual(fresh.digest(self.base), 'recorded', "matching mtime and size must reuse the recorded hash")
+    self.assertNotEqual(digest, 'recorded')
+
+  def test_evict(self):
+
+    """ make sure least-recently-used entries are evicted past the size limit """
+
+    switchout_streams()
+    try:
+      self.results.limit = 1
+      self.results.put('aa' * 32, [])
+      self.results.put('bb' * 32, [])
+      old = time.time() - 60
+      os.utime(os.path.join(self.results.root, 'aa', 'aa' * 32 + '.json'), (old, old))
+      self.results.limit = os.path.getsize(os.path.join(self.results.root, 'bb', 'bb' * 32 + '.json'))
+      self.results.save()
+    finally:
+      restore_streams()
+
+    self.assertEqual(self.results.get('aa' * 32), None, "the least recently used entry must be evicted")
+    self.assertEqual(self.results.get('bb' * 32), [], "the most recently used entry must be kept")
+
+  def test_concurrent(self):
+
+    """ make sure linters sharing a cache can save and evict at once, keeping each other's index entries """
+
+    failures = []
+
+    def lint(index):
+      try:
+        results = cache.ResultCache(self.results.root, settings={}, limit=0)
+        results.digest(self.write('Proto%02d.proto' % index, 'syntax = "proto3";\n'))
+        for entry in range(20):
+          results.put('%02x' % (entry % 4) + '%062x' % (index * 100 + entry), [])
+          results.save()
+      except Exception as e:  # pragma: no cover
+        failures.append(e)
+
+    switchout_streams()
+    try:
+      threads = [threading.Thread(target=lint, args=(index,)) for index in range(8)]
+      for thread in threads:
+        thread.start()
+      for thread in threads:
+        thread.join()
+    finally:
+      restore_streams()
+
+    self.assertEqual(failures, [])
+    self.assertEqual(sorted(cache.ResultCache(self.results.root, settings={}).index),
+                     [os.path.join(self.workspace, 'Proto%02d.proto' % index) for index in range(8)])
+
+  def test_descriptors(self):
+
+    """ make sure descriptors are stored as they are, apart from cached results """
+
+    switchout_streams()
+    try:
+      descriptors = cache.DescriptorCache(os.path.join(self.results.root, 'descriptors'), settings={})
+      key = descriptors.key(self.sample, self.graph())
+      descriptors.put(key, '\n\x0cSample.proto\x00\xff')
+      descriptors.save()
+
+      self.results.limit = 0
+      self.results.put('aa' * 32, [])
+      self.results.save()
+    finally:
+      restore_streams()
+
+    self.assertEqual(descriptors.get(key), '\n\x0cSample.proto\x00\xff', "descriptors must load byte for byte")
+    self.assertEqual(self.results.get('aa' * 32), None)
+
+  def test_memory(self):
+
+    """ make sure in-memory entries are dropped least-recently-used first, and files are checked every run """
+
+    results = cache.MemoryCache(settings={}, limit=2)
+    for key in ('aa', 'bb', 'cc'):
+      results.put(key, [])
+      results.get('aa')
+    results.save()
+    self.assertEqual((results.get('aa'), results.get('bb'), results.get('cc')), ([], None, []))
+
+    before = results.key(self.sample, self.graph())
+    self.write('Base.proto', 'syntax = "proto3";\nmessage Base { string changed = 1; }\n')
+    os.utime(self.base, (0, 0))
+    results.save()
+    self.assertNotEqual(before, results.key(self.sample, self.graph()), "saving must forget file hashes")
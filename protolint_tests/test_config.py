@@ -34,6 +34,7 @@ class ConfigTests(unittest.TestCase):
     self.assertTrue(lint.config != None, "linter must be able to load and parse config")
     self.assertEqual(lint.filepath, "protolint_tests/configs/sample.json", "linter config file path must be properly parsed")
     self.assertEqual(lint.workspace, "protolint_tests/", "workspace path must be properly parsed")
+    self.assertEqual(lint.log_level, None, "log level must default to none")
 
 
   def test_include_paths(self):
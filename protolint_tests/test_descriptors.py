@@ -0,0 +1,88 @@
+# -*- coding: utf-8 -*-
+
+"""
+
+  testsuite: descriptors
+  ~~~~~~~~~~~~~~~~~~~~~~
+
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+import subprocess
+
+from protolint import descriptors
+
+
+class DescriptorTests(unittest.TestCase):
+
+  """ Test the `protolint.descriptors` package. """
+
+  def setUp(self):
+
+    """ Make a scratch proto path. """
+
+    self.root = tempfile.mkdtemp()
+
+  def tearDown(self):
+
+    """ Remove the scratch proto path. """
+
+    shutil.rmtree(self.root)
+
+  def compile(self, sources):
+
+    """ Write protos into the scratch proto path and compile them into a descriptor set. """
+
+    for name, content in sources.items():
+      with open(os.path.join(self.root, name), 'w') as fhandle:
+        fhandle.write(content)
+
+    path = os.path.join(self.root, 'descriptors.pb')
+    subprocess.check_call(['protoc', '--proto_path=%s' % self.root, '--descriptor_set_out=%s' % path,
+                           '--include_imports', '--include_source_info'] + sorted(sources))
+    with open(path, 'rb') as fhandle:
+      return fhandle.read()
+
+  def test_fields(self):
+
+    """ make sure varints, strings and packed fields decode without a schema """
+
+    self.assertEqual(descriptors.varint('\xac\x02', 0), (300, 2))
+    self.assertEqual(list(descriptors.fields('\x08\x96\x01\x12\x03abc\x1d\x00\x00\x00\x00\x20\x01')),
+                     [(1, 150), (2, 'abc'), (4, 1)], "fixed-width fields must be skipped")
+    self.assertEqual(descriptors.packed('\x03\x8e\x02'), [3, 270])
+
+  def test_symbols(self):
+
+    """ make sure every symbol a file defines is named and positioned the way protoc reports it """
+
+    files = descriptors.split(self.compile({
+      'base.proto': 'syntax = "proto3";\npackage base;\nmessage Base {}\n',
+      'sample.proto': '\n'.join((
+        'syntax = "proto2";',
+        'package sample;',
+        'import "base.proto";',
+        'message Sample {',
+        '  message Nested { enum Kind { NONE = 0; } }',
+        '  optional base.Base base = 1;',
+        '  extensions 100 to 200;',
+        '}',
+        'enum Top { FIRST = 0; }',
+        'service Things { rpc Get (Sample) returns (Sample); }',
+        'extend Sample { optional string note = 100; }'))}))
+
+    self.assertEqual(sorted(files), ['base.proto', 'sample.proto'], "imports must be included")
+    sample = descriptors.FileDescriptor(files['sample.proto'])
+    self.assertEqual((sample.name, sample.package, sample.dependencies), ('sample.proto', 'sample', ['base.proto']))
+    self.assertEqual([(name,) + sample.position(path) for name, path in sample.symbols], [
+      ('sample.Sample', 4, 9),
+      ('sample.Sample.Nested', 5, 11),
+      ('sample.Sample.Nested.Kind', 5, 25),
+      ('sample.Sample.Nested.NONE', 5, 32),
+      ('sample.Top', 9, 6),
+      ('sample.FIRST', 9, 12),
+      ('sample.Things', 10, 9),
+      ('sample.note', 11, 33)])
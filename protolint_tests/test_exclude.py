@@ -0,0 +1,114 @@
+# -*- coding: utf-8 -*-
+
+"""
+
+  testsuite: exclude
+  ~~~~~~~~~~~~~~~~~~
+
+"""
+
+import os
+import json
+import shutil
+import tempfile
+import unittest
+
+from protolint import config
+from protolint import linter
+from protolint import exclude
+from .base import switchout_streams, restore_streams
+
+
+class ExcludeTests(unittest.TestCase):
+
+  """ Test the `protolint.exclude` package. """
+
+  def test_kind(self):
+
+    """ tell plain paths, globs and regexes apart """
+
+    self.assertEqual([exclude.kind(pattern) for pattern in (
+      'protos/set2', 'vendor/**/*.proto', 'gen/{a,b}/?.proto', '^third_party/', r'.*_test\.proto', 're:gen/.*')],
+      ['path', 'glob', 'glob', 'regex', 'regex', 'regex'])
+
+  def test_kind_ambiguous(self):
+
+    """ read globs and paths using characters regexes also have as globs and paths """
+
+    self.assertEqual(exclude.kind('vendor/*.*'), 'glob')
+    self.assertEqual(exclude.kind('third_party/c++/'), 'path')
+
+    matcher = exclude.Matcher(['vendor/*.*', 'third_party/c++/'], '/work')
+    self.assertTrue(matcher.match('vendor/Vendored.proto'))
+    self.assertFalse(matcher.match('vendor/lib/Vendored.proto'), "`*` must not match across directories")
+    self.assertTrue(matcher.match('third_party/c++', directory=True))
+    self.assertTrue(matcher.match('third_party/c++/Lib.proto'))
+    self.assertFalse(matcher.match('third_party/c/Lib.proto'), "`+` must be matched literally")
+
+  def test_paths(self):
+
+    """ exclude plain paths and everything under them, by whole path components """
+
+    matcher = exclude.Matcher(['protos/set2', './vendor/', '/work/gen'], '/work')
+    self.assertTrue(matcher.match('protos/set2', directory=True))
+    self.assertTrue(matcher.match('protos/set2/TestMessage.proto'))
+    self.assertTrue(matcher.match('vendor/a/b/C.proto'))
+    self.assertTrue(matcher('/work/gen/Generated.proto'), "absolute exclude paths must be made relative")
+    self.assertFalse(matcher.match('protos/set20/TestMessage.proto'), "paths must match whole components")
+    self.assertFalse(matcher.match('protos/set1/TestMessage.proto'))
+    self.assertFalse(matcher('/elsewhere/vendor/C.proto'))
+
+  def test_globs(self):
+
+    """ exclude paths matching globs, anywhere in the trie """
+
+    matcher = exclude.Matcher(['vendor/**/*.proto', '**/*_test.proto', 'gen/*/[!x]?.proto',
+                               'third_party/**', 'api/{v1,v2}/internal'], '/work')
+    self.assertTrue(matcher.match('vendor/Direct.proto'), "`**/` must also match no directory")
+    self.assertTrue(matcher.match('vendor/a/b/Deep.proto'))
+    self.assertFalse(matcher.match('vendor/README.md'))
+    self.assertTrue(matcher.match('src/pkg/service_test.proto'))
+    self.assertTrue(matcher.match('gen/pkg/ab.proto'))
+    self.assertFalse(matcher.match('gen/pkg/xb.proto'))
+    self.assertFalse(matcher.match('gen/pkg/sub/ab.proto'), "`*` must not match across directories")
+    self.assertTrue(matcher.match('third_party', directory=True), "`dir/**` must prune the directory itself")
+    self.assertTrue(matcher.match('api/v2/internal', directory=True))
+    self.assertFalse(matcher.match('api/v3/internal', directory=True))
+
+  def test_regexes(self):
+
+    """ exclude paths matching regexes from their start, skipping invalid ones """
+
+    switchout_streams()
+    try:
+      matcher = exclude.Matcher([r'^protos/invalid_.*', r'.*_(test|mock)\.proto', r're:gen/.*/v[0-9]+/', r're:(unclosed'],
+                                '/work')
+    finally:
+      restore_streams()
+    self.assertEqual(len(matcher), 3, "invalid regexes must be skipped")
+    self.assertTrue(matcher.match('gen/api/v2', directory=True), "the `re:` prefix must not be matched")
+    self.assertTrue(matcher.match('protos/invalid_syntax', directory=True))
+    self.assertTrue(matcher.match('src/Service_mock.proto'))
+    self.assertFalse(matcher.match('src/Service.proto'))
+
+  def test_discover(self):
+
+    """ discover protos in a workspace, skipping those matching exclude paths """
+
+    root = tempfile.mkdtemp()
+    try:
+      for path in ('src/Kept.proto', 'src/Kept_test.proto', 'vendor/lib/Vendored.proto', 'vendor/Kept.txt'):
+        if not os.path.isdir(os.path.join(root, os.path.dirname(path))):
+          os.makedirs(os.path.join(root, os.path.dirname(path)))
+        open(os.path.join(root, path), 'w').close()
+      with open(os.path.join(root, 'config.json'), 'w') as fhandle:
+        json.dump({'include_paths': [], 'exclude_paths': ['vendor/**/*.proto', '**/*_test.proto']}, fhandle)
+
+      switchout_streams()
+      try:
+        protofiles = linter.Linter(config.LinterConfig(os.path.join(root, 'config.json'), root), None).discover()
+      finally:
+        restore_streams()
+      self.assertEqual([os.path.relpath(path, root) for path in protofiles], ['src/Kept.proto'])
+    finally:
+      shutil.rmtree(root)
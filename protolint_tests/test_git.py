@@ -0,0 +1,83 @@
+# -*- coding: utf-8 -*-
+
+"""
+
+  testsuite: git
+  ~~~~~~~~~~~~~~
+
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+import subprocess
+
+from protolint import git
+
+
+class GitTests(unittest.TestCase):
+
+  """ Test the `protolint.git` package. """
+
+  def setUp(self):
+
+    """ Build a scratch git checkout with a couple of committed protos. """
+
+    self.root = os.path.realpath(tempfile.mkdtemp())
+    self.git('init', '-q')
+    self.write('base/Base.proto', 'syntax = "proto3";\n')
+    self.write('sample/Sample.proto', 'syntax = "proto3";\nimport "base/Base.proto";\n')
+    self.write('README.md', 'not a proto\n')
+    self.git('add', '.')
+    self.git('-c', 'user.name=protolint', '-c', 'user.email=protolint@example.com', 'commit', '-qm', 'initial')
+
+  def tearDown(self):
+
+    """ Remove the scratch checkout. """
+
+    shutil.rmtree(self.root)
+
+  def git(self, *arguments):
+
+    """ Run git in the scratch checkout. """
+
+    with open(os.devnull, 'w') as devnull:
+      subprocess.check_call(('git',) + arguments, cwd=self.root, stdout=devnull)
+
+  def write(self, name, content):
+
+    """ Write a file into the scratch checkout. """
+
+    path = os.path.join(self.root, name)
+    if not os.path.isdir(os.path.dirname(path)):
+      os.makedirs(os.path.dirname(path))
+    with open(path, 'w') as fhandle:
+      fhandle.write(content)
+
+  def test_unchanged(self):
+
+    """ make sure a clean checkout reports no changes """
+
+    self.assertEqual(git.changed_protofiles('HEAD', self.root), frozenset())
+
+  def test_changed(self):
+
+    """ make sure modified, new and deleted protos are reported, and nothing else """
+
+    self.write('base/Base.proto', 'syntax = "proto3";\nmessage Base {}\n')
+    self.write('base/New.proto', 'syntax = "proto3";\n')
+    self.write('README.md', 'still not a proto\n')
+    os.remove(os.path.join(self.root, 'sample', 'Sample.proto'))
+
+    self.assertEqual(git.changed_protofiles('HEAD', os.path.join(self.root, 'base')), frozenset((
+      os.path.join(self.root, 'base', 'Base.proto'),
+      os.path.join(self.root, 'base', 'New.proto'),
+      os.path.join(self.root, 'sample', 'Sample.proto'))))
+
+  def test_unknown_ref(self):
+
+    """ make sure an unknown ref fails loudly """
+
+    with self.assertRaises(subprocess.CalledProcessError):
+      git.changed_protofiles('does-not-exist', self.root)
@@ -0,0 +1,84 @@
+# -*- coding: utf-8 -*-
+
+"""
+
+  testsuite: imports
+  ~~~~~~~~~~~~~~~~~~
+
+"""
+
+import os
+import unittest
+
+from protolint import imports
+
+
+class ImportsTests(unittest.TestCase):
+
+  """ Test the `protolint.imports` package. """
+
+  root = os.path.abspath('protolint_tests/protos')
+
+  def fixture(self, *parts):
+
+    """ Build an absolute path to a fixture proto. """
+
+    return os.path.join(self.root, *parts)
+
+  def test_scan(self):
+
+    """ scan a proto for imports without parsing it """
+
+    self.assertEqual(imports.scan(self.fixture('valid_import', 'sample', 'Sample.proto')), ('base/TestMessage.proto',))
+    self.assertEqual(imports.scan(self.fixture('set1', 'TestMessageProto3.proto')), ())
+
+  def test_resolve(self):
+
+    """ resolve imports against proto paths to discovered files """
+
+    sample, base = self.fixture('valid_import', 'sample', 'Sample.proto'), self.fixture('valid_import', 'base', 'TestMessage.proto')
+    graph = imports.ImportGraph([sample, base], [self.fixture('valid_import')])
+    self.assertEqual(graph.imports[sample], frozenset((base,)), "imports must resolve against proto paths")
+    self.assertEqual(graph.imports[base], frozenset(), "unresolved or absent imports must be dropped")
+
+  def test_shards(self):
+
+    """ shard a graph by file, and make sure files importing each other in a cycle stay together """
+
+    sample, base = self.fixture('valid_import', 'sample', 'Sample.proto'), self.fixture('valid_import', 'base', 'TestMessage.proto')
+    others = [self.fixture('set1', 'TestMessageProto2.proto'), self.fixture('set1', 'TestMessageProto3.proto')]
+    graph = imports.ImportGraph([sample, base] + others, [self.fixture('valid_import'), self.fixture('set1')])
+    shards = graph.shards(8)
+
+    self.assertEqual(len(shards), 4, "files merely importing others must be eligible for their own shard. got: '%s'" % shards)
+    self.assertEqual(sorted(sum(shards, [])), sorted([sample, base] + others), "every file must land in exactly one shard")
+    self.assertEqual(len(graph.shards(1)), 1, "a single job must produce a single shard")
+    self.assertEqual([len(shard) for shard in graph.shards(2)], [2, 2], "shards must be balanced")
+
+    graph.imports[base] = frozenset((sample,))  # a cycle, which protoc cannot compile apart
+    self.assertEqual(graph.cycles(), sorted([[base, sample]] + [[other] for other in others]))
+    self.assertTrue([shard for shard in graph.shards(8) if sample in shard and base in shard],
+                    "files in an import cycle must share a shard")
+
+  def test_dependents(self):
+
+    """ collect reverse dependents of changed and deleted files """
+
+    sample, base = self.fixture('valid_import', 'sample', 'Sample.proto'), self.fixture('valid_import', 'base', 'TestMessage.proto')
+    graph = imports.ImportGraph([sample, base], [self.fixture('valid_import')])
+    self.assertEqual(graph.dependents([base]), set((sample, base)), "importers of a changed file must be affected")
+    self.assertEqual(graph.dependents([sample]), set((sample,)), "imports of a changed file must not be affected")
+
+    graph = imports.ImportGraph([sample], [self.fixture('valid_import')])
+    self.assertEqual(graph.dependents([base]), set((sample,)), "importers of an unscanned file must be found by name")
+
+  def test_update(self):
+
+    """ rescan modified files without rebuilding the graph """
+
+    sample, base = self.fixture('valid_import', 'sample', 'Sample.proto'), self.fixture('valid_import', 'base', 'TestMessage.proto')
+    graph = imports.ImportGraph([sample, base], [self.fixture('valid_import')])
+    graph.imports[sample] = frozenset()
+    graph.update([sample, self.fixture('set1', 'TestMessageProto3.proto')])
+    self.assertEqual(graph.imports[sample], frozenset((base,)), "updated files must be scanned again")
+    self.assertEqual(sorted(graph.imports), sorted([sample, base]), "files that were not scanned must be ignored")
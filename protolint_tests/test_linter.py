@@ -0,0 +1,301 @@
+# -*- coding: utf-8 -*-
+
+"""
+
+  testsuite: linter
+  ~~~~~~~~~~~~~~~~~
+
+"""
+
+import os
+import json
+import shutil
+import tempfile
+import unittest
+import collections
+
+from protolint import cli
+from protolint import config
+from protolint import linter
+from .base import switchout_streams, restore_streams
+
+
+class LinterTests(unittest.TestCase):
+
+  """ Test the `protolint.linter` package. """
+
+  def setUp(self):
+
+    """ Construct a `Linter` over the sample config. """
+
+    switchout_streams()
+    try:
+      self.linter = linter.Linter(config.LinterConfig("protolint_tests/configs/sample.json", "protolint_tests/"), None)
+    finally:
+      restore_streams()
+
+  def test_classify_recorded(self):
+
+    """ classify every line of recorded protoc output, in order """
+
+    with open("protolint_tests/outputs/protoc.txt", "r") as fhandle:
+      issues = [self.linter.classify(line.rstrip("\n")) for line in fhandle]
+
+    self.assertEqual([issue.type.name for issue in issues], [
+      "messageCase", "fieldCase", "enumValueCase", "enumTypeCase", "serviceCase", "rpcMethodCase",
+      "importUnused", "importUnused", "syntaxUnspecified",
+      "fileNotFound", "importUnresolved", "notDefined", "missingFieldNumber", "unexpectedToken",
+      "unexpectedEnd", "duplicateEnumValue", "duplicateEnumValue", "firstEnumValueMustBeZero",
+      "fieldNumberAlreadyUsed"])
+    self.assertEqual([type(issue).__name__ for issue in issues], ["Issue"] * 9 + ["Error"] * 10)
+
+  def test_classify_lint(self):
+
+    """ classify a line from `protoc-gen-lint` and make sure its location and context are parsed """
+
+    issue = self.linter.classify("TestMessageProto3.proto:19:9: 'sampleLameMessageTitle' - "
+                                 "Use CamelCase (with an initial capital) for message names.")
+    self.assertEqual((issue.file, issue.line, issue.column, issue.context),
+                     ("TestMessageProto3.proto", 19, 9, "sampleLameMessageTitle"))
+    self.assertEqual(issue.unique_hash, "cf81c60c112f073bfc8f4cc2bb83010f2ee106d4b5b93b74a76412fa732fcd85",
+                     "fingerprints must be stable across parser changes")
+
+  def test_classify_error(self):
+
+    """ classify a compiler error and make sure its location and context are parsed """
+
+    error = self.linter.classify('sample/Sample.proto:7:1: Import "nonexistent/ThisFails.proto" was not found or had errors.')
+    self.assertEqual((error.type, error.file, error.line, error.column, error.context),
+                     (linter.Linter.Errors.importUnresolved, "sample/Sample.proto", 7, 1, "nonexistent/ThisFails.proto"))
+
+    error = self.linter.classify("sample/Sample.proto: File not found.")
+    self.assertEqual((error.type, error.line, error.column), (linter.Linter.Errors.fileNotFound, 1, 1))
+
+  def test_classify_warning_location(self):
+
+    """ classify a compiler warning with a location, and make sure it is kept out of the file name """
+
+    issue = self.linter.classify("sample/Sample.proto:6:1: warning: Import base/TestMessage.proto is unused.")
+    self.assertEqual((issue.file, issue.line, issue.column, issue.context),
+                     ("sample/Sample.proto", 6, 1, "base/TestMessage.proto"))
+
+  def test_classify_unknown(self):
+
+    """ make sure unknown output fails loudly """
+
+    with self.assertRaises(NotImplementedError):
+      self.linter.classify("protoc-gen-lint: program not found or is not executable")
+
+  def cascade(self):
+
+    """ Classify the output of a broken proto, imported by two others, one through the other. """
+
+    return [self.linter.classify(line) for line in (
+      'pkg0000/File00021.proto:22:3: "Undefined00021" is not defined.',
+      'pkg0000/File00034.proto:6:1: Import "pkg0000/File00021.proto" was not found or had errors.',
+      'pkg0000/File00034.proto:32:3: "pkg0000.File00021Message000" is not defined.',
+      'pkg0000/File00034.proto:33:3: "pkg0000.File00021Message001" is not defined.',
+      'pkg0000/File00040.proto:4:1: warning: Import pkg0000/File00002.proto is unused.',
+      'pkg0000/File00055.proto:7:1: Import "pkg0000/File00034.proto" was not found or had errors.',
+      'pkg0000/File00055.proto:12:3: "pkg0000.File00034Message000" is not defined.')]
+
+  def test_collapse(self):
+
+    """ collapse the errors caused by a broken import into the first of them """
+
+    issues = list(self.linter.collapse(self.cascade()))
+    self.assertEqual([(issue.type.name, issue.file, issue.line) for issue in issues], [
+      ("notDefined", "pkg0000/File00021.proto", 22),
+      ("importUnused", "pkg0000/File00040.proto", 4),
+      ("importUnresolved", "pkg0000/File00034.proto", 6)])
+
+    cascade = issues[-1]
+    self.assertIsInstance(cascade, linter.Cascade)
+    self.assertEqual((cascade.errors, sorted(cascade.files), cascade.details),
+                     (4, ["pkg0000/File00034.proto", "pkg0000/File00055.proto"], None))
+
+  def test_collapse_fingerprint(self):
+
+    """ fingerprint a collapsed cascade as the error it started from """
+
+    root = self.cascade()[1]
+    cascade = list(self.linter.collapse(self.cascade()))[-1]
+    self.assertEqual(cascade.unique_hash, root.unique_hash)
+
+  def test_collapse_details(self):
+
+    """ keep the location of every collapsed error, when asked to """
+
+    cascade = list(self.linter.collapse(self.cascade(), details=True))[-1]
+    self.assertEqual(cascade.details, [
+      ("pkg0000/File00034.proto", 32, 3),
+      ("pkg0000/File00034.proto", 33, 3),
+      ("pkg0000/File00055.proto", 7, 1),
+      ("pkg0000/File00055.proto", 12, 3)])
+
+  def test_collapse_single(self):
+
+    """ leave an unresolved import alone when it caused nothing else """
+
+    issues = list(self.linter.collapse(self.cascade()[1:2]))
+    self.assertEqual(len(issues), 1)
+    self.assertNotIsInstance(issues[0], linter.Cascade)
+
+  def test_collapse_attributable(self):
+
+    """ only collapse undefined symbols qualified with the package of the broken import """
+
+    root = tempfile.mkdtemp()
+    try:
+      with open(os.path.join(root, 'Broken.proto'), 'w') as fhandle:
+        fhandle.write('syntax = "proto3";\npackage broken.v1;\nmessage Thing { Nope nope = 1; }\n')
+      with open(os.path.join(root, 'Service.proto'), 'w') as fhandle:
+        fhandle.write('syntax = "proto3";\npackage service;\nimport "missing/Base.proto";\nimport "Broken.proto";\n')
+      self.linter.proto_paths = [root]
+      issues = list(self.linter.collapse([self.linter.classify(line) for line in (
+        'Service.proto:3:1: Import "missing/Base.proto" was not found or had errors.',
+        'Service.proto:4:1: Import "Broken.proto" was not found or had errors.',
+        'Service.proto:9:3: "base.Base" is not defined.',
+        'Service.proto:10:3: "broken.v1.Thing" is not defined.',
+        'Service.proto:11:3: "service.Local" is not defined.',
+        'Service.proto:12:3: "Typo" is not defined.')]))
+    finally:
+      shutil.rmtree(root)
+
+    self.assertEqual([(issue.type.name, issue.line, getattr(issue, 'errors', 0)) for issue in issues], [
+      ("notDefined", 11, 0),
+      ("notDefined", 12, 0),
+      ("importUnresolved", 3, 1),
+      ("importUnresolved", 4, 1)])
+
+  def test_collapse_deterministic(self):
+
+    """ pick the same root for a cascade, whatever order its errors arrive in """
+
+    expected = list(self.linter.collapse(self.cascade(), details=True))[-1]
+    errors = self.cascade()
+    collapsed = list(self.linter.collapse(errors[5:] + errors[:5], details=True))[-1]
+    self.assertEqual((collapsed.file, collapsed.line, collapsed.unique_hash, collapsed.details),
+                     (expected.file, expected.line, expected.unique_hash, expected.details))
+
+  def lint(self, *flags):
+
+    """ Run a style-only lint over the fixtures, returning the linter and the issues it yielded. """
+
+    arguments = cli.parser.parse_args(['--style-only'] + list(flags) + [
+      'protolint_tests/configs/sample_with_protopaths.json', 'protolint_tests/'])
+    switchout_streams()
+    try:
+      lint = linter.Linter(config.LinterConfig(arguments.config, arguments.workspace), arguments)
+      issues = list(lint())
+    finally:
+      restore_streams()
+    return lint, issues
+
+  def test_summary(self):
+
+    """ count issues by type and by file, without retaining them """
+
+    lint, issues = self.lint()
+    self.assertIsNone(lint.issues)
+    self.assertTrue(issues)
+    self.assertEqual(lint.summary.total, len(issues))
+    self.assertEqual(lint.summary.types, collections.Counter(issue.type.name for issue in issues))
+    self.assertEqual(lint.summary.files, collections.Counter(issue.file for issue in issues))
+
+  def test_retain_issues(self):
+
+    """ retain the issues of the last run only, when asked to """
+
+    lint, issues = self.lint('--retain-issues')
+    self.assertEqual(lint.issues, issues)
+
+    switchout_streams()
+    try:
+      again = list(lint())
+    finally:
+      restore_streams()
+    self.assertEqual(len(lint.issues), len(again))
+    self.assertEqual(lint.summary.total, len(again))
+
+  def test_compact(self):
+
+    """ keep one copy of each file name, and format and fingerprint each issue once """
+
+    first = self.linter.classify("sample/Sample.proto:7:1: Import \"nonexistent/ThisFails.proto\" was not found or had errors.")
+    second = self.linter.classify("sample/Sample.proto:13:3: \"testMessage\" is not defined.")
+    self.assertIs(first.file, second.file)
+    self.assertFalse(hasattr(first, 'raw'))
+
+    fingerprint = first.unique_hash
+    self.assertIs(first.unique_hash, fingerprint)
+    self.assertEqual(first.message, "Import was not found or had errors: nonexistent/ThisFails.proto.")
+
+    restored = linter.BaseIssue.restore(self.linter, first.record())
+    self.assertEqual((restored.message, restored.unique_hash), (first.message, fingerprint))
+
+  def test_discover_roots(self):
+
+    """ scan overlapping include roots once, and pass protoc only the roots it needs """
+
+    root = os.path.realpath(tempfile.mkdtemp())
+    try:
+      for directory in ('lib/base', 'lib/app', 'empty'):
+        os.makedirs(os.path.join(root, directory))
+      with open(os.path.join(root, 'lib/base/Base.proto'), 'w') as fhandle:
+        fhandle.write('syntax = "proto3";\n')
+      with open(os.path.join(root, 'lib/app/App.proto'), 'w') as fhandle:
+        fhandle.write('syntax = "proto3";\nimport "base/Base.proto";\n')
+      os.symlink(os.path.join(root, 'lib'), os.path.join(root, 'link'))
+      with open(os.path.join(root, 'config.json'), 'w') as fhandle:
+        json.dump({'config': {'protopaths': ['.', 'lib', './lib', 'lib/app', 'link', 'empty']}}, fhandle)
+
+      switchout_streams()
+      try:
+        lint = linter.Linter(config.LinterConfig(os.path.join(root, 'config.json'), root), None)
+        protofiles = lint.discover()
+      finally:
+        restore_streams()
+
+      self.assertEqual(sorted(protofiles), [os.path.join(root, 'lib/app/App.proto'),
+                                            os.path.join(root, 'lib/base/Base.proto')])
+      self.assertEqual(lint.roots, [root])
+      self.assertEqual(lint.proto_paths, [root, os.path.join(root, 'lib')],
+                       "only roots holding protos or resolving imports must be passed to protoc")
+    finally:
+      shutil.rmtree(root)
+
+  def test_descriptors_bisect(self):
+
+    """ compile descriptors again in halves when some protos fail, rather than one at a time """
+
+    root = os.path.realpath(tempfile.mkdtemp())
+    try:
+      for index in range(41):
+        with open(os.path.join(root, 'File%02d.proto' % index), 'w') as fhandle:
+          fhandle.write('syntax = "proto3";\npackage sample;\nmessage %s {}\n' % (
+            'Duplicate' if index in (20, 21) else 'File%02d' % index))
+      with open(os.path.join(root, 'config.json'), 'w') as fhandle:
+        json.dump({'include_paths': []}, fhandle)
+
+      runs = []
+      original = linter.subprocess.call
+
+      def call(argv, **kwargs):
+        runs.append(argv)
+        return original(argv, **kwargs)
+
+      arguments = cli.parser.parse_args(['--style-only', '--descriptor-checks', os.path.join(root, 'config.json'), root])
+      switchout_streams()
+      linter.subprocess.call = call
+      try:
+        issues = list(linter.Linter(config.LinterConfig(arguments.config, arguments.workspace), arguments)())
+      finally:
+        linter.subprocess.call = original
+        restore_streams()
+
+      self.assertEqual([(issue.type.name, issue.file) for issue in issues if isinstance(issue, linter.Error)],
+                       [("alreadyDefined", "File21.proto")])
+      self.assertLessEqual(len(runs), 13, "a failing run must be bisected, not repeated for every proto")
+    finally:
+      shutil.rmtree(root)
@@ -0,0 +1,86 @@
+# -*- coding: utf-8 -*-
+
+"""
+
+  testsuite: output
+  ~~~~~~~~~~~~~~~~~
+
+"""
+
+import logging
+import unittest
+
+from protolint import output
+from .base import switchout_streams, restore_streams
+
+
+class OutputTests(unittest.TestCase):
+
+  """ Test logging through the `protolint.output` package. """
+
+  def tearDown(self):
+
+    """ Stop logging to the stubbed streams. """
+
+    if output.handler is not None:
+      output.logger.removeHandler(output.handler)
+      output.handler.close()
+      output.handler = None
+    output.logger.setLevel(logging.NOTSET)
+
+  def log(self, level, queued=False):
+
+    """ Log one message at each level, returning what reached `stderr`. """
+
+    switchout_streams()
+    try:
+      output.configure(level, queued)
+      output.say('debug %s', 1)
+      output.info('info %s', 2)
+      output.warn('warning %s', 3)
+      output.error('error %s', 4)
+      output.critical('critical %s', 5)
+      output.handler.close()
+    finally:
+      _, stderr = restore_streams()
+    return stderr.getvalue()
+
+  def test_levels(self):
+
+    """ make sure messages below the configured level are skipped """
+
+    logged = self.log('warning')
+    self.assertNotIn('info 2', logged)
+    self.assertIn('warning 3', logged)
+    self.assertIn('critical 5', logged)
+    self.assertIn('debug 1', self.log('debug'))
+    self.assertRaises(ValueError, output.level_of, 'loud')
+
+  def test_lazy(self):
+
+    """ make sure lazy arguments are only built when logged """
+
+    built = []
+    message = output.Lazy(lambda: built.append(True) or 'built')
+
+    switchout_streams()
+    try:
+      output.configure('info')
+      output.say('skipped: %s', message)
+      self.assertFalse(output.enabled('debug'))
+      self.assertEqual(built, [], "messages below the level must not be formatted")
+      output.info('logged: %s', message)
+    finally:
+      _, stderr = restore_streams()
+    self.assertTrue(built, "logged messages must be formatted")
+    self.assertIn('logged: built', stderr.getvalue())
+
+  def test_queued(self):
+
+    """ make sure queued messages are all written once the handler closes """
+
+    logged = self.log('info', queued=True)
+    self.assertIsInstance(output.handler, output.QueueHandler)
+    self.assertNotIn('debug 1', logged)
+    self.assertIn('info 2', logged)
+    self.assertIn('critical 5', logged)
@@ -0,0 +1,85 @@
+# -*- coding: utf-8 -*-
+
+"""
+
+  testsuite: profile
+  ~~~~~~~~~~~~~~~~~~
+
+"""
+
+import json
+import unittest
+import StringIO
+
+from protolint import cli
+from protolint import config
+from protolint import linter
+from protolint import profile
+from .base import switchout_streams, restore_streams
+
+
+class ProfileTests(unittest.TestCase):
+
+  """ Test the `protolint.profile` package. """
+
+  def tearDown(self):
+
+    """ Remove any instrumentation left behind. """
+
+    profile.disable()
+
+  def lint(self):
+
+    """ Run a style-only lint over the fixtures, returning its issues. """
+
+    arguments = cli.parser.parse_args(['--style-only', 'protolint_tests/configs/sample_with_protopaths.json',
+                                       'protolint_tests/'])
+    lint = linter.Linter(config.LinterConfig(arguments.config, arguments.workspace), arguments)
+    switchout_streams()
+    try:
+      issues = list(lint())
+      for issue in issues:
+        issue(lint.make_path_for_protofile)
+    finally:
+      restore_streams()
+    return issues
+
+  def test_disabled(self):
+
+    """ make sure nothing is instrumented or gathered unless enabled """
+
+    original = linter.Linter.discover
+    self.lint()
+    self.assertEqual(linter.Linter.discover, original)
+    self.assertEqual(profile.report()['stages'], {})
+
+  def test_report(self):
+
+    """ make sure stages are timed and issues counted, nested stages apart """
+
+    profile.enable(report=False)
+    issues = self.lint()
+    report = profile.report()
+
+    stages = report['stages']
+    for name in ('lint', 'scan', 'style', 'export', 'fingerprint', 'paths', 'serialize'):
+      self.assertIn(name, stages)
+    self.assertEqual(stages['lint']['calls'], 1)
+    self.assertEqual(stages['export']['calls'], len(issues))
+    self.assertLess(stages['lint']['self_seconds'], stages['lint']['seconds'])
+    self.assertEqual(sum(count for name, count in report['counters'].items() if name.startswith('issues.')),
+                     len(issues))
+
+    stream = StringIO.StringIO()
+    profile.write(stream)
+    self.assertEqual(json.loads(stream.getvalue())['type'], 'profile')
+
+  def test_disable(self):
+
+    """ make sure disabling restores every instrumented function """
+
+    original = linter.Linter.__dict__['make_path_for_protofile'], linter.Issue.__dict__['unique_hash']
+    profile.enable(report=False)
+    self.assertNotEqual(linter.Linter.__dict__['make_path_for_protofile'], original[0])
+    profile.disable()
+    self.assertEqual((linter.Linter.__dict__['make_path_for_protofile'], linter.Issue.__dict__['unique_hash']), original)
@@ -0,0 +1,271 @@
+# -*- coding: utf-8 -*-
+
+"""
+
+  testsuite: protoc
+  ~~~~~~~~~~~~~~~~~
+
+"""
+
+import os
+import sys
+import json
+import shutil
+import time
+import tempfile
+import unittest
+import subprocess
+from distutils.spawn import find_executable
+
+from protolint import cli
+from protolint import config
+from protolint import linter
+from protolint import protoc
+from .base import switchout_streams, restore_streams
+
+
+# stands in for `protoc` with `protoc-gen-lint`, failing on protos by their name, or
+# stopping on compile errors in protos using anything named `Missing`
+FAKE_PROTOC = '''#!%s
+import os, re, sys, time, signal
+arguments = sys.argv[1:]
+if arguments and arguments[0].startswith('@'):
+  arguments = open(arguments[0][1:]).read().splitlines()
+root = [argument.split('=', 1)[1] for argument in arguments if argument.startswith('--proto_path=')][0]
+paths = [argument for argument in arguments if not argument.startswith('-')]
+broken = [path for path in paths if 'Missing' in open(path).read()]
+for path in broken:  # compile errors stop protoc before it runs the plugin
+  for number, text in enumerate(open(path), 1):
+    for imported in re.findall(r'import "(Missing[\\w/]*\\.proto)";', text):
+      print('%%s:%%s:1: Import "%%s" was not found or had errors.' %% (os.path.relpath(path, root), number, imported))
+    for symbol in re.findall(r'([\\w.]*Missing[\\w.]*) \\w+ =', text):
+      print('%%s:%%s:3: "%%s" is not defined.' %% (os.path.relpath(path, root), number, symbol))
+if broken:
+  sys.exit(1)
+count = 0
+for path in paths:
+  name = os.path.relpath(path, root)
+  if name.startswith('Hang'):
+    time.sleep(60)
+  elif name.startswith('Orphan'):
+    os.spawnlp(os.P_NOWAIT, 'sleep', 'sleep', '60')  # like a hung plugin, holding the output open
+  elif name.startswith('Crash'):
+    sys.stdout.flush()
+    os.kill(os.getpid(), signal.SIGSEGV)
+  elif name.startswith('Uses'):
+    print('Common.proto:3:1: "Missing" is not defined.')  # an error in an import, reported with each importer
+  elif name.startswith('Garbled'):
+    print('%%s: ???' %% name)
+  elif name.startswith('Chatty'):
+    print('protoc-gen-lint: a note about nothing in particular')
+  elif name.startswith('Block'):
+    print("%%s:1:9: 'bad' - Use CamelCase (with an initial capital) for message names." %% name)
+    sys.stdout.flush()
+    deadline = time.time() + 10  # until the test has seen the issue, or gives up
+    while not os.path.exists(os.path.join(root, '..', 'release')) and time.time() < deadline:
+      time.sleep(0.01)
+    count += 1
+  else:
+    print("%%s:1:9: 'bad' - Use CamelCase (with an initial capital) for message names." %% name)
+    count += 1
+print('--lint_out: protoc-gen-lint: Plugin failed with status code %%s.' %% count)
+open(os.path.join(root, '..', 'exited'), 'w').close()
+sys.exit(1 if count else 0)
+''' % sys.executable
+
+
+class ProtocTests(unittest.TestCase):
+
+  """ Test the `protolint.protoc` package. """
+
+  def test_short(self):
+
+    """ make sure short commands are passed as they are, encoded """
+
+    with protoc.command_line(['protoc', u'--proto_path=/tmp/w', 'A.proto']) as argv:
+      self.assertEqual(argv, ['protoc', '--proto_path=/tmp/w', 'A.proto'])
+      self.assertTrue(all(isinstance(argument, str) for argument in argv))
+
+  def test_argfile(self):
+
+    """ make sure long commands go through an argument file, removed afterwards """
+
+    command = ['protoc', '--proto_path=/tmp/with space'] + ['File%05d.proto' % index for index in range(10000)]
+    with protoc.command_line(command) as argv:
+      self.assertEqual(len(argv), 2)
+      self.assertTrue(argv[1].startswith('@'))
+      path = argv[1][1:]
+      with open(path, 'r') as fhandle:
+        self.assertEqual(fhandle.read().split('\n'), command[1:] + [''])
+    self.assertFalse(os.path.exists(path), "argument files must be removed")
+
+  @unittest.skipIf(find_executable('protoc') is None, "protoc is unavailable")
+  def test_protoc(self):
+
+    """ make sure `protoc` reads argument files, with spaces in paths """
+
+    root = tempfile.mkdtemp()
+    try:
+      workspace = os.path.join(root, 'with space')
+      os.makedirs(workspace)
+      with open(os.path.join(workspace, 'A.proto'), 'w') as fhandle:
+        fhandle.write('syntax = "proto3";\nmessage A {}\n')
+
+      output = os.path.join(root, 'out.pb')
+      command = ['protoc', '--proto_path=%s' % workspace, '--descriptor_set_out=%s' % output,
+                 os.path.join(workspace, 'A.proto')]
+      with open(os.devnull, 'w') as devnull, protoc.command_line(command, limit=0) as argv:
+        self.assertEqual(subprocess.call(argv, stdout=devnull, stderr=devnull), 0)
+      self.assertTrue(os.path.getsize(output) > 0)
+    finally:
+      shutil.rmtree(root)
+
+  def scratch(self, names):
+
+    """ Build a scratch workspace of empty protos with the given names, and put
+        the fake `protoc` first on the `PATH`, until the test is done.
+
+        :param names: Names of the protos, without their extension.
+        :returns: Tuple of the scratch directory and the workspace in it. """
+
+    root = tempfile.mkdtemp()
+    self.addCleanup(shutil.rmtree, root)
+    bin_path, workspace = os.path.join(root, 'bin'), os.path.join(root, 'workspace')
+    os.makedirs(bin_path)
+    os.makedirs(workspace)
+    with open(os.path.join(bin_path, 'protoc'), 'w') as fhandle:
+      fhandle.write(FAKE_PROTOC)
+    os.chmod(os.path.join(bin_path, 'protoc'), 0o755)
+    for name in names:
+      with open(os.path.join(workspace, name + '.proto'), 'w') as fhandle:
+        fhandle.write('syntax = "proto3";\n')
+    with open(os.path.join(root, 'config.json'), 'w') as fhandle:
+      json.dump({'include_paths': []}, fhandle)
+
+    self.addCleanup(os.environ.__setitem__, 'PATH', os.environ['PATH'])
+    os.environ['PATH'] = bin_path + os.pathsep + os.environ['PATH']
+    return root, workspace
+
+  def run_linter(self, root, workspace, flags, consume=None):
+
+    """ Lint a scratch workspace from `scratch`, through the fake `protoc`.
+
+        :param flags: Extra `cli.parser` flags.
+        :param consume: Function consuming the issues as they are yielded, given
+                        them and the scratch directory, instead of sorting them.
+        :returns: Tuple of the sorted `(file, type, message)` of each issue, or
+                  whatever `consume` returned, and the seconds the run took. """
+
+    consume = consume or (lambda issues, root: sorted((issue.file, issue.type.name, issue.message) for issue in issues))
+    arguments = cli.parser.parse_args(list(flags) + [os.path.join(root, 'config.json'), workspace])
+    lint = linter.Linter(config.LinterConfig(arguments.config, arguments.workspace), arguments)
+    switchout_streams()
+    start = time.time()
+    try:
+      issues = consume(lint(), root)
+    finally:
+      restore_streams()
+    return issues, time.time() - start
+
+  def lint(self, names, *flags, **options):
+
+    """ Lint a new scratch workspace of protos with the given names, through the
+        fake `protoc`, like `run_linter`, which `consume` is passed to. """
+
+    root, workspace = self.scratch(names)
+    return self.run_linter(root, workspace, flags, options.get('consume'))
+
+  def test_isolate(self):
+
+    """ make sure protos protoc hangs, crashes or garbles its output on are isolated, and the rest still linted """
+
+    issues, elapsed = self.lint(('A', 'B', 'Crash', 'D', 'Garbled', 'Hang', 'Orphan', 'G'), '--protoc-timeout', '1')
+    linted = [(name + '.proto', 'messageCase', 'Use CamelCase (with an initial capital) for message names.')
+              for name in ('A', 'B', 'D', 'G')]
+    self.assertEqual(issues, sorted(linted + [
+      ('Crash.proto', 'compilerFailed', 'Protoc failed on this file: it was killed.'),
+      ('Garbled.proto', 'compilerFailed', 'Protoc failed on this file: it produced output that could not be parsed.'),
+      ('Hang.proto', 'compilerFailed', 'Protoc failed on this file: it timed out.'),
+      ('Orphan.proto', 'compilerFailed', 'Protoc failed on this file: it timed out.')]))
+    self.assertLess(elapsed, 30, "processes left behind by protoc must be killed along with it")
+
+  def test_unknown_output(self):
+
+    """ make sure output about no proto in particular is logged, and the rest still linted """
+
+    issues, _ = self.lint(('A', 'Chatty', 'B'))
+    self.assertEqual(issues, [(name + '.proto', 'messageCase', 'Use CamelCase (with an initial capital) for message names.')
+                              for name in ('A', 'B')])
+
+  def test_shared_errors(self):
+
+    """ make sure errors in a proto imported by several shards are reported once """
+
+    issues, _ = self.lint(('UsesA', 'UsesB', 'UsesC', 'UsesD'), '--jobs', '4')
+    self.assertEqual(issues, [('Common.proto', 'notDefined', 'Symbol "Missing" was not defined.')])
+
+  def test_repeated_errors(self):
+
+    """ make sure the same error at several lines of a proto is reported at each, whatever the --jobs """
+
+    def lines(issues, root):
+      return sorted((issue.file, issue.line, issue.type.name) for issue in issues if issue.file == 'B.proto')
+
+    root, workspace = self.scratch(('A', 'B'))
+    with open(os.path.join(workspace, 'B.proto'), 'w') as fhandle:
+      fhandle.write('syntax = "proto3";\nmessage B {\n  Missing first = 1;\n  Missing second = 2;\n}\n')
+    expected = [('B.proto', 3, 'notDefined'), ('B.proto', 4, 'notDefined')]
+    for jobs in ('1', '2'):
+      self.assertEqual(self.run_linter(root, workspace, ('--jobs', jobs), lines)[0], expected)
+
+  def test_streaming(self):
+
+    """ make sure issues are yielded as protoc prints them, before it exits """
+
+    def consume(issues, root):
+      first = next(issues)
+      running = not os.path.exists(os.path.join(root, 'exited'))
+      open(os.path.join(root, 'release'), 'w').close()
+      return first.file, running, len(list(issues))
+
+    (first, running, rest), _ = self.lint(('Block', 'Later'), consume=consume)
+    self.assertEqual(first, 'Block.proto')
+    self.assertTrue(running, "the first issue must be yielded while protoc is still running")
+    self.assertEqual(rest, 1)
+
+  def test_cache_aborted(self):
+
+    """ make sure protos protoc stopped compiling before linting them are not cached as clean """
+
+    root, workspace = self.scratch(('A', 'B'))
+    flags = ('--cache', os.path.join(root, 'cache'))
+    with open(os.path.join(workspace, 'B.proto'), 'w') as fhandle:
+      fhandle.write('syntax = "proto3";\nmessage B { Missing missing = 1; }\n')
+    self.assertEqual(self.run_linter(root, workspace, flags)[0],
+                     [('B.proto', 'notDefined', 'Symbol "Missing" was not defined.')])
+
+    with open(os.path.join(workspace, 'B.proto'), 'w') as fhandle:
+      fhandle.write('syntax = "proto3";\nmessage B {}\n')
+    self.assertEqual(self.run_linter(root, workspace, flags)[0], [
+      (name + '.proto', 'messageCase', 'Use CamelCase (with an initial capital) for message names.')
+      for name in ('A', 'B')])
+
+  def test_watchdog(self):
+
+    """ make sure cancelling a watchdog leaves no timer thread running """
+
+    process = protoc.start(['true'])
+    watchdog = protoc.Watchdog(process, protoc.DEFAULT_TIMEOUT)
+    process.communicate()
+    watchdog.cancel()
+    self.assertFalse(watchdog.timer.is_alive(), "the timer must be done once cancelled")
+    self.assertFalse(watchdog.expired)
+
+  def test_timeout_for(self):
+
+    """ make sure timeouts shrink with the share of protos compiled, down to a floor """
+
+    self.assertEqual(protoc.timeout_for(600, 50, 100), 300)
+    self.assertEqual(protoc.timeout_for(600, 1, 1000), protoc.MINIMUM_TIMEOUT)
+    self.assertEqual(protoc.timeout_for(1, 1, 1000), 1)
+    self.assertIsNone(protoc.timeout_for(0, 1, 2))
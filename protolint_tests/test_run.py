@@ -9,7 +9,11 @@
 
 import unittest
 
+import os
 import sys
+import json
+import shutil
+import tempfile
 import protolint
 from .base import switchout_streams, restore_streams
 
@@ -40,6 +44,141 @@ class RunnerTests(unittest.TestCase):
       run_tool()
     restore_streams()
 
+  def test_run_linter_jobs(self):
+
+    """ test a full run of the linter split across parallel protoc shards """
+
+    switchout_streams()
+    with self.assertRaises(SystemExit) as exit:
+      from protolint.__main__ import run_tool
+      sys.argv = ['', '--jobs', '2', 'protolint_tests/configs/sample.json', 'protolint_tests/']
+      run_tool()
+    restore_streams()
+
+  def test_run_linter_style_only(self):
+
+    """ test a full run of the linter through the in-process style checker """
+
+    switchout_streams()
+    with self.assertRaises(SystemExit) as exit:
+      from protolint.__main__ import run_tool
+      sys.argv = ['', '--style-only', 'protolint_tests/configs/sample_with_protopaths.json', 'protolint_tests/']
+      run_tool()
+    stdout, stderr = restore_streams()
+
+    issues = [json.loads(issue) for issue in stdout.getvalue().split('\0') if issue.strip()]
+    self.assertTrue(issues, "style checks must report issues for the fixture protos")
+
+  def test_run_linter_descriptor_checks(self):
+
+    """ test that symbols defined by two protos are reported from their descriptors """
+
+    root = tempfile.mkdtemp()
+    try:
+      config = os.path.join(root, 'config.json')
+      with open(config, 'w') as fhandle:
+        json.dump({'include_paths': []}, fhandle)
+      os.makedirs(os.path.join(root, 'protos'))
+      for name in ('First', 'Second'):
+        with open(os.path.join(root, 'protos', '%s.proto' % name), 'w') as fhandle:
+          fhandle.write('syntax = "proto3";\npackage sample;\nmessage Sample {}\n')
+
+      reported = []
+      for _ in range(2):
+        switchout_streams()
+        with self.assertRaises(SystemExit) as exit:
+          from protolint.__main__ import run_tool
+          sys.argv = ['', '--style-only', '--descriptor-checks', '--cache', os.path.join(root, 'cache'),
+                      config, os.path.join(root, 'protos')]
+          run_tool()
+        stdout, stderr = restore_streams()
+        reported.append([json.loads(issue) for issue in stdout.getvalue().split('\0') if issue.strip()])
+
+      for issues in reported:
+        self.assertEqual([(issue['check_name'], issue['location']['path'], issue['location']['positions']['begin'])
+                          for issue in issues],
+                         [('Bug Risk/Symbol Already Defined', 'Second.proto', {'line': 3, 'column': 9})])
+      self.assertTrue(os.listdir(os.path.join(root, 'cache', 'descriptors')), "descriptors must be cached")
+    finally:
+      shutil.rmtree(root)
+
+  def test_run_linter_cache(self):
+
+    """ test two full runs of the linter through the result cache """
+
+    cache_path = tempfile.mkdtemp()
+    try:
+      for _ in range(2):
+        switchout_streams()
+        with self.assertRaises(SystemExit) as exit:
+          from protolint.__main__ import run_tool
+          sys.argv = ['', '--cache', cache_path, 'protolint_tests/configs/sample.json', 'protolint_tests/']
+          run_tool()
+        restore_streams()
+      self.assertTrue(os.path.exists(os.path.join(cache_path, 'index.json')), "cache index must be written")
+    finally:
+      shutil.rmtree(cache_path)
+
+  def test_run_linter_paths(self):
+
+    """ test that a full run of the linter reports paths relative to the workspace """
+
+    switchout_streams()
+    with self.assertRaises(SystemExit) as exit:
+      from protolint.__main__ import run_tool
+      sys.argv = ['', 'protolint_tests/configs/sample_invalid_syntax.json', 'protolint_tests/']
+      run_tool()
+    stdout, stderr = restore_streams()
+
+    issues = [json.loads(issue) for issue in stdout.getvalue().split('\0') if issue.strip()]
+    self.assertTrue(issues, "invalid syntax must produce issues")
+    for issue in issues:
+      self.assertEqual(issue['location']['path'], 'protos/invalid_syntax/TotallyBorked.proto',
+                       "issue paths must be relative to the workspace. got: '%s'" % issue['location']['path'])
+
+  def test_run_linter_baseline(self):
+
+    """ test that issues recorded in a baseline are not reported again """
+
+    baseline_path = os.path.join(tempfile.mkdtemp(), 'baseline.bin')
+    try:
+      reported = []
+      for flags in (['--write-baseline'], []):
+        switchout_streams()
+        with self.assertRaises(SystemExit) as exit:
+          from protolint.__main__ import run_tool
+          sys.argv = ['', '--baseline', baseline_path] + flags + [
+            'protolint_tests/configs/sample_invalid_syntax.json', 'protolint_tests/']
+          run_tool()
+        stdout, stderr = restore_streams()
+        reported.append([issue for issue in stdout.getvalue().split('\0') if issue.strip()])
+
+      self.assertTrue(reported[0], "writing a baseline must still report issues")
+      self.assertEqual(reported[1], [], "issues in the baseline must not be reported")
+    finally:
+      shutil.rmtree(os.path.dirname(baseline_path))
+
+  def test_run_linter_baseline_invalid(self):
+
+    """ test that a missing or empty baseline is reported, and the run fails """
+
+    root = tempfile.mkdtemp()
+    try:
+      open(os.path.join(root, 'empty.bin'), 'w').close()
+      for name in ('missing.bin', 'empty.bin'):
+        switchout_streams()
+        with self.assertRaises(SystemExit) as exit:
+          from protolint.__main__ import run_tool
+          sys.argv = ['', '--baseline', os.path.join(root, name),
+                      'protolint_tests/configs/sample_invalid_syntax.json', 'protolint_tests/']
+          run_tool()
+        stdout, stderr = restore_streams()
+        self.assertEqual(exit.exception.code, 1)
+        self.assertIn('Unable to load baseline', stderr.getvalue())
+        self.assertEqual(stdout.getvalue(), '', "nothing must be linted without the baseline")
+    finally:
+      shutil.rmtree(root)
+
   def test_run_linter_exclusion(self):
 
     """ test a full run of the linter with exclusions configured """
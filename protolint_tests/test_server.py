@@ -0,0 +1,125 @@
+# -*- coding: utf-8 -*-
+
+"""
+
+  testsuite: server
+  ~~~~~~~~~~~~~~~~~
+
+"""
+
+import os
+import json
+import shutil
+import tempfile
+import unittest
+import threading
+
+from protolint import sink
+from protolint import server
+from .base import switchout_streams, restore_streams
+
+
+class ServerTests(unittest.TestCase):
+
+  """ Test the `protolint.server` package. """
+
+  def setUp(self):
+
+    """ Build a scratch workspace and serve it on a socket. """
+
+    self.root = tempfile.mkdtemp()
+    self.config = os.path.join(self.root, 'config.json')
+    with open(self.config, 'w') as fhandle:
+      json.dump({'include_paths': []}, fhandle)
+    os.makedirs(os.path.join(self.root, 'protos'))
+    self.write('Sample.proto', 'syntax = "proto3";\nmessage sample { string someField = 1; }\n')
+
+    switchout_streams()
+    self.socket = os.path.join(self.root, 'protolint.sock')
+    self.server = server.Server(self.socket)
+    self.thread = threading.Thread(target=self.server.serve_forever)
+    self.thread.start()
+
+  def tearDown(self):
+
+    """ Stop serving, and remove the scratch workspace. """
+
+    self.server.shutdown()
+    self.thread.join()
+    self.server.server_close()
+    restore_streams()
+    shutil.rmtree(self.root)
+
+  def write(self, name, content):
+
+    """ Write a proto into the scratch workspace. """
+
+    path = os.path.join(self.root, 'protos', name)
+    with open(path, 'w') as fhandle:
+      fhandle.write(content)
+    return path
+
+  def lint(self, files=None):
+
+    """ Send a style-only lint request for the scratch workspace. """
+
+    return server.request(self.socket, {
+      'command': 'lint', 'cwd': self.root, 'files': files,
+      'arguments': ['--style-only', 'config.json', 'protos']})
+
+  def test_lint(self):
+
+    """ make sure lint requests are answered with CodeClimate issues """
+
+    status, documents = self.lint()
+    self.assertEqual((status['status'], status['issues'], status['replayed']), (0, 2, False))
+    self.assertEqual(sorted(json.loads(document)['location']['path'] for document in documents),
+                     ['Sample.proto', 'Sample.proto'])
+
+  def test_replay(self):
+
+    """ make sure unchanged workspaces are replayed, and changes are picked up """
+
+    first = self.lint()
+    status, documents = self.lint()
+    self.assertEqual((status['replayed'], documents), (True, first[1]), "unchanged workspaces must be replayed")
+
+    self.write('Other.proto', 'syntax = "proto3";\nmessage other {}\n')
+    status, documents = self.lint()
+    self.assertEqual((status['issues'], status['replayed']), (3, False), "added protos must be linted")
+
+    os.utime(self.write('Sample.proto', 'syntax = "proto3";\nmessage Sample {}\n'), (0, 0))
+    status, documents = self.lint()
+    self.assertEqual((status['issues'], status['replayed']), (1, False), "changed protos must be linted again")
+
+  def test_files(self):
+
+    """ make sure lints can be narrowed to some protos """
+
+    self.write('Other.proto', 'syntax = "proto3";\nmessage other {}\n')
+    status, documents = self.lint(files=['protos/Other.proto'])
+    self.assertEqual([json.loads(document)['location']['path'] for document in documents], ['Other.proto'])
+
+  def test_commands(self):
+
+    """ make sure other commands and invalid requests are answered """
+
+    status, documents = server.request(self.socket, {'command': 'ping'})
+    self.assertEqual((status['status'], status['pid']), (0, os.getpid()))
+    status, documents = server.request(self.socket, {'command': 'unknown'})
+    self.assertEqual(status['status'], 1)
+    status, documents = server.request(self.socket, {'command': 'lint', 'arguments': ['--unknown']})
+    self.assertEqual((status['status'], documents), (2, []), "invalid arguments must fail like the CLI does")
+
+  def test_client_format(self):
+
+    """ make sure clients write issues in the format and to the file they forward """
+
+    self.addCleanup(sink.select, 'codeclimate')
+    path = os.path.join(self.root, 'issues.ndjson')
+    status = server.client(['--socket', self.socket, '--style-only', '--format', 'ndjson', '--output', path,
+                            self.config, os.path.join(self.root, 'protos')])
+    self.assertEqual(status, 0)
+    with open(path) as fhandle:
+      lines = fhandle.read().splitlines()
+    self.assertEqual([json.loads(line)['location']['path'] for line in lines], ['Sample.proto', 'Sample.proto'])
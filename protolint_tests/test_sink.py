@@ -0,0 +1,156 @@
+# -*- coding: utf-8 -*-
+
+"""
+
+  testsuite: sink
+  ~~~~~~~~~~~~~~~
+
+"""
+
+import os
+import gzip
+import json
+import time
+import shutil
+import tempfile
+import unittest
+
+try:
+  import cStringIO as StringIO
+except ImportError:
+  import StringIO
+
+from protolint import sink
+from protolint import output
+from .base import switchout_streams, restore_streams
+
+
+class SinkTests(unittest.TestCase):
+
+  """ Test the `protolint.sink` package. """
+
+  def tearDown(self):
+
+    """ Go back to the default format. """
+
+    sink.select('codeclimate')
+
+  def test_dumps(self):
+
+    """ make sure issues encode to JSON that decodes back identically """
+
+    exported = {"type": "issue", "location": {"path": "sample/Sample.proto"}, "positions": [1, 2]}
+    self.assertEqual(json.loads(sink.dumps(exported)), exported)
+
+  def test_buffered(self):
+
+    """ make sure documents are held until the size threshold is reached """
+
+    stream = StringIO.StringIO()
+    issues = sink.IssueSink(stream, size=10, interval=60)
+    issues.write('{"a":1}\0')
+    self.assertEqual(stream.getvalue(), '', "documents under the size threshold must be buffered")
+    issues.write('{"b":2}\0')
+    self.assertEqual(stream.getvalue(), '{"a":1}\0{"b":2}\0', "passing the size threshold must flush")
+    issues.write('{"c":3}\0')
+    issues.flush()
+    self.assertEqual(stream.getvalue().split('\0'), ['{"a":1}', '{"b":2}', '{"c":3}', ''])
+
+  def test_interval(self):
+
+    """ make sure documents are flushed once held past the time threshold """
+
+    stream = StringIO.StringIO()
+    issues = sink.IssueSink(stream, size=1024, interval=0)
+    issues.write('{"a":1}\0')
+    self.assertEqual(stream.getvalue(), '{"a":1}\0', "documents held past the interval must flush")
+
+  def test_idle(self):
+
+    """ make sure documents are flushed once held past the time threshold, even if no other arrives """
+
+    stream = StringIO.StringIO()
+    issues = sink.IssueSink(stream, size=1024, interval=0.05)
+    issues.write('{"a":1}\0')
+    self.assertEqual(stream.getvalue(), '')
+    deadline = time.time() + 5
+    while not stream.getvalue() and time.time() < deadline:
+      time.sleep(0.01)
+    self.assertEqual(stream.getvalue(), '{"a":1}\0', "an idle stream must still be flushed")
+    issues.close()
+
+  def test_descriptor(self):
+
+    """ make sure streams backed by a file descriptor are written to directly """
+
+    reader, writer = os.pipe()
+    with os.fdopen(writer, 'w') as stream:
+      issues = sink.IssueSink(stream, size=1024)
+      issues.write(u'{"a":"\xe9"}\0')
+      issues.flush()
+    with os.fdopen(reader, 'r') as stream:
+      self.assertEqual(stream.read(), '{"a":"\xc3\xa9"}\0')
+
+  def test_broken_pipe(self):
+
+    """ make sure a reader exiting early stops the stream instead of crashing """
+
+    reader, writer = os.pipe()
+    os.close(reader)
+    switchout_streams()
+    try:
+      with os.fdopen(writer, 'w') as stream:
+        issues = sink.IssueSink(stream, size=1)
+        issues.write('{"a":1}\0')
+        issues.write('{"b":2}\0')
+    finally:
+      restore_streams()
+    self.assertTrue(issues.broken, "a closed reader must mark the sink as broken")
+    self.assertEqual(issues.written, 0)
+
+  def test_formats(self):
+
+    """ make sure each format delimits documents its own way """
+
+    exported = {"type": "issue", "description": "Symbol was not defined."}
+    self.assertEqual(sink.select('codeclimate')(exported), sink.dumps(exported) + "\0")
+    self.assertEqual(sink.select('ndjson')(exported), sink.dumps(exported) + "\n")
+    self.assertIs(sink.encode, sink.ndjson)
+    with self.assertRaises(ValueError):
+      sink.select('yaml')
+
+    if sink.msgpack is None:
+      with self.assertRaises(ValueError):
+        sink.select('msgpack')
+    else:
+      self.assertEqual(sink.msgpack.unpackb(sink.select('msgpack')(exported), raw=False), exported)
+
+  def test_gzip(self):
+
+    """ make sure a compressed stream decompresses to every document, once closed """
+
+    stream = StringIO.StringIO()
+    issues = sink.IssueSink(stream, size=10, interval=60, compress=True)
+    for index in range(100):
+      issues.write('{"a":%s}\n' % index)
+    issues.close()
+    with gzip.GzipFile(fileobj=StringIO.StringIO(stream.getvalue())) as fhandle:
+      self.assertEqual(fhandle.read(), ''.join('{"a":%s}\n' % index for index in range(100)))
+
+  def test_output_file(self):
+
+    """ make sure issues can be written straight to a gzip-compressed file """
+
+    root = tempfile.mkdtemp()
+    try:
+      path = os.path.join(root, 'issues.ndjson.gz')
+      output.open_issues('ndjson', path)
+      try:
+        output.write(sink.encode({"type": "issue"}))
+        output.write(sink.encode({"type": "delta"}))
+      finally:
+        output.close_issues()
+      with gzip.open(path, 'rb') as fhandle:
+        self.assertEqual([json.loads(line) for line in fhandle], [{"type": "issue"}, {"type": "delta"}])
+    finally:
+      shutil.rmtree(root)
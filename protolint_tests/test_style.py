@@ -0,0 +1,165 @@
+# -*- coding: utf-8 -*-
+
+"""
+
+  testsuite: style
+  ~~~~~~~~~~~~~~~~
+
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from protolint import style
+from protolint import linter
+
+
+class StyleTests(unittest.TestCase):
+
+  """ Test the `protolint.style` package. """
+
+  def setUp(self):
+
+    """ Make a scratch proto path. """
+
+    self.root = tempfile.mkdtemp()
+
+  def tearDown(self):
+
+    """ Remove the scratch proto path. """
+
+    shutil.rmtree(self.root)
+
+  def write(self, name, content):
+
+    """ Write a proto into the scratch proto path. """
+
+    path = os.path.join(self.root, name)
+    if not os.path.isdir(os.path.dirname(path)):
+      os.makedirs(os.path.dirname(path))
+    with open(path, 'w') as fhandle:
+      fhandle.write(content)
+    return path
+
+  def check(self, name, content):
+
+    """ Check a proto, returning its raw issue lines. """
+
+    return [record[2] for record in style.Checker([self.root]).check(self.write(name, content))]
+
+  def test_tokenize(self):
+
+    """ make sure tokens are positioned the way protoc reports them """
+
+    tokens = list(style.tokenize('// comment\nmessage /* inline */ Foo {\n\tstring bar = 1; // trailing\n}\n'))
+    self.assertEqual(tokens[0], (style.IDENTIFIER, 'message', 2, 1))
+    self.assertEqual(tokens[1], (style.IDENTIFIER, 'Foo', 2, 22))
+    self.assertEqual(tokens[3], (style.IDENTIFIER, 'string', 3, 9), "tabs must advance to the next multiple of 8")
+    self.assertEqual(tokens[-1], (style.SYMBOL, '}', 4, 1))
+
+  def test_rules(self):
+
+    """ make sure every naming rule is checked, at the position of the name """
+
+    self.assertEqual(self.check('Sample.proto', '\n'.join((
+      'syntax = "proto3";',
+      'package sample;',
+      'message sampleMessage {',
+      '  message Nested_Message { int32 fineField = 1; }',
+      '  enum innerEnum { lower = 0; UPPER = 1; }',
+      '  map<string, Nested_Message> mapField = 2;',
+      '  oneof choice { string oneofField = 3; }',
+      '  repeated string good_field = 4 [deprecated = true];',
+      '}',
+      'service sampleService {',
+      '  rpc doThing (stream sampleMessage) returns (sampleMessage) { option deprecated = true; }',
+      '  rpc DoOther (sampleMessage) returns (stream sampleMessage);',
+      '}'))), [
+        "Sample.proto:3:9: 'sampleMessage' - Use CamelCase (with an initial capital) for message names.",
+        "Sample.proto:4:11: 'Nested_Message' - Use CamelCase (with an initial capital) for message names.",
+        "Sample.proto:4:34: 'fineField' - Use underscore_separated_names for field names.",
+        "Sample.proto:5:8: 'innerEnum' - Use CamelCase (with an initial capital) for enum type names.",
+        "Sample.proto:5:20: 'lower' - Use CAPITALS_WITH_UNDERSCORES  for enum value names.",
+        "Sample.proto:6:31: 'mapField' - Use underscore_separated_names for field names.",
+        "Sample.proto:7:25: 'oneofField' - Use underscore_separated_names for field names.",
+        "Sample.proto:10:9: 'sampleService' - Use CamelCase (with an initial capital) for service names.",
+        "Sample.proto:11:7: 'doThing' - Use CamelCase (with an initial capital) for RPC method names."])
+
+  def test_syntax_unspecified(self):
+
+    """ make sure protos without a syntax statement are reported """
+
+    issues = self.check('Sample.proto', 'message Sample {}\n')
+    self.assertEqual(len(issues), 1)
+    self.assertTrue('No syntax specified for the proto file: Sample.proto.' in issues[0])
+
+  def test_unused_import(self):
+
+    """ make sure imports are unused only when nothing resolves into them """
+
+    self.write('base/Base.proto', 'syntax = "proto3";\npackage base;\nmessage Base {}\n')
+    self.write('base/Public.proto', 'syntax = "proto3";\nimport public "base/Base.proto";\n')
+    self.write('base/Options.proto', '\n'.join((
+      'syntax = "proto2";', 'package opts;', 'import "google/protobuf/descriptor.proto";',
+      'extend google.protobuf.FieldOptions { optional bool secret = 5000; }')))
+
+    self.assertEqual(self.check('Unused.proto', 'syntax = "proto3";\nimport "base/Base.proto";\nmessage Unused {}\n'),
+                     ["Unused.proto:2:1: warning: Import base/Base.proto is unused."])
+    self.assertEqual(self.check('Field.proto', 'syntax = "proto3";\nimport "base/Base.proto";\n'
+                                'message Field { base.Base base = 1; }\n'), [])
+    self.assertEqual(self.check('Public.proto', 'syntax = "proto3";\nimport "base/Public.proto";\n'
+                                'message Public { .base.Base base = 1; }\n'), [], "public imports must count as used")
+    self.assertEqual(self.check('Option.proto', 'syntax = "proto3";\nimport "base/Options.proto";\n'
+                                'message Option { string key = 1 [(opts.secret) = true]; }\n'), [])
+    self.assertEqual(self.check('Missing.proto', 'syntax = "proto3";\nimport "missing/Missing.proto";\n'), [],
+                     "unresolvable imports must be left to protoc")
+
+  def test_invalid(self):
+
+    """ make sure broken protos raise instead of reporting style issues """
+
+    with self.assertRaises(ValueError):
+      self.check('Broken.proto', 'syntax = "proto3";\nmessage Broken {\n  string broken\n')
+
+  def test_fingerprints(self):
+
+    """ make sure records are identical to parsing the equivalent protoc output """
+
+    class Arguments(object):
+      pass
+
+    self.write('base/Base.proto', 'package base;\nmessage Base {}\n')
+    path = self.write('Sample.proto', 'import "base/Base.proto";\nmessage sample { string someField = 1; }\n')
+
+    lint = linter.Linter(None, Arguments())
+    records = style.Checker([self.root]).check(path)
+    self.assertEqual(len(records), 4)
+    for record in records:
+      restored = linter.BaseIssue.restore(lint, record)
+      parsed = lint.classify(record[2])
+      self.assertEqual((restored.type, restored.file, restored.line, restored.column, restored.context),
+                       (parsed.type, parsed.file, parsed.line, parsed.column, parsed.context))
+      self.assertEqual(restored.unique_hash, parsed.unique_hash)
+
+  def test_recorded(self):
+
+    """ make sure the fixture protos produce the lines recorded from the plugin """
+
+    recorded = os.path.join(os.path.dirname(__file__), 'outputs', 'protoc.txt')
+    with open(recorded, 'r') as fhandle:
+      expected = [line.rstrip('\n') for line in fhandle if line.startswith('TestMessageProto3.proto')]
+
+    set1 = os.path.abspath(os.path.join(os.path.dirname(__file__), 'protos', 'set1'))
+    records = style.Checker([set1]).check(os.path.join(set1, 'TestMessageProto3.proto'))
+    self.assertEqual(sorted(record[2] for record in records), sorted(expected))
+
+  def test_processes(self):
+
+    """ make sure checking across processes matches checking in-process """
+
+    paths = [self.write('File%s.proto' % index, 'message file%s { string badField = 1; }\n' % index)
+             for index in range(20)]
+    self.assertEqual(list(style.check_all(paths, [self.root], processes=2)),
+                     list(style.check_all(paths, [self.root])))
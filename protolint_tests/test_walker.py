@@ -0,0 +1,66 @@
+# -*- coding: utf-8 -*-
+
+"""
+
+  testsuite: walker
+  ~~~~~~~~~~~~~~~~~
+
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from protolint import walker
+
+
+class WalkerTests(unittest.TestCase):
+
+  """ Test the `protolint.walker` package. """
+
+  def test_walk_protos(self):
+
+    """ walk a fixture set and make sure only protos are found """
+
+    found = list(walker.walk('protolint_tests/protos/set1'))
+    self.assertEqual(sorted(os.path.basename(path) for path in found),
+                     ['TestMessageProto2.proto', 'TestMessageProto3.proto'],
+                     "walker must find exactly the protos in the set. got: '%s'" % found)
+
+  def test_walk_prune(self):
+
+    """ walk the fixture protos and make sure excluded directories are pruned """
+
+    found = list(walker.walk('protolint_tests/protos', exclude=lambda path: path.endswith('set2')))
+    self.assertTrue(found, "walker must find protos outside of the excluded directory")
+    self.assertFalse([path for path in found if '/set2/' in path], "walker must not descend into excluded directories")
+
+  def test_walk_missing(self):
+
+    """ walk a path that does not exist and make sure nothing is found """
+
+    self.assertEqual(list(walker.walk('protolint_tests/protos/does_not_exist')), [])
+
+  def test_walk_symlink_loop(self):
+
+    """ walk a tree with a symlink loop and make sure it terminates """
+
+    root = tempfile.mkdtemp()
+    try:
+      os.makedirs(os.path.join(root, 'one', 'two'))
+      open(os.path.join(root, 'one', 'two', 'Loop.proto'), 'w').close()
+      os.symlink(root, os.path.join(root, 'one', 'two', 'back'))
+      found = list(walker.walk(root))
+      self.assertEqual(len(found), 1, "walker must visit each directory once. got: '%s'" % found)
+    finally:
+      shutil.rmtree(root)
+
+  def test_walk_roots_threaded(self):
+
+    """ walk several roots in a thread pool and make sure ordering matches a serial walk """
+
+    roots = ['protolint_tests/protos/set1', 'protolint_tests/protos/set2', 'protolint_tests/protos/valid_import']
+    serial = list(walker.walk_roots(roots))
+    threaded = list(walker.walk_roots(roots, threads=3))
+    self.assertEqual(serial, threaded, "threaded walk must yield the same paths in the same order")
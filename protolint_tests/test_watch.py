@@ -0,0 +1,185 @@
+# -*- coding: utf-8 -*-
+
+"""
+
+  testsuite: watch
+  ~~~~~~~~~~~~~~~~
+
+"""
+
+import os
+import json
+import shutil
+import tempfile
+import unittest
+
+from protolint import cli
+from protolint import watch
+from protolint import config
+from protolint import linter
+from .base import switchout_streams, restore_streams
+from .test_protoc import FAKE_PROTOC
+
+
+class WatchTests(unittest.TestCase):
+
+  """ Test the `protolint.watch` package, and watching with `Linter.watch`. """
+
+  def setUp(self):
+
+    """ Build a scratch workspace with a proto importing another. """
+
+    self.root = tempfile.mkdtemp()
+    self.workspace = os.path.join(self.root, 'protos')
+    os.makedirs(self.workspace)
+    self.base = self.write('Base.proto', 'syntax = "proto3";\nmessage Base {}\n')
+    self.user = self.write('User.proto', 'syntax = "proto3";\nimport "Base.proto";\nmessage User { Base base = 1; }\n')
+    self.lone = self.write('Lone.proto', 'syntax = "proto3";\nmessage lone {}\n')
+
+  def tearDown(self):
+
+    """ Remove the scratch workspace. """
+
+    shutil.rmtree(self.root)
+
+  def write(self, name, content):
+
+    """ Write a proto into the scratch workspace. """
+
+    path = os.path.join(self.workspace, name)
+    if not os.path.isdir(os.path.dirname(path)):
+      os.makedirs(os.path.dirname(path))
+    with open(path, 'w') as fhandle:
+      fhandle.write(content)
+    return path
+
+  def fake_protoc(self):
+
+    """ Put the fake `protoc` of the protoc tests first on the `PATH`, until the test is done. """
+
+    bin_path = os.path.join(self.root, 'bin')
+    os.makedirs(bin_path)
+    with open(os.path.join(bin_path, 'protoc'), 'w') as fhandle:
+      fhandle.write(FAKE_PROTOC)
+    os.chmod(os.path.join(bin_path, 'protoc'), 0o755)
+    self.addCleanup(os.environ.__setitem__, 'PATH', os.environ['PATH'])
+    os.environ['PATH'] = bin_path + os.pathsep + os.environ['PATH']
+
+  def test_poller(self):
+
+    """ make sure polling picks up added, modified and removed protos """
+
+    poller = watch.Poller([self.workspace], interval=0.01)
+    self.assertEqual(poller.changes(0.05), set(), "nothing changed yet")
+
+    added = self.write('nested/Added.proto', 'syntax = "proto3";\n')
+    self.write('Base.proto', 'syntax = "proto3";\nmessage Base { string changed = 1; }\n')
+    os.remove(self.lone)
+    self.assertEqual(poller.changes(), set((added, self.base, self.lone)))
+
+  @unittest.skipIf(watch.libc is None, "inotify is unavailable")
+  def test_inotify(self):
+
+    """ make sure inotify picks up protos, including those in new directories """
+
+    watcher = watch.Inotify([unicode(self.workspace)])
+    try:
+      self.write('Base.proto', 'syntax = "proto3";\n')
+      self.write('notes.txt', 'not a proto')
+      self.assertEqual(watcher.changes(1), set((self.base,)))
+
+      os.makedirs(os.path.join(self.workspace, 'nested'))
+      self.assertEqual(watcher.changes(1), set((os.path.join(self.workspace, 'nested'),)))
+      added = self.write('nested/Added.proto', 'syntax = "proto3";\n')
+      self.assertEqual(watcher.changes(1), set((added,)), "new directories must be watched")
+      self.assertEqual(watcher.changes(0.01), set())
+    finally:
+      watcher.close()
+
+  def test_debounced(self):
+
+    """ make sure bursts of changes are grouped """
+
+    class Source(object):
+      bursts = [set(['a']), set(['b']), set(), set(), set(['c']), set()]
+
+      def changes(self, timeout=None):
+        return self.bursts.pop(0)
+
+    changes = watch.debounced(Source(), 0.01)
+    self.assertEqual(next(changes), set(['a', 'b']))
+    self.assertEqual(next(changes), set(['c']))
+
+  def test_relint(self):
+
+    """ make sure each cycle relints changed protos and their importers, and keeps the rest """
+
+    with open(os.path.join(self.root, 'config.json'), 'w') as fhandle:
+      json.dump({'include_paths': []}, fhandle)
+    arguments = cli.parser.parse_args(['--style-only', os.path.join(self.root, 'config.json'), self.workspace])
+    lint = linter.Linter(config.LinterConfig(arguments.config, arguments.workspace), arguments)
+
+    def changes():
+      os.utime(self.write('Base.proto', 'syntax = "proto3";\nmessage base {}\n'), (0, 0))
+      yield set((self.base,))
+      self.write('nested/added.proto', 'syntax = "proto3";\n')
+      os.remove(self.lone)
+      yield set((os.path.join(self.workspace, 'nested'), self.lone))
+
+    switchout_streams()
+    try:
+      cycles = [sorted((issue.file, issue.type.name) for issue in issues) for issues in lint.watch(changes())]
+    finally:
+      restore_streams()
+
+    self.assertEqual(cycles, [
+      [('Lone.proto', 'messageCase')],
+      [('Base.proto', 'messageCase'), ('Lone.proto', 'messageCase'), ('User.proto', 'importUnused')],
+      [('Base.proto', 'messageCase'), ('User.proto', 'importUnused')]])
+
+  def test_refine(self):
+
+    """ make sure each cycle collapses cascades, like a single run """
+
+    with open(os.path.join(self.root, 'config.json'), 'w') as fhandle:
+      json.dump({'include_paths': []}, fhandle)
+    arguments = cli.parser.parse_args([os.path.join(self.root, 'config.json'), self.workspace])
+    lint = linter.Linter(config.LinterConfig(arguments.config, arguments.workspace), arguments)
+    self.fake_protoc()
+    self.write('Broken.proto', 'syntax = "proto3";\nimport "Missing.proto";\n'
+                               'message Broken { Missing.A a = 1; Missing.B b = 2; }\n')
+
+    switchout_streams()
+    try:
+      cycles = list(lint.watch(iter([set((self.write('Lone.proto', 'syntax = "proto3";\nmessage Lone {}\n'),))])))
+    finally:
+      restore_streams()
+
+    for issues in cycles:
+      broken = [issue for issue in issues if issue.file == 'Broken.proto']
+      self.assertEqual([(issue.type.name, getattr(issue, 'errors', 0)) for issue in broken], [('importUnresolved', 2)])
+
+  def test_aborted(self):
+
+    """ make sure protos whose warnings a compile error held back are linted again on the next cycle """
+
+    with open(os.path.join(self.root, 'config.json'), 'w') as fhandle:
+      json.dump({'include_paths': []}, fhandle)
+    arguments = cli.parser.parse_args([os.path.join(self.root, 'config.json'), self.workspace])
+    lint = linter.Linter(config.LinterConfig(arguments.config, arguments.workspace), arguments)
+    self.fake_protoc()
+    broken = self.write('Broken.proto', 'syntax = "proto3";\nmessage Broken { Missing missing = 1; }\n')
+
+    def changes():
+      self.write('Broken.proto', 'syntax = "proto3";\nmessage Broken {}\n')
+      yield set((broken,))
+
+    switchout_streams()
+    try:
+      cycles = [sorted((issue.file, issue.type.name) for issue in issues) for issues in lint.watch(changes())]
+    finally:
+      restore_streams()
+
+    self.assertEqual(cycles, [
+      [('Broken.proto', 'notDefined')],
+      [(name, 'messageCase') for name in ('Base.proto', 'Broken.proto', 'Lone.proto', 'User.proto')]])